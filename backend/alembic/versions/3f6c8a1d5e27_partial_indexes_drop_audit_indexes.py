@@ -0,0 +1,67 @@
+"""Partial indexes for live rows; drop audit-column indexes
+
+Revision ID: 3f6c8a1d5e27
+Revises: b71e0d3f9a24
+Create Date: 2026-10-19 09:42:17.518204
+
+Indexes are built and dropped CONCURRENTLY, outside the migration transaction,
+so writes are not blocked on large tables. No query filters on created_by,
+updated_by or deleted_by, so their indexes only slowed writes down (users are
+soft-deleted; a hard delete of a User now scans the referencing tables).
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6c8a1d5e27'
+down_revision: str | Sequence[str] | None = 'b71e0d3f9a24'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+AUDIT_TABLES = ('User', 'Group', 'GroupMember', 'Bill', 'BillShare')
+AUDIT_COLUMNS = ('created_by', 'updated_by', 'deleted_by')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_Bill_group_id_created_at_active', 'Bill', ['group_id', sa.text('created_at DESC')],
+            unique=False, postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_BillShare_user_id_unpaid', 'BillShare', ['user_id'],
+            unique=False, postgresql_where=sa.text('paid = false'),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_GroupMember_user_id_group_id_active', 'GroupMember', ['user_id', 'group_id'],
+            unique=False, postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+        for table in AUDIT_TABLES:
+            for column in AUDIT_COLUMNS:
+                op.drop_index(
+                    f'ix_{table}_{column}', table_name=table,
+                    postgresql_concurrently=True, if_exists=True,
+                )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in AUDIT_TABLES:
+            for column in AUDIT_COLUMNS:
+                op.create_index(
+                    f'ix_{table}_{column}', table, [column], unique=False,
+                    postgresql_concurrently=True, if_not_exists=True,
+                )
+
+        op.drop_index('ix_GroupMember_user_id_group_id_active', table_name='GroupMember', postgresql_concurrently=True)
+        op.drop_index('ix_BillShare_user_id_unpaid', table_name='BillShare', postgresql_concurrently=True)
+        op.drop_index('ix_Bill_group_id_created_at_active', table_name='Bill', postgresql_concurrently=True)
@@ -0,0 +1,31 @@
+"""Add Group.revision
+
+Revision ID: 5d2a9c41e7f3
+Revises: cbebb90bb7b7
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a9c41e7f3'
+down_revision: str | Sequence[str] | None = 'cbebb90bb7b7'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'Group',
+        sa.Column('revision', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('Group', 'revision')
@@ -0,0 +1,49 @@
+"""Index active GroupMember rows by user_id alone
+
+Revision ID: 6c2f8e4a9d13
+Revises: a1d7f3c95e60
+Create Date: 2026-10-21 09:05:48.231794
+
+ix_GroupMember_user_id_group_id_active duplicated the unique_user_group index,
+which already serves membership checks; listing a user's groups only needs
+their active memberships by user_id.
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '6c2f8e4a9d13'
+down_revision: str | Sequence[str] | None = 'a1d7f3c95e60'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_GroupMember_user_id_active', 'GroupMember', ['user_id'],
+            unique=False, postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_GroupMember_user_id_group_id_active', table_name='GroupMember',
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_GroupMember_user_id_group_id_active', 'GroupMember', ['user_id', 'group_id'],
+            unique=False, postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_GroupMember_user_id_active', table_name='GroupMember',
+            postgresql_concurrently=True, if_exists=True,
+        )
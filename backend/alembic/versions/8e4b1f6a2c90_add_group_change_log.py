@@ -0,0 +1,45 @@
+"""Add GroupChange log
+
+Revision ID: 8e4b1f6a2c90
+Revises: 5d2a9c41e7f3
+Create Date: 2026-10-18 10:03:27.540931
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b1f6a2c90'
+down_revision: str | Sequence[str] | None = '5d2a9c41e7f3'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    sa.Enum('GROUP', 'MEMBER', 'BILL', 'SHARE', name='ChangeEntity').create(op.get_bind(), checkfirst=True)
+    sa.Enum('CREATED', 'UPDATED', 'DELETED', name='ChangeAction').create(op.get_bind(), checkfirst=True)
+
+    op.create_table('GroupChange',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column('group_id', sa.UUID(), nullable=False),
+        sa.Column('revision', sa.BigInteger(), nullable=False),
+        sa.Column('entity_type', postgresql.ENUM('GROUP', 'MEMBER', 'BILL', 'SHARE', name='ChangeEntity', create_type=False), nullable=False),
+        sa.Column('entity_id', sa.UUID(), nullable=False),
+        sa.Column('action', postgresql.ENUM('CREATED', 'UPDATED', 'DELETED', name='ChangeAction', create_type=False), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['group_id'], ['Group.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_GroupChange_group_id_id', 'GroupChange', ['group_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('GroupChange')
+    sa.Enum(name='ChangeAction').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='ChangeEntity').drop(op.get_bind(), checkfirst=True)
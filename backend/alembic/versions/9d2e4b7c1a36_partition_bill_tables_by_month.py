@@ -0,0 +1,331 @@
+"""Partition Bill and BillShare by created_at month
+
+Revision ID: 9d2e4b7c1a36
+Revises: 3f6c8a1d5e27
+Create Date: 2026-10-19 14:05:51.230877
+
+Bill is range partitioned by created_at, and BillShare by a new bill_created_at
+column (a copy of its bill's created_at) so each bill and its shares live in the
+same monthly partition. Primary keys and unique constraints include the
+partition key, as Postgres requires; BillShare references Bill by (id, created_at).
+
+The rewrite runs online:
+1. Create the partitioned tables next to the old ones, plus triggers that mirror
+   every write on the old tables into them.
+2. Backfill in keyset batches, each committed on its own.
+3. Swap the tables in one short transaction under an exclusive lock.
+
+The old tables stay behind as Bill_unpartitioned / BillShare_unpartitioned.
+Drop them once the new tables are verified. Every step can be re-run, so a
+failed run (e.g. the swap hitting its lock timeout) can simply be retried.
+Future months are created by the create_bill_partitions job.
+"""
+from collections.abc import Sequence
+from datetime import UTC, date, datetime
+
+import sqlalchemy as sa
+
+from alembic import context, op
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2e4b7c1a36'
+down_revision: str | Sequence[str] | None = '3f6c8a1d5e27'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BATCH_SIZE = 20_000
+MONTHS_AHEAD = 3
+MIN_UUID = '00000000-0000-0000-0000-000000000000'
+
+BILL_COLUMNS = (
+    'id', 'group_id', 'paid_by', 'created_by', 'updated_by', 'deleted_by', 'description',
+    'total_amount', 'split_type', 'created_at', 'updated_at', 'deleted_at',
+)
+SHARE_COLUMNS = (
+    'id', 'bill_id', 'user_id', 'created_by', 'updated_by', 'deleted_by', 'amount', 'paid',
+    'created_at', 'updated_at', 'deleted_at',
+)
+
+# Index-backed names that move from the old tables to the new ones at the swap
+BILL_CONSTRAINTS = ('Bill_pkey',)
+BILL_INDEXES = ('ix_Bill_group_id', 'ix_Bill_paid_by', 'ix_Bill_group_id_created_at_active')
+SHARE_CONSTRAINTS = ('BillShare_pkey', 'unique_bill_user')
+SHARE_INDEXES = ('ix_BillShare_user_id', 'ix_BillShare_user_id_unpaid')
+
+
+def _cols(columns, prefix=''):
+    return ', '.join(f'{prefix}{c}' for c in columns)
+
+
+def _updates(columns):
+    return ', '.join(f'{c} = EXCLUDED.{c}' for c in columns if c != 'id')
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitions(table: str, first: date, last: date) -> None:
+    month = first
+    while month <= last:
+        op.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}_{month:%Y_%m}" PARTITION OF "{table}_partitioned" '
+            f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{_add_months(month, 1)} 00:00:00+00')"
+        )
+        month = _add_months(month, 1)
+    op.execute(f'CREATE TABLE IF NOT EXISTS "{table}_default" PARTITION OF "{table}_partitioned" DEFAULT')
+
+
+def _backfill(conn, statement: str) -> None:
+    last = MIN_UUID
+    while last is not None:
+        last = conn.execute(sa.text(statement), {'last': last, 'size': BATCH_SIZE}).scalar()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 1. Partitioned tables, partitions and indexes
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS "Bill_partitioned" (
+            id UUID NOT NULL DEFAULT gen_random_uuid(),
+            group_id UUID NOT NULL,
+            paid_by UUID NOT NULL,
+            created_by UUID NOT NULL,
+            updated_by UUID,
+            deleted_by UUID,
+            description VARCHAR NOT NULL,
+            total_amount FLOAT NOT NULL,
+            split_type "SplitType" DEFAULT 'EQUAL',
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE,
+            deleted_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT "Bill_new_pkey" PRIMARY KEY (id, created_at),
+            CONSTRAINT "Bill_group_id_fkey" FOREIGN KEY (group_id) REFERENCES "Group" (id) ON DELETE CASCADE,
+            CONSTRAINT "Bill_paid_by_fkey" FOREIGN KEY (paid_by) REFERENCES "User" (id) ON DELETE RESTRICT,
+            CONSTRAINT "Bill_created_by_fkey" FOREIGN KEY (created_by) REFERENCES "User" (id) ON DELETE RESTRICT,
+            CONSTRAINT "Bill_updated_by_fkey" FOREIGN KEY (updated_by) REFERENCES "User" (id) ON DELETE SET NULL,
+            CONSTRAINT "Bill_deleted_by_fkey" FOREIGN KEY (deleted_by) REFERENCES "User" (id) ON DELETE SET NULL
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS "BillShare_partitioned" (
+            id UUID NOT NULL DEFAULT gen_random_uuid(),
+            bill_id UUID NOT NULL,
+            user_id UUID NOT NULL,
+            created_by UUID,
+            updated_by UUID,
+            deleted_by UUID,
+            amount FLOAT NOT NULL,
+            paid BOOLEAN DEFAULT false,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE,
+            deleted_at TIMESTAMP WITH TIME ZONE,
+            bill_created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            CONSTRAINT "BillShare_new_pkey" PRIMARY KEY (id, bill_created_at),
+            CONSTRAINT "unique_bill_user_new" UNIQUE (bill_id, user_id, bill_created_at),
+            CONSTRAINT "BillShare_bill_id_fkey" FOREIGN KEY (bill_id, bill_created_at)
+                REFERENCES "Bill_partitioned" (id, created_at) ON DELETE CASCADE,
+            CONSTRAINT "BillShare_user_id_fkey" FOREIGN KEY (user_id) REFERENCES "User" (id) ON DELETE CASCADE,
+            CONSTRAINT "BillShare_created_by_fkey" FOREIGN KEY (created_by) REFERENCES "User" (id) ON DELETE SET NULL,
+            CONSTRAINT "BillShare_updated_by_fkey" FOREIGN KEY (updated_by) REFERENCES "User" (id) ON DELETE SET NULL,
+            CONSTRAINT "BillShare_deleted_by_fkey" FOREIGN KEY (deleted_by) REFERENCES "User" (id) ON DELETE SET NULL
+        ) PARTITION BY RANGE (bill_created_at)
+    """)
+
+    this_month = datetime.now(UTC).date().replace(day=1)
+    first_month = this_month
+    if not context.is_offline_mode():
+        oldest = op.get_bind().execute(sa.text('SELECT min(created_at) FROM "Bill"')).scalar()
+        if oldest is not None:
+            first_month = min(first_month, oldest.astimezone(UTC).date().replace(day=1))
+    for table in ('Bill', 'BillShare'):
+        _create_partitions(table, first_month, _add_months(this_month, MONTHS_AHEAD))
+
+    op.execute('CREATE INDEX IF NOT EXISTS "ix_Bill_group_id_new" ON "Bill_partitioned" (group_id)')
+    op.execute('CREATE INDEX IF NOT EXISTS "ix_Bill_paid_by_new" ON "Bill_partitioned" (paid_by)')
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS "ix_Bill_group_id_created_at_active_new" '
+        'ON "Bill_partitioned" (group_id, created_at DESC) WHERE deleted_at IS NULL'
+    )
+    op.execute('CREATE INDEX IF NOT EXISTS "ix_BillShare_user_id_new" ON "BillShare_partitioned" (user_id)')
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS "ix_BillShare_user_id_unpaid_new" '
+        'ON "BillShare_partitioned" (user_id) WHERE paid = false'
+    )
+
+    # 2. Mirror writes on the old tables while the backfill runs
+    op.execute('CREATE TABLE IF NOT EXISTS "_bill_partitioning_deletes" (table_name TEXT NOT NULL, id UUID NOT NULL)')
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION bill_partitioning_mirror() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM "Bill_partitioned" WHERE id = OLD.id;
+                INSERT INTO "_bill_partitioning_deletes" VALUES ('Bill', OLD.id);
+                RETURN OLD;
+            END IF;
+            INSERT INTO "Bill_partitioned" ({_cols(BILL_COLUMNS)})
+            VALUES ({_cols(BILL_COLUMNS, 'NEW.')})
+            ON CONFLICT (id, created_at) DO UPDATE SET {_updates(BILL_COLUMNS)};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION bill_share_partitioning_mirror() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM "BillShare_partitioned" WHERE id = OLD.id;
+                INSERT INTO "_bill_partitioning_deletes" VALUES ('BillShare', OLD.id);
+                RETURN OLD;
+            END IF;
+            -- The parent bill may not have been backfilled yet
+            INSERT INTO "Bill_partitioned" ({_cols(BILL_COLUMNS)})
+            SELECT {_cols(BILL_COLUMNS)} FROM "Bill" WHERE id = NEW.bill_id
+            ON CONFLICT DO NOTHING;
+            INSERT INTO "BillShare_partitioned" ({_cols(SHARE_COLUMNS)}, bill_created_at)
+            SELECT {_cols(SHARE_COLUMNS, 'NEW.')}, b.created_at FROM "Bill" b WHERE b.id = NEW.bill_id
+            ON CONFLICT (id, bill_created_at) DO UPDATE SET {_updates(SHARE_COLUMNS)};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute('DROP TRIGGER IF EXISTS bill_partitioning_mirror ON "Bill"')
+    op.execute(
+        'CREATE TRIGGER bill_partitioning_mirror AFTER INSERT OR UPDATE OR DELETE ON "Bill" '
+        'FOR EACH ROW EXECUTE FUNCTION bill_partitioning_mirror()'
+    )
+    op.execute('DROP TRIGGER IF EXISTS bill_share_partitioning_mirror ON "BillShare"')
+    op.execute(
+        'CREATE TRIGGER bill_share_partitioning_mirror AFTER INSERT OR UPDATE OR DELETE ON "BillShare" '
+        'FOR EACH ROW EXECUTE FUNCTION bill_share_partitioning_mirror()'
+    )
+
+    # 3. Backfill; the mirror triggers are live once this commits
+    bill_batch = f"""
+        WITH page AS (
+            SELECT {_cols(BILL_COLUMNS)} FROM "Bill" WHERE id > CAST(:last AS UUID) ORDER BY id LIMIT :size
+        ), moved AS (
+            INSERT INTO "Bill_partitioned" ({_cols(BILL_COLUMNS)})
+            SELECT {_cols(BILL_COLUMNS)} FROM page ON CONFLICT DO NOTHING
+        )
+        SELECT id FROM page ORDER BY id DESC LIMIT 1
+    """
+    share_batch = f"""
+        WITH page AS (
+            SELECT {_cols(SHARE_COLUMNS)} FROM "BillShare" WHERE id > CAST(:last AS UUID) ORDER BY id LIMIT :size
+        ), moved AS (
+            INSERT INTO "BillShare_partitioned" ({_cols(SHARE_COLUMNS)}, bill_created_at)
+            SELECT {_cols(SHARE_COLUMNS, 'page.')}, b.created_at FROM page JOIN "Bill" b ON b.id = page.bill_id
+            ON CONFLICT DO NOTHING
+        )
+        SELECT id FROM page ORDER BY id DESC LIMIT 1
+    """
+    with op.get_context().autocommit_block():
+        if context.is_offline_mode():
+            op.execute(sa.text(bill_batch).bindparams(last=MIN_UUID, size=2 ** 62))
+            op.execute(sa.text(share_batch).bindparams(last=MIN_UUID, size=2 ** 62))
+        else:
+            conn = op.get_bind()
+            _backfill(conn, bill_batch)
+            _backfill(conn, share_batch)
+
+    # 4. Swap under a short exclusive lock
+    op.execute("SET LOCAL lock_timeout = '10s'")
+    op.execute('LOCK TABLE "Bill", "BillShare" IN ACCESS EXCLUSIVE MODE')
+    # Rows deleted while a backfill batch that had already read them was running
+    op.execute("""
+        DELETE FROM "BillShare_partitioned" s USING "_bill_partitioning_deletes" d
+        WHERE d.table_name = 'BillShare' AND s.id = d.id
+    """)
+    op.execute("""
+        DELETE FROM "Bill_partitioned" b USING "_bill_partitioning_deletes" d
+        WHERE d.table_name = 'Bill' AND b.id = d.id
+    """)
+    op.execute('DROP TRIGGER bill_share_partitioning_mirror ON "BillShare"')
+    op.execute('DROP TRIGGER bill_partitioning_mirror ON "Bill"')
+    op.execute('DROP FUNCTION bill_share_partitioning_mirror()')
+    op.execute('DROP FUNCTION bill_partitioning_mirror()')
+    op.execute('DROP TABLE "_bill_partitioning_deletes"')
+
+    for table, constraints, indexes in (
+        ('Bill', BILL_CONSTRAINTS, BILL_INDEXES),
+        ('BillShare', SHARE_CONSTRAINTS, SHARE_INDEXES),
+    ):
+        op.execute(f'ALTER TABLE "{table}" RENAME TO "{table}_unpartitioned"')
+        for name in constraints:
+            op.execute(f'ALTER TABLE "{table}_unpartitioned" RENAME CONSTRAINT "{name}" TO "{name}_unpartitioned"')
+        for name in indexes:
+            op.execute(f'ALTER INDEX IF EXISTS "{name}" RENAME TO "{name}_unpartitioned"')
+
+        op.execute(f'ALTER TABLE "{table}_partitioned" RENAME TO "{table}"')
+        for name in constraints:
+            new_name = name.replace('_pkey', '_new_pkey') if name.endswith('_pkey') else f'{name}_new'
+            op.execute(f'ALTER TABLE "{table}" RENAME CONSTRAINT "{new_name}" TO "{name}"')
+        for name in indexes:
+            op.execute(f'ALTER INDEX "{name}_new" RENAME TO "{name}"')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Copies back under an exclusive lock; not online
+    op.execute('LOCK TABLE "Bill", "BillShare" IN ACCESS EXCLUSIVE MODE')
+    op.execute('DROP TABLE IF EXISTS "BillShare_unpartitioned", "Bill_unpartitioned"')
+
+    op.execute("""
+        CREATE TABLE "Bill_unpartitioned" (
+            id UUID NOT NULL DEFAULT gen_random_uuid(),
+            group_id UUID NOT NULL REFERENCES "Group" (id) ON DELETE CASCADE,
+            paid_by UUID NOT NULL REFERENCES "User" (id) ON DELETE RESTRICT,
+            created_by UUID NOT NULL REFERENCES "User" (id) ON DELETE RESTRICT,
+            updated_by UUID REFERENCES "User" (id) ON DELETE SET NULL,
+            deleted_by UUID REFERENCES "User" (id) ON DELETE SET NULL,
+            description VARCHAR NOT NULL,
+            total_amount FLOAT NOT NULL,
+            split_type "SplitType" DEFAULT 'EQUAL',
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE,
+            deleted_at TIMESTAMP WITH TIME ZONE
+        )
+    """)
+    op.execute("""
+        CREATE TABLE "BillShare_unpartitioned" (
+            id UUID NOT NULL DEFAULT gen_random_uuid(),
+            bill_id UUID NOT NULL,
+            user_id UUID NOT NULL REFERENCES "User" (id) ON DELETE CASCADE,
+            created_by UUID REFERENCES "User" (id) ON DELETE SET NULL,
+            updated_by UUID REFERENCES "User" (id) ON DELETE SET NULL,
+            deleted_by UUID REFERENCES "User" (id) ON DELETE SET NULL,
+            amount FLOAT NOT NULL,
+            paid BOOLEAN DEFAULT false,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE,
+            deleted_at TIMESTAMP WITH TIME ZONE
+        )
+    """)
+    op.execute(f'INSERT INTO "Bill_unpartitioned" SELECT {_cols(BILL_COLUMNS)} FROM "Bill"')
+    op.execute(f'INSERT INTO "BillShare_unpartitioned" SELECT {_cols(SHARE_COLUMNS)} FROM "BillShare"')
+
+    op.execute('DROP TABLE "BillShare", "Bill"')
+    op.execute('ALTER TABLE "Bill_unpartitioned" RENAME TO "Bill"')
+    op.execute('ALTER TABLE "BillShare_unpartitioned" RENAME TO "BillShare"')
+
+    op.execute('ALTER TABLE "Bill" ADD CONSTRAINT "Bill_pkey" PRIMARY KEY (id)')
+    op.execute('ALTER TABLE "BillShare" ADD CONSTRAINT "BillShare_pkey" PRIMARY KEY (id)')
+    op.execute('ALTER TABLE "BillShare" ADD CONSTRAINT "unique_bill_user" UNIQUE (bill_id, user_id)')
+    op.execute(
+        'ALTER TABLE "BillShare" ADD CONSTRAINT "BillShare_bill_id_fkey" '
+        'FOREIGN KEY (bill_id) REFERENCES "Bill" (id) ON DELETE CASCADE'
+    )
+    op.create_index('ix_Bill_group_id', 'Bill', ['group_id'], unique=False)
+    op.create_index('ix_Bill_paid_by', 'Bill', ['paid_by'], unique=False)
+    op.create_index(
+        'ix_Bill_group_id_created_at_active', 'Bill', ['group_id', sa.text('created_at DESC')],
+        unique=False, postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index('ix_BillShare_bill_id', 'BillShare', ['bill_id'], unique=False)
+    op.create_index('ix_BillShare_user_id', 'BillShare', ['user_id'], unique=False)
+    op.create_index(
+        'ix_BillShare_user_id_unpaid', 'BillShare', ['user_id'],
+        unique=False, postgresql_where=sa.text('paid = false'),
+    )
@@ -0,0 +1,43 @@
+"""Index GroupChange by (group_id, revision)
+
+Revision ID: a1d7f3c95e60
+Revises: e58b3d0c7f42
+Create Date: 2026-10-20 10:12:37.905113
+
+Delta sync now pages through each group's changes by revision.
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1d7f3c95e60'
+down_revision: str | Sequence[str] | None = 'e58b3d0c7f42'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_GroupChange_group_id_revision', 'GroupChange', ['group_id', 'revision'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_GroupChange_group_id_id', table_name='GroupChange',
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_GroupChange_group_id_id', 'GroupChange', ['group_id', 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_GroupChange_group_id_revision', table_name='GroupChange',
+            postgresql_concurrently=True, if_exists=True,
+        )
@@ -0,0 +1,41 @@
+"""Add OutboxEvent
+
+Revision ID: b71e0d3f9a24
+Revises: 8e4b1f6a2c90
+Create Date: 2026-10-18 11:20:05.774310
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71e0d3f9a24'
+down_revision: str | Sequence[str] | None = '8e4b1f6a2c90'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('OutboxEvent',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column('event_type', sa.String(), nullable=False),
+        sa.Column('group_id', sa.UUID(), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('published_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_OutboxEvent_unpublished', 'OutboxEvent', ['id'], unique=False,
+        postgresql_where=sa.text('published_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('OutboxEvent')
@@ -0,0 +1,40 @@
+"""Add BillArchive
+
+Revision ID: c4a9e2f7b813
+Revises: 9d2e4b7c1a36
+Create Date: 2026-10-19 15:08:44.201937
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a9e2f7b813'
+down_revision: str | Sequence[str] | None = '9d2e4b7c1a36'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('BillArchive',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('group_id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['group_id'], ['Group.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_BillArchive_group_id'), 'BillArchive', ['group_id'], unique=False)
+    # Already compressed; keep Postgres from trying again
+    op.execute('ALTER TABLE "BillArchive" ALTER COLUMN data SET STORAGE EXTERNAL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_BillArchive_group_id'), table_name='BillArchive')
+    op.drop_table('BillArchive')
@@ -0,0 +1,52 @@
+"""Add Settlement
+
+Revision ID: e58b3d0c7f42
+Revises: c4a9e2f7b813
+Create Date: 2026-10-19 16:31:02.644318
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e58b3d0c7f42'
+down_revision: str | Sequence[str] | None = 'c4a9e2f7b813'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('Settlement',
+        sa.Column('id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('group_id', sa.UUID(), nullable=False),
+        sa.Column('from_user_id', sa.UUID(), nullable=False),
+        sa.Column('to_user_id', sa.UUID(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['group_id'], ['Group.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['from_user_id'], ['User.id'], ondelete='RESTRICT'),
+        sa.ForeignKeyConstraint(['to_user_id'], ['User.id'], ondelete='RESTRICT'),
+        sa.ForeignKeyConstraint(['created_by'], ['User.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_Settlement_group_id_created_at', 'Settlement', ['group_id', sa.text('created_at DESC')], unique=False,
+    )
+    # Nullable without a default: a catalog-only change, even on the partitioned table
+    op.add_column('BillShare', sa.Column('settlement_id', sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        'BillShare_settlement_id_fkey', 'BillShare', 'Settlement', ['settlement_id'], ['id'], ondelete='SET NULL',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('BillShare_settlement_id_fkey', 'BillShare', type_='foreignkey')
+    op.drop_column('BillShare', 'settlement_id')
+    op.drop_index('ix_Settlement_group_id_created_at', table_name='Settlement')
+    op.drop_table('Settlement')
@@ -1,8 +1,12 @@
 from datetime import timedelta
+from functools import lru_cache
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
+# Module constant as well, for route tables built at import time
+API_BASE_PATH = "/api/v1"
+
 
 class Settings(BaseSettings):
     # === Environment-based values ===
@@ -11,18 +15,84 @@ class Settings(BaseSettings):
     REDIS_URL: str = Field(..., env="REDIS_URL")
     PORT: int = Field(8000, env="PORT")
     HOST: str = Field("0.0.0.0", env="HOST")
+    WORKER_CONCURRENCY: int = Field(4, env="WORKER_CONCURRENCY")
+    # Web server worker processes (set by start.py --prod); 0 means one per CPU
+    WEB_CONCURRENCY: int = Field(0, env="WEB_CONCURRENCY")
+    GRACEFUL_SHUTDOWN_SECONDS: int = Field(25, env="GRACEFUL_SHUTDOWN_SECONDS")
+    KEEP_ALIVE_SECONDS: int = Field(5, env="KEEP_ALIVE_SECONDS")
+    # Proxies (IPs or CIDRs, comma separated) whose X-Forwarded-For is trusted for the client IP
+    FORWARDED_ALLOW_IPS: str = Field("127.0.0.1", env="FORWARDED_ALLOW_IPS")
+    # Database connections for the whole instance, split across web workers
+    DB_POOL_TOTAL: int = Field(20, env="DB_POOL_TOTAL")
+    DB_POOL_TIMEOUT: float = Field(10, env="DB_POOL_TIMEOUT")
+    REDIS_MAX_CONNECTIONS: int = Field(50, env="REDIS_MAX_CONNECTIONS")
+    SUPABASE_URL: str | None = Field(None, env="SUPABASE_URL")
+    SUPABASE_KEY: str | None = Field(None, env="SUPABASE_KEY")
+    ENVIRONMENT: str = Field("production", env="ENVIRONMENT")
+    METRICS_TOKEN: str | None = Field(None, env="METRICS_TOKEN")
+    SQL_ECHO: bool = Field(False, env="SQL_ECHO")
+    SLOW_QUERY_MS: float = Field(200, env="SLOW_QUERY_MS")
+    SLOW_QUERY_EXPLAIN: bool = Field(False, env="SLOW_QUERY_EXPLAIN")
+    SLOW_QUERY_LOG_PATH: str | None = Field(None, env="SLOW_QUERY_LOG_PATH")
+    LOOP_STALL_THRESHOLD_MS: float = Field(100, env="LOOP_STALL_THRESHOLD_MS")
+    TRACE_SAMPLE_RATE: float = Field(0.0, env="TRACE_SAMPLE_RATE")
+    TRACE_EXPORT_PATH: str | None = Field(None, env="TRACE_EXPORT_PATH")
+    TRACE_OTLP_ENDPOINT: str | None = Field(None, env="TRACE_OTLP_ENDPOINT")
+    SINGLE_FLIGHT_REDIS: bool = Field(False, env="SINGLE_FLIGHT_REDIS")
+    # Off for load tests, which log many users in from one address
+    RATE_LIMIT_ENABLED: bool = Field(True, env="RATE_LIMIT_ENABLED")
+    IDEMPOTENCY_TTL_SECONDS: int = Field(86400, env="IDEMPOTENCY_TTL_SECONDS")
+    READY_CHECK_TIMEOUT_MS: float = Field(500, env="READY_CHECK_TIMEOUT_MS")
+    READY_MAX_POOL_UTILIZATION: float = Field(0.9, env="READY_MAX_POOL_UTILIZATION")
+    READY_MAX_LOOP_LAG_MS: float = Field(250, env="READY_MAX_LOOP_LAG_MS")
+    READY_MAX_IN_FLIGHT: int = Field(0, env="READY_MAX_IN_FLIGHT")
+    BILL_ARCHIVE_AFTER_DAYS: int = Field(365, env="BILL_ARCHIVE_AFTER_DAYS")
 
     # === App constants ===
-    api_base_path: str = "/api/v1"
+    api_base_path: str = API_BASE_PATH
     access_token_expire_minutes: int = 60
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE: timedelta = timedelta(hours=1)
     REFRESH_TOKEN_EXPIRE: timedelta = timedelta(days=7)
 
+    @property
+    def db_pool_size(self) -> int:
+        # Two thirds steady, the rest as overflow
+        per_worker = max(2, self.DB_POOL_TOTAL // max(self.WEB_CONCURRENCY, 1))
+        return max(1, per_worker * 2 // 3)
+
+    @property
+    def db_max_overflow(self) -> int:
+        per_worker = max(2, self.DB_POOL_TOTAL // max(self.WEB_CONCURRENCY, 1))
+        return per_worker - self.db_pool_size
+
+    @property
+    def is_development(self) -> bool:
+        return self.ENVIRONMENT.lower() in ("development", "dev", "local")
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
         from_attributes = True
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
+
+class LazySettings:
+    """
+    Stands in for the Settings instance and reads the environment on first use,
+    so modules can be imported (by tools, tests, alembic) without DATABASE_URL,
+    REDIS_URL and SECRET_KEY set.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
+
+
+settings = LazySettings()
@@ -0,0 +1,36 @@
+# app/core/etag.py
+import hashlib
+
+from fastapi import Request, Response
+
+from app.core.metrics import record_cache
+
+
+def make_etag(*parts) -> str:
+    """Build a weak ETag from the values that determine a response body."""
+    digest = hashlib.blake2b("|".join(str(p) for p in parts).encode(), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        record_cache("etag", False)
+        return False
+
+    opaque = etag.removeprefix("W/")
+    hit = header.strip() == "*" or any(
+        tag.strip().removeprefix("W/") == opaque for tag in header.split(",")
+    )
+    record_cache("etag", hit)
+    return hit
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
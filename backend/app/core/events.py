@@ -0,0 +1,168 @@
+# app/core/events.py
+import asyncio
+import json
+import logging
+
+from fastapi import Request, WebSocket
+
+from app.core.redis import redis_client
+from app.db.models import ChangeAction, ChangeEntity
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "group-events:"
+HEARTBEAT_SECONDS = 15
+SEND_TIMEOUT_SECONDS = 10
+QUEUE_SIZE = 100
+
+# Sent to a subscriber whose queue overflowed; the client should resync via /sync
+RESYNC_MESSAGE = json.dumps({"type": "resync"})
+
+
+async def publish_group_event(group_id, event: dict):
+    """Publish an event to every worker holding subscribers for the group."""
+    await redis_client.publish(f"{CHANNEL_PREFIX}{group_id}", json.dumps(event, default=str))
+
+
+class GroupEventHub:
+    """
+    Fans group events out to local subscribers.
+    Each worker holds a single Redis pattern subscription, started on the first
+    subscriber, and dispatches every message to bounded per-connection queues.
+    """
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def subscribe(self, group_id) -> asyncio.Queue:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(str(group_id), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, group_id, queue: asyncio.Queue):
+        queues = self._subscribers.get(str(group_id))
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[str(group_id)]
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self):
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    group_id = message["channel"].removeprefix(CHANNEL_PREFIX)
+                    self._dispatch(group_id, message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Group event subscription lost, reconnecting", exc_info=True)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def _dispatch(self, group_id: str, data: str):
+        for queue in self._subscribers.get(group_id, ()):
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                # Slow client: drop its backlog instead of buffering without bound
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_MESSAGE)
+
+
+group_event_hub = GroupEventHub()
+
+
+def ends_membership(data: str, member_id) -> bool:
+    """Whether an event removes the subscriber's membership or deletes the group."""
+    return any(
+        change["action"] == ChangeAction.DELETED.value and (
+            change["entity"] == ChangeEntity.GROUP.value
+            or (change["entity"] == ChangeEntity.MEMBER.value and change["id"] == str(member_id))
+        )
+        for change in json.loads(data).get("changes", ())
+    )
+
+
+async def sse_stream(request: Request, group_id, member_id, queue: asyncio.Queue):
+    """
+    Yield server-sent events from a subscriber queue, with heartbeats.
+    Ends after the event removing the subscriber (`member_id`) from the group, or deleting it.
+    """
+    try:
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            try:
+                data = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+            except TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield f"data: {data}\n\n"
+            if ends_membership(data, member_id):
+                return
+    finally:
+        group_event_hub.unsubscribe(group_id, queue)
+
+
+async def websocket_stream(websocket: WebSocket, group_id, member_id, queue: asyncio.Queue):
+    """
+    Forward a subscriber queue to a websocket until the client disconnects, or
+    the subscriber (`member_id`) is removed from the group or the group is deleted.
+    """
+
+    async def drain_client():
+        # Incoming messages are ignored; this only detects the disconnect
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+    receiver = asyncio.create_task(drain_client())
+    try:
+        while True:
+            getter = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait(
+                {getter, receiver}, timeout=HEARTBEAT_SECONDS, return_when=asyncio.FIRST_COMPLETED
+            )
+            if receiver in done:
+                getter.cancel()
+                return
+            if getter in done:
+                data = getter.result()
+            else:
+                getter.cancel()
+                data = json.dumps({"type": "ping"})
+            await asyncio.wait_for(websocket.send_text(data), timeout=SEND_TIMEOUT_SECONDS)
+            if getter in done and ends_membership(data, member_id):
+                await websocket.close()
+                return
+    except (TimeoutError, RuntimeError):
+        # Client too slow to keep up, or already gone
+        pass
+    finally:
+        receiver.cancel()
+        group_event_hub.unsubscribe(group_id, queue)
@@ -0,0 +1,72 @@
+# app/core/idempotency.py
+"""
+Idempotency keys for retried writes.
+
+A request carrying `Idempotency-Key` claims the key in Redis before it runs. Its
+response (status, headers, body) is then stored under the key for
+IDEMPOTENCY_TTL_SECONDS and replayed to retries with the same key without
+running the route again. A duplicate that arrives while the first request is
+still running waits for it and gets the same response. Keys are scoped to the
+user and route, and reusing a key with a different body is rejected.
+"""
+import base64
+import json
+import re
+
+from app.core.config import API_BASE_PATH, settings
+from app.core.redis import redis_client
+
+KEY_PREFIX = "idem:"
+# How long a claimed key may stay in progress before another request may take over
+LOCK_SECONDS = 60
+POLL_SECONDS = 0.05
+MAX_KEY_LENGTH = 255
+# Responses worth replaying: successes and deterministic rejections, not auth or server errors
+REPLAYABLE_STATUSES = frozenset(range(200, 300)) | {400, 403, 404, 409, 422}
+
+_api = re.escape(API_BASE_PATH)
+IDEMPOTENT_ROUTES = (
+    ("POST", re.compile(rf"^{_api}/bills/?$")),
+    ("PATCH", re.compile(rf"^{_api}/bills/shares/([^/]+/)?mark-(un)?paid$")),
+    ("POST", re.compile(rf"^{_api}/groups/[^/]+/settle$")),
+)
+
+
+def is_idempotent_route(method: str, path: str) -> bool:
+    return any(method == m and pattern.match(path) for m, pattern in IDEMPOTENT_ROUTES)
+
+
+class IdempotencyStore:
+    def __init__(self, redis=redis_client, ttl: int | None = None):
+        self.redis = redis
+        self.ttl = ttl if ttl is not None else settings.IDEMPOTENCY_TTL_SECONDS
+
+    @staticmethod
+    def key(user_id: str, method: str, path: str, idempotency_key: str) -> str:
+        return f"{KEY_PREFIX}{user_id}:{method}:{path}:{idempotency_key}"
+
+    async def claim(self, key: str, fingerprint: str) -> bool:
+        record = json.dumps({"state": "in_progress", "fingerprint": fingerprint})
+        return bool(await self.redis.set(key, record, nx=True, ex=LOCK_SECONDS))
+
+    async def get(self, key: str) -> dict | None:
+        raw = await self.redis.get(key)
+        return json.loads(raw) if raw else None
+
+    async def save(self, key: str, fingerprint: str, status: int, headers: list, body: bytes):
+        record = {
+            "state": "done",
+            "fingerprint": fingerprint,
+            "status": status,
+            "headers": [[k.decode("latin-1"), v.decode("latin-1")] for k, v in headers],
+            "body": base64.b64encode(body).decode(),
+        }
+        await self.redis.set(key, json.dumps(record), ex=self.ttl)
+
+    async def release(self, key: str):
+        await self.redis.delete(key)
+
+
+def stored_response(record: dict) -> tuple[int, list[tuple[bytes, bytes]], bytes]:
+    headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in record["headers"]]
+    return record["status"], headers, base64.b64decode(record["body"])
@@ -0,0 +1,207 @@
+# app/core/metrics.py
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Deliberately small: counters, gauges and fixed-bucket histograms keyed by label
+values, updated from the event loop thread without locks. Each worker process
+keeps its own registry; Prometheus scrapes every worker and sums.
+"""
+import asyncio
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+# Seconds; covers sub-millisecond Redis calls up to slow requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        return [
+            f"{self.name}{_format_labels(self.label_names, k)} {_format_value(v)}"
+            for k, v in self._values.items()
+        ]
+
+
+class Gauge(Metric):
+    """A settable gauge, or a callback gauge read at scrape time."""
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, labels=(), callback: Callable[[], float] | None = None):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, *labels):
+        self._values[labels] = value
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels) -> float:
+        if self._callback is not None:
+            return self._callback()
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        if self._callback is not None:
+            return [f"{self.name} {_format_value(self._callback())}"]
+        return [
+            f"{self.name}{_format_labels(self.label_names, k)} {_format_value(v)}"
+            for k, v in self._values.items()
+        ]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self):
+        lines = []
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), series[:-1], strict=True):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {series[-1]!r}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labels=()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=(), callback=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labels, callback))
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            samples = metric.samples()
+            if samples:
+                lines.extend(metric.header())
+                lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# -------------------------
+# APPLICATION METRICS
+# -------------------------
+http_requests_in_flight = registry.gauge(
+    "rupaya_http_requests_in_flight", "HTTP requests currently being served"
+)
+http_request_duration = registry.histogram(
+    "rupaya_http_request_duration_seconds", "HTTP request latency by route",
+    labels=("method", "route", "status"),
+)
+db_pool_wait = registry.histogram(
+    "rupaya_db_pool_wait_seconds", "Time spent waiting for a pooled database connection"
+)
+redis_command_duration = registry.histogram(
+    "rupaya_redis_command_duration_seconds", "Redis command latency",
+    labels=("command",),
+)
+redis_command_errors = registry.counter(
+    "rupaya_redis_command_errors_total", "Redis commands that raised", labels=("command",)
+)
+cache_requests = registry.counter(
+    "rupaya_cache_requests_total", "Cache lookups by outcome (hit/miss)", labels=("cache", "result"),
+)
+event_loop_lag = registry.gauge(
+    "rupaya_event_loop_lag_seconds", "Delay of the last event loop lag probe past its deadline"
+)
+
+
+def record_cache(cache: str, hit: bool):
+    cache_requests.inc(cache, "hit" if hit else "miss")
+
+
+def register_pool_metrics(engine):
+    """Expose a SQLAlchemy pool's occupancy as scrape-time gauges."""
+    pool = engine.pool
+    registry.gauge("rupaya_db_pool_size", "Configured pool size", callback=pool.size)
+    registry.gauge("rupaya_db_pool_checked_out", "Connections checked out", callback=pool.checkedout)
+    registry.gauge(
+        "rupaya_db_pool_overflow", "Connections open beyond the pool size",
+        callback=lambda: max(pool.overflow(), 0),
+    )
+    registry.gauge("rupaya_db_pool_checked_in", "Idle connections in the pool", callback=pool.checkedin)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5):
+    """Sleep for `interval` repeatedly and record how late each wake-up is."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        event_loop_lag.set(max(loop.time() - started - interval, 0.0))
@@ -0,0 +1,407 @@
+# app/core/middleware.py
+import asyncio
+import hashlib
+import logging
+import time
+from urllib.parse import parse_qs
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.idempotency import (
+    LOCK_SECONDS,
+    MAX_KEY_LENGTH,
+    POLL_SECONDS,
+    REPLAYABLE_STATUSES,
+    IdempotencyStore,
+    is_idempotent_route,
+    stored_response,
+)
+from app.core.metrics import http_request_duration, http_requests_in_flight
+from app.core.profiling import RequestProfiler, allocation_tracker, new_profile_id, store_profile
+from app.core.rate_limit import (
+    RateLimiter,
+    rate_limited_requests,
+    retry_after_header,
+    route_class_for,
+)
+from app.core.security import decode_token
+from app.core.tracing import end_trace, should_sample, start_trace
+from app.core.watchdog import get_loop_watchdog
+from app.db.query_stats import report_n_plus_one, start_query_stats, stop_query_stats
+from app.services.auth_service import is_super_admin_token, is_token_revoked
+
+logger = logging.getLogger(__name__)
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    return next((v.decode("latin-1") for k, v in scope["headers"] if k == name), None)
+
+
+def _bearer_access_token(scope: Scope) -> tuple[str, dict] | None:
+    """(token, payload) of a signature-checked bearer access token; refresh and stream tokens are ignored."""
+    scheme, _, token = (_header(scope, b"authorization") or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_token(token)
+    if not payload or payload.get("type") != "access" or not payload.get("sub"):
+        return None
+    return token, payload
+
+
+def _bearer_user_id(scope: Scope) -> str | None:
+    """User id of a bearer access token; not looked up, the route still authenticates."""
+    bearer = _bearer_access_token(scope)
+    return bearer[1]["sub"] if bearer else None
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the SQL statements and database time of each request and returns them
+    as X-DB-Queries / X-DB-Time (ms) headers. Repeated statements are logged as
+    likely N+1 queries once the response is sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_query_stats()
+
+        async def send_with_stats(message: Message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((b"x-db-time", f"{stats.duration_ms:.2f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            stop_query_stats(token)
+            report_n_plus_one(stats, f"{scope['method']} {scope['path']}")
+
+
+class MetricsMiddleware:
+    """
+    Records in-flight requests and per-route latency (routes are labelled by
+    template), and tags the request's task for event loop stall reports.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        get_loop_watchdog().tag_current_task(scope)
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+            )
+
+
+class TracingMiddleware:
+    """Opens the root span of sampled requests and returns the trace id as X-Trace-Id."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = next((v.decode("latin-1") for k, v in scope["headers"] if k == b"traceparent"), None)
+        sampled, trace_id, parent_id = should_sample(traceparent)
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        span, token = start_trace(
+            f"{scope['method']} {scope['path']}", trace_id, parent_id,
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        )
+
+        async def send_with_trace(message: Message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                headers = list(message.get("headers", []))
+                headers.append((b"x-trace-id", span.trace.trace_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        except BaseException as exc:
+            span.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            route = scope.get("route")
+            if route is not None:
+                span.name = f"{scope['method']} {route.path}"
+            end_trace(span, token)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a single request when a super admin sends `X-Profile: 1` (or `?_profile=1`);
+    the call tree is stored and its id returned in X-Profile-Id. While the admin
+    tracemalloc window is open, also records per-route allocation growth.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k: v.decode("latin-1") for k, v in scope["headers"] if k in (b"x-profile", b"authorization")}
+        requested = headers.get(b"x-profile") == "1" or (
+            b"_profile=" in scope["query_string"]
+            and parse_qs(scope["query_string"].decode("latin-1")).get("_profile") == ["1"]
+        )
+        if requested and await self._allowed(headers.get(b"authorization")):
+            await self._profile(scope, receive, send)
+        elif allocation_tracker.active:
+            before = allocation_tracker.snapshot()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                if allocation_tracker.active:
+                    route = scope.get("route")
+                    label = f"{scope['method']} {getattr(route, 'path', 'unmatched')}"
+                    allocation_tracker.record(label, before, allocation_tracker.snapshot())
+        else:
+            await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _allowed(authorization: str | None) -> bool:
+        try:
+            return await is_super_admin_token(authorization)
+        except Exception:
+            logger.warning("Could not authorize profiling request", exc_info=True)
+            return False
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send):
+        profile_id = new_profile_id()
+        profiler = RequestProfiler()
+
+        async def send_with_profile_id(message: Message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+            route = scope.get("route")
+            report = profiler.report(scope["method"], getattr(route, "path", scope["path"]))
+            try:
+                await store_profile(profile_id, report)
+            except Exception:
+                logger.warning("Could not store profile %s", profile_id, exc_info=True)
+
+
+class RateLimitMiddleware:
+    """
+    Applies the token-bucket budgets of app.core.rate_limit to the expensive
+    routes and answers 429 with Retry-After once a per-user or per-IP bucket is empty.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.limiter = RateLimiter()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        route_class = route_class_for(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        retry_after = await self.limiter.hit(
+            route_class, _bearer_user_id(scope) if route_class.per_user else None, client[0] if client else None
+        )
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+
+        rate_limited_requests.inc(route_class.name)
+        seconds = retry_after_header(retry_after)
+        response = JSONResponse(
+            {"detail": f"Too many requests. Try again in {seconds} seconds."},
+            status_code=429,
+            headers={"Retry-After": seconds},
+        )
+        await response(scope, receive, send)
+
+
+class IdempotencyMiddleware:
+    """
+    Honours `Idempotency-Key` on bill creation and mark-paid (see app.core.idempotency).
+    Replays happen before routing: only a valid access token that was not logged
+    out or revoked gets one, checked against Redis like the route's own authentication.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.store = IdempotencyStore()
+        # Keys this worker is executing, so local duplicates wait without polling Redis
+        self._inflight: dict[str, asyncio.Event] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not is_idempotent_route(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        idempotency_key = _header(scope, b"idempotency-key")
+        bearer = _bearer_access_token(scope) if idempotency_key else None
+        if bearer is None:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await self._reject(scope, receive, send, 400, "Idempotency-Key is too long")
+            return
+        token, payload = bearer
+        user_id = payload["sub"]
+        try:
+            revoked = await is_token_revoked(token, payload)
+        except Exception as exc:
+            logger.warning("Could not check token revocation, running request as is: %s", exc)
+            revoked = True
+        if revoked:
+            # Neither claim nor replay; the route rejects the token (or runs without Redis)
+            await self.app(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        fingerprint = hashlib.sha256(body).hexdigest()
+        key = self.store.key(user_id, scope["method"], scope["path"], idempotency_key)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + LOCK_SECONDS
+
+        while True:
+            try:
+                if await self.store.claim(key, fingerprint):
+                    break
+                record = await self.store.get(key)
+            except Exception as exc:
+                # Without Redis, serve the request rather than fail it
+                logger.warning("Idempotency store unavailable, running request as is: %s", exc)
+                await self.app(scope, replay_receive, send)
+                return
+
+            # None: released between claim and get; back off and try to claim again
+            if record is not None and record["fingerprint"] != fingerprint:
+                await self._reject(scope, receive, send, 422, "Idempotency-Key was used with a different request")
+                return
+            if record is not None and record["state"] == "done":
+                await self._replay(send, *stored_response(record))
+                return
+            if loop.time() >= deadline:
+                await self._reject(scope, receive, send, 409, "A request with this Idempotency-Key is in progress")
+                return
+
+            event = self._inflight.get(key) if record is not None else None
+            if event is None:
+                await asyncio.sleep(POLL_SECONDS)
+            else:
+                try:
+                    await asyncio.wait_for(event.wait(), deadline - loop.time())
+                except TimeoutError:
+                    pass
+
+        await self._run_and_store(scope, replay_receive, send, key, fingerprint)
+
+    async def _run_and_store(self, scope: Scope, receive: Receive, send: Send, key: str, fingerprint: str):
+        event = self._inflight[key] = asyncio.Event()
+        status, headers, chunks = 500, [], []
+
+        async def send_and_capture(message: Message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_capture)
+        finally:
+            try:
+                if status in REPLAYABLE_STATUSES:
+                    await self.store.save(key, fingerprint, status, headers, b"".join(chunks))
+                else:
+                    # Let a retry run the request again
+                    await self.store.release(key)
+            except Exception:
+                logger.warning("Could not record idempotent response for %s", key, exc_info=True)
+            finally:
+                del self._inflight[key]
+                event.set()
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    async def _replay(send: Send, status: int, headers: list, body: bytes):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": headers + [(b"idempotent-replayed", b"true")],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, status: int, detail: str):
+        await JSONResponse({"detail": detail}, status_code=status)(scope, receive, send)
@@ -0,0 +1,197 @@
+# app/core/profiling.py
+"""
+On-demand profiling for super admins.
+
+- RequestProfiler samples the event loop thread's stack from a helper thread
+  while one request runs, keeping only samples taken while that request's task
+  was executing, and builds a call tree plus folded stacks (flamegraph input).
+- AllocationTracker turns on tracemalloc for the next N requests and attributes
+  the allocation growth across each request to its route. Snapshots are slow
+  and concurrent requests blur attribution, so it is for short diagnostic windows.
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+
+from app.core.redis import redis_client
+
+PROFILE_KEY_PREFIX = "profile:"
+PROFILE_TTL_SECONDS = 3600
+SAMPLE_INTERVAL_SECONDS = 0.002
+MAX_STACK_DEPTH = 128
+# Call tree nodes below this share of samples are folded away
+MIN_NODE_SHARE = 0.01
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    for marker in (f"{os.sep}app{os.sep}", f"site-packages{os.sep}"):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    return f"{code.co_name} ({filename}:{frame.f_lineno})"
+
+
+class RequestProfiler:
+    def __init__(self, interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.samples: dict[tuple[str, ...], int] = {}
+        self.total_samples = 0
+        self.started = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        thread_id = threading.get_ident()
+        self._thread = threading.Thread(
+            target=self._sample, args=(loop, task, thread_id), name="request-profiler", daemon=True
+        )
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self.duration = time.perf_counter() - self.started
+        self._stop.set()
+        self._thread.join()
+
+    def _sample(self, loop, task, thread_id):
+        while not self._stop.wait(self.interval):
+            self.total_samples += 1
+            # Only count samples where this request's task holds the loop
+            if asyncio.current_task(loop) is not task:
+                continue
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.reverse()
+            key = tuple(stack)
+            self.samples[key] = self.samples.get(key, 0) + 1
+
+    def call_tree(self) -> str:
+        tree: dict = {}
+        for stack, count in self.samples.items():
+            node = tree
+            for label in stack:
+                entry = node.setdefault(label, [0, {}])
+                entry[0] += count
+                node = entry[1]
+
+        on_task = sum(self.samples.values()) or 1
+        lines = []
+
+        def render(node: dict, depth: int):
+            for label, (count, children) in sorted(node.items(), key=lambda kv: -kv[1][0]):
+                if count / on_task < MIN_NODE_SHARE:
+                    continue
+                lines.append(f"{'  ' * depth}{100 * count / on_task:5.1f}% {label}")
+                render(children, depth + 1)
+
+        render(tree, 0)
+        return "\n".join(lines)
+
+    def report(self, method: str, path: str) -> dict:
+        on_task = sum(self.samples.values())
+        return {
+            "method": method,
+            "path": path,
+            "duration_ms": round(self.duration * 1000, 2),
+            "interval_ms": self.interval * 1000,
+            "samples": self.total_samples,
+            "samples_on_request": on_task,
+            "tree": self.call_tree(),
+            "folded": [f"{';'.join(stack)} {count}" for stack, count in self.samples.items()],
+        }
+
+
+def new_profile_id() -> str:
+    return uuid.uuid4().hex
+
+
+async def store_profile(profile_id: str, report: dict):
+    report["id"] = profile_id
+    report["created_at"] = time.time()
+    await redis_client.set(f"{PROFILE_KEY_PREFIX}{profile_id}", json.dumps(report), ex=PROFILE_TTL_SECONDS)
+
+
+async def get_profile(profile_id: str) -> dict | None:
+    raw = await redis_client.get(f"{PROFILE_KEY_PREFIX}{profile_id}")
+    return json.loads(raw) if raw else None
+
+
+class AllocationTracker:
+    def __init__(self):
+        self.remaining = 0
+        self.routes: dict[str, dict] = {}
+        self._started_tracing = False
+
+    @property
+    def active(self) -> bool:
+        return self.remaining > 0
+
+    def start(self, requests: int, frames: int = 1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._started_tracing = True
+        self.routes = {}
+        self.remaining = requests
+
+    def stop(self):
+        self.remaining = 0
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @staticmethod
+    def snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+
+    def record(self, route: str, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, top: int = 10):
+        stats = self.routes.setdefault(route, {"requests": 0, "sites": {}})
+        stats["requests"] += 1
+        for diff in after.compare_to(before, "lineno")[:top]:
+            if diff.size_diff <= 0:
+                continue
+            frame = diff.traceback[0]
+            site = f"{frame.filename}:{frame.lineno}"
+            size, count = stats["sites"].get(site, (0, 0))
+            stats["sites"][site] = (size + diff.size_diff, count + diff.count_diff)
+
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self.stop()
+
+    def report(self, top: int = 10) -> dict:
+        routes = {}
+        for route, stats in self.routes.items():
+            sites = sorted(stats["sites"].items(), key=lambda kv: -kv[1][0])[:top]
+            routes[route] = {
+                "requests": stats["requests"],
+                "top_sites": [
+                    {"site": site, "size_kb": round(size / 1024, 1), "blocks": count}
+                    for site, (size, count) in sites
+                ],
+            }
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "remaining_requests": self.remaining,
+            "traced_kb": round(current / 1024, 1),
+            "peak_kb": round(peak / 1024, 1),
+            "routes": routes,
+        }
+
+
+allocation_tracker = AllocationTracker()
@@ -0,0 +1,176 @@
+# app/core/rate_limit.py
+"""
+Token-bucket rate limiting for expensive endpoints.
+
+Each route class has a per-user and/or per-IP budget. Buckets live in Redis
+and are checked and debited by one Lua script, so all workers share them and a
+request only spends tokens when every bucket it touches has enough. If Redis is
+unreachable, each worker falls back to in-process buckets holding its share of
+the budget until Redis answers again.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+
+from app.core.config import API_BASE_PATH, settings
+from app.core.metrics import registry
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "ratelimit:"
+REDIS_TIMEOUT_SECONDS = 0.1
+# After a Redis failure, use the local buckets for this long before retrying
+REDIS_RETRY_SECONDS = 5
+MAX_LOCAL_BUCKETS = 10_000
+
+# KEYS: bucket keys; ARGV: cost, then capacity and refill rate (tokens/s) per key.
+# Returns {allowed, retry_after_seconds}.
+TOKEN_BUCKET_SCRIPT = """
+local cost = tonumber(ARGV[1])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local levels = {}
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < cost then
+        retry_after = math.max(retry_after, (cost - tokens) / rate)
+    end
+    levels[i] = tokens
+end
+local allowed = retry_after == 0
+for i, key in ipairs(KEYS) do
+    local tokens = levels[i]
+    if allowed then
+        tokens = tokens - cost
+    end
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000))
+end
+return {allowed and 1 or 0, tostring(retry_after)}
+"""
+
+rate_limited_requests = registry.counter(
+    "rupaya_rate_limited_requests_total", "Requests rejected by the rate limiter",
+    labels=("route_class",),
+)
+rate_limit_fallbacks = registry.counter(
+    "rupaya_rate_limit_local_checks_total", "Rate limit checks served by local buckets (Redis unavailable)",
+)
+
+
+class Budget:
+    def __init__(self, requests: int, per_seconds: float):
+        self.capacity = requests
+        self.rate = requests / per_seconds
+
+
+class RouteClass:
+    def __init__(
+        self, name: str, method: str, paths: tuple[str, ...],
+        per_user: Budget | None = None, per_ip: Budget | None = None,
+    ):
+        self.name = name
+        self.method = method
+        self.paths = paths
+        self.per_user = per_user
+        self.per_ip = per_ip
+
+
+_api = API_BASE_PATH
+ROUTE_CLASSES = [
+    # bcrypt verification per attempt; also slows down password guessing
+    RouteClass("login", "POST", (f"{_api}/auth/login",), per_ip=Budget(10, 60)),
+    RouteClass(
+        "user_search", "GET", (f"{_api}/users/search",),
+        per_user=Budget(30, 60), per_ip=Budget(60, 60),
+    ),
+    RouteClass(
+        "summary", "GET", (f"{_api}/summary/", f"{_api}/summary"),
+        per_user=Budget(60, 60), per_ip=Budget(120, 60),
+    ),
+    RouteClass(
+        "bill_create", "POST", (f"{_api}/bills/", f"{_api}/bills"),
+        per_user=Budget(30, 60), per_ip=Budget(60, 60),
+    ),
+]
+_BY_ROUTE = {(rc.method, path): rc for rc in ROUTE_CLASSES for path in rc.paths}
+
+
+def route_class_for(method: str, path: str) -> RouteClass | None:
+    return _BY_ROUTE.get((method, path))
+
+
+class LocalBuckets:
+    """In-process token buckets (LRU-bounded) used while Redis is unavailable."""
+
+    def __init__(self, share: float, max_buckets: int = MAX_LOCAL_BUCKETS):
+        # Each worker only gets its share of the budget, so the instance stays near the limit
+        self.share = share
+        self.max_buckets = max_buckets
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def hit(self, buckets: list[tuple[str, Budget]], cost: float = 1) -> float:
+        now = time.monotonic()
+        levels = []
+        retry_after = 0.0
+        for key, budget in buckets:
+            capacity = max(1.0, budget.capacity * self.share)
+            tokens, ts = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - ts) * budget.rate * self.share)
+            if tokens < cost:
+                retry_after = max(retry_after, (cost - tokens) / (budget.rate * self.share))
+            levels.append(tokens)
+
+        for (key, _), tokens in zip(buckets, levels, strict=True):
+            self._buckets[key] = (tokens - cost if not retry_after else tokens, now)
+            self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class RateLimiter:
+    def __init__(self, redis=redis_client):
+        self._script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self._local = LocalBuckets(share=1 / max(settings.WEB_CONCURRENCY, 1))
+        self._redis_down_until = 0.0
+
+    async def hit(self, route_class: RouteClass, user_id: str | None, ip: str | None) -> float:
+        """Spend one token from each of the request's buckets; returns 0 if allowed, else seconds to wait."""
+        buckets = []
+        if route_class.per_user and user_id:
+            buckets.append((f"{KEY_PREFIX}{route_class.name}:user:{user_id}", route_class.per_user))
+        if route_class.per_ip and ip:
+            buckets.append((f"{KEY_PREFIX}{route_class.name}:ip:{ip}", route_class.per_ip))
+        if not buckets:
+            return 0.0
+
+        if time.monotonic() >= self._redis_down_until:
+            try:
+                async with asyncio.timeout(REDIS_TIMEOUT_SECONDS):
+                    args = [1]
+                    for _, budget in buckets:
+                        args += [budget.capacity, budget.rate]
+                    allowed, retry_after = await self._script(keys=[key for key, _ in buckets], args=args)
+                return 0.0 if int(allowed) else float(retry_after)
+            except Exception as exc:
+                logger.warning("Rate limiter falling back to local buckets: %s", exc or type(exc).__name__)
+                self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+
+        rate_limit_fallbacks.inc()
+        return self._local.hit(buckets)
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
@@ -0,0 +1,83 @@
+# app/core/readiness.py
+"""
+Readiness probe.
+
+Unlike /health, which only says the process is up, readiness checks Postgres and
+Redis with short timeouts and looks at how loaded this worker is: pool
+utilization, event loop lag and requests in flight. A worker that fails it
+should be taken out of rotation until it recovers, not restarted.
+"""
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.metrics import event_loop_lag, http_requests_in_flight
+from app.core.redis import redis_client
+from app.db.session import get_engine
+
+
+async def _timed(check) -> dict:
+    """Run `check` under the readiness timeout and report its round trip."""
+    start = time.perf_counter()
+    try:
+        async with asyncio.timeout(settings.READY_CHECK_TIMEOUT_MS / 1000):
+            await check()
+    except TimeoutError:
+        return {"ok": False, "error": "timeout"}
+    except Exception as exc:
+        return {"ok": False, "error": type(exc).__name__}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+async def _ping_database():
+    # Includes the pool checkout, so an exhausted pool shows up as a timeout
+    async with get_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _ping_redis():
+    await redis_client.ping()
+
+
+def pool_state() -> dict:
+    pool = get_engine().pool
+    capacity = pool.size() + pool._max_overflow
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "utilization": round(checked_out / capacity, 3) if capacity else 0.0,
+    }
+
+
+async def check_readiness() -> tuple[bool, dict]:
+    database, redis = await asyncio.gather(_timed(_ping_database), _timed(_ping_redis))
+    pool = pool_state()
+    loop_lag_ms = round(event_loop_lag.value() * 1000, 2)
+    # Not counting this probe
+    in_flight = max(int(http_requests_in_flight.value()) - 1, 0)
+
+    reasons = []
+    if not database["ok"]:
+        reasons.append("database")
+    if not redis["ok"]:
+        reasons.append("redis")
+    if pool["utilization"] >= settings.READY_MAX_POOL_UTILIZATION:
+        reasons.append("db_pool_saturated")
+    if loop_lag_ms >= settings.READY_MAX_LOOP_LAG_MS:
+        reasons.append("event_loop_lag")
+    if settings.READY_MAX_IN_FLIGHT and in_flight >= settings.READY_MAX_IN_FLIGHT:
+        reasons.append("too_many_requests_in_flight")
+
+    return not reasons, {
+        "status": "ready" if not reasons else "not_ready",
+        "reasons": reasons,
+        "database": database,
+        "redis": redis,
+        "db_pool": pool,
+        "event_loop_lag_ms": loop_lag_ms,
+        "requests_in_flight": in_flight,
+    }
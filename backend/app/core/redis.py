@@ -1,6 +1,54 @@
 # app/core/redis.py
+import asyncio
+import time
+from functools import lru_cache
+
 import redis.asyncio as aioredis
 
 from app.core.config import settings
+from app.core.metrics import redis_command_duration, redis_command_errors
+from app.core.tracing import current_span, start_span
+
+
+class InstrumentedRedis(aioredis.Redis):
+    """
+    Redis client that records per-command latency, and a span per command in
+    sampled requests (pipelines and pub/sub are not timed).
+    """
+
+    async def execute_command(self, *args, **options):
+        command = str(args[0]).upper() if args else "UNKNOWN"
+        start = time.perf_counter()
+        try:
+            if current_span() is None:
+                return await super().execute_command(*args, **options)
+            with start_span(f"redis {command}", kind="client"):
+                return await super().execute_command(*args, **options)
+        except Exception:
+            redis_command_errors.inc(command)
+            raise
+        finally:
+            redis_command_duration.observe(time.perf_counter() - start, command)
+
+
+@lru_cache
+def get_redis() -> InstrumentedRedis:
+    """The shared client, created on first use so importing the app does not need REDIS_URL."""
+    return InstrumentedRedis.from_url(
+        settings.REDIS_URL, decode_responses=True, max_connections=settings.REDIS_MAX_CONNECTIONS
+    )
+
+
+class LazyRedis:
+    """Stands in for the shared client; modules import it (and take it as a default) at import time."""
+
+    def __getattr__(self, name):
+        return getattr(get_redis(), name)
+
+
+redis_client = LazyRedis()
+
 
-redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+async def prewarm_redis(connections: int = 4):
+    """Open a few pooled connections up front (concurrent pings force distinct connections)."""
+    await asyncio.gather(*(redis_client.ping() for _ in range(connections)))
@@ -0,0 +1,119 @@
+# app/core/singleflight.py
+"""
+Single-flight coalescing for hot reads.
+
+Concurrent calls with the same key share one execution: the first caller starts
+it in its own task (so it survives that caller being cancelled) and later
+callers await the same task. Keys must capture everything the result depends
+on, e.g. group id, revision and page, so a shared result is never stale.
+
+With SINGLE_FLIGHT_REDIS enabled, the executing worker also takes a short Redis
+lock and publishes its result for a few seconds, so the other workers wait for
+it instead of repeating the queries. Results must then be JSON-serializable.
+"""
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "singleflight:"
+LOCK_SECONDS = 10
+# How long a published result stays readable by other workers
+RESULT_TTL_SECONDS = 5
+POLL_SECONDS = 0.02
+
+singleflight_calls = registry.counter(
+    "rupaya_singleflight_calls_total",
+    "Coalesced reads by outcome: executed, shared (joined a call in this worker) or remote (another worker's result)",
+    labels=("name", "outcome"),
+)
+
+
+class SingleFlight:
+    def __init__(self, name: str, use_redis: bool | None = None, redis=redis_client):
+        self.name = name
+        # None: follow SINGLE_FLIGHT_REDIS, read on first use since instances are module-level
+        self.use_redis = use_redis
+        self._redis = redis
+        self._calls: dict[str, asyncio.Task] = {}
+
+    @property
+    def redis(self):
+        use_redis = settings.SINGLE_FLIGHT_REDIS if self.use_redis is None else self.use_redis
+        return self._redis if use_redis else None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(self._execute(key, fn))
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            singleflight_calls.inc(self.name, "shared")
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task):
+        self._calls.pop(key, None)
+        # Retrieve the error so it is not reported as unhandled when every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    async def _execute(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if self.redis is not None:
+            try:
+                found, result = await self._execute_once_across_workers(key, fn)
+                if found:
+                    return result
+            except RedisError as exc:
+                logger.warning("Single-flight %s running without Redis: %s", self.name, exc)
+
+        singleflight_calls.inc(self.name, "executed")
+        return await fn()
+
+    async def _execute_once_across_workers(self, key: str, fn) -> tuple[bool, Any]:
+        """Returns (True, result) when it ran fn or found another worker's result, else (False, None)."""
+        lock_key = f"{KEY_PREFIX}{self.name}:lock:{key}"
+        result_key = f"{KEY_PREFIX}{self.name}:result:{key}"
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + LOCK_SECONDS
+
+        while loop.time() < deadline:
+            cached = await self.redis.get(result_key)
+            if cached is not None:
+                singleflight_calls.inc(self.name, "remote")
+                return True, json.loads(cached)
+
+            if await self.redis.set(lock_key, "1", nx=True, ex=LOCK_SECONDS):
+                singleflight_calls.inc(self.name, "executed")
+                try:
+                    result = await fn()
+                    # Publish before unlocking so waiters find the result rather than the lock gone
+                    try:
+                        await self.redis.set(result_key, json.dumps(result, default=str), ex=RESULT_TTL_SECONDS)
+                    except RedisError as exc:
+                        logger.warning("Could not publish single-flight result for %s: %s", key, exc)
+                finally:
+                    await self._release(lock_key)
+                return True, result
+
+            await asyncio.sleep(POLL_SECONDS)
+        return False, None
+
+    async def _release(self, lock_key: str):
+        try:
+            await self.redis.delete(lock_key)
+        except RedisError:
+            pass  # Expires on its own
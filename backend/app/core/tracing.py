@@ -0,0 +1,306 @@
+# app/core/tracing.py
+"""
+Lightweight request tracing.
+
+The tracing middleware opens a root span per sampled request; service methods
+(`@trace_methods`), SQL statements and Redis commands add child spans. Finished
+traces are buffered and exported in the background either as JSON lines to
+TRACE_EXPORT_PATH or as OTLP/HTTP JSON to TRACE_OTLP_ENDPOINT.
+
+Unsampled requests carry no span, so the instrumentation costs one context
+variable lookup per call.
+"""
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import random
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bounds so a pathological request or a stuck exporter cannot grow memory
+MAX_SPANS_PER_TRACE = 1000
+MAX_PENDING_TRACES = 1000
+EXPORT_INTERVAL_SECONDS = 5
+
+# OTLP SpanKind values
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+class Span:
+    __slots__ = (
+        "trace", "name", "kind", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error",
+    )
+
+    def __init__(self, trace: "Trace", name: str, parent_id: str | None, attributes: dict, kind: str = "internal"):
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def end(self, end_ns: int | None = None):
+        self.end_ns = end_ns or time.time_ns()
+        self.trace.record(self)
+
+
+class Trace:
+    def __init__(self, trace_id: str | None = None):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.spans: list[Span] = []
+        self.dropped = 0
+
+    def record(self, span: Span):
+        if len(self.spans) < MAX_SPANS_PER_TRACE:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+# Innermost traced function, tracked for every request (sampled or not)
+_current_operation: ContextVar[str | None] = ContextVar("current_operation", default=None)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def current_operation() -> str | None:
+    """Name of the innermost `traced` function being awaited, e.g. "BillService.create_bill"."""
+    return _current_operation.get()
+
+
+@contextmanager
+def start_span(name: str, kind: str = "internal", **attributes):
+    """Open a child of the current span; a no-op when the request is not sampled."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    span = Span(parent.trace, name, parent.span_id, attributes, kind)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def traced(name: str | None = None):
+    """Decorator opening a span around an async function and recording it as the current operation."""
+
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            operation = _current_operation.set(span_name)
+            try:
+                if _current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with start_span(span_name):
+                    return await func(*args, **kwargs)
+            finally:
+                _current_operation.reset(operation)
+
+        return wrapper
+
+    return decorator
+
+
+def trace_methods(cls):
+    """Class decorator tracing every public async method of a service."""
+    for attr, value in list(vars(cls).items()):
+        if not attr.startswith("_") and inspect.iscoroutinefunction(value):
+            setattr(cls, attr, traced(f"{cls.__name__}.{attr}")(value))
+    return cls
+
+
+# -------------------------
+# ROOT SPANS
+# -------------------------
+def _parse_traceparent(header: str | None) -> tuple[str, str, bool] | None:
+    # W3C: version-traceid-parentid-flags
+    parts = (header or "").split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+def should_sample(traceparent: str | None) -> tuple[bool, str | None, str | None]:
+    """Sampling decision for a new request: (sampled, trace_id, remote parent span id)."""
+    if not get_exporter().enabled:
+        return False, None, None
+    incoming = _parse_traceparent(traceparent)
+    if incoming:
+        trace_id, parent_id, sampled = incoming
+        return sampled, trace_id, parent_id
+    return random.random() < settings.TRACE_SAMPLE_RATE, None, None
+
+
+def start_trace(name: str, trace_id: str | None, parent_id: str | None, **attributes):
+    """Open the root span of a sampled request; returns (span, token) for end_trace."""
+    span = Span(Trace(trace_id), name, parent_id, attributes, kind="server")
+    return span, _current_span.set(span)
+
+
+def end_trace(span: Span, token):
+    _current_span.reset(token)
+    span.end()
+    get_exporter().submit(span.trace)
+
+
+# -------------------------
+# SQL SPANS
+# -------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_span.get() is not None:
+        conn.info.setdefault("span_started_at", []).append(time.time_ns())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = _current_span.get()
+    started = conn.info.get("span_started_at")
+    if parent is None or not started:
+        return
+    span = Span(
+        parent.trace, "db.execute", parent.span_id,
+        {"db.statement": " ".join(statement.split())[:500]}, kind="client",
+    )
+    span.start_ns = started.pop()
+    span.end()
+
+
+def trace_engine(engine):
+    """Record a span per SQL statement executed within a sampled request."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# -------------------------
+# EXPORT
+# -------------------------
+def _otlp_attributes(attributes: dict) -> list[dict]:
+    out = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            out.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            out.append({"key": key, "value": {"intValue": str(value)}})
+        else:
+            out.append({"key": key, "value": {"stringValue": str(value)}})
+    return out
+
+
+def _otlp_payload(traces: list[Trace]) -> dict:
+    spans = []
+    for trace in traces:
+        for span in trace.spans:
+            otlp_span = {
+                "traceId": trace.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": SPAN_KINDS[span.kind],
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": _otlp_attributes(span.attributes),
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 0},
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            spans.append(otlp_span)
+    return {"resourceSpans": [{
+        "resource": {"attributes": _otlp_attributes({"service.name": "rupaya-api"})},
+        "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": spans}],
+    }]}
+
+
+class TraceExporter:
+    def __init__(self, path: str | None, otlp_endpoint: str | None):
+        self.path = path
+        self.otlp_endpoint = otlp_endpoint
+        self._pending: list[Trace] = []
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.TRACE_SAMPLE_RATE > 0 and bool(self.path or self.otlp_endpoint)
+
+    def submit(self, trace: Trace):
+        if len(self._pending) >= MAX_PENDING_TRACES:
+            self.dropped += 1
+            return
+        self._pending.append(trace)
+
+    def _write_file(self, traces: list[Trace]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for trace in traces:
+                for span in trace.spans:
+                    f.write(json.dumps({
+                        "trace_id": trace.trace_id,
+                        "span_id": span.span_id,
+                        "parent_id": span.parent_id,
+                        "name": span.name,
+                        "start_ns": span.start_ns,
+                        "duration_ms": round((span.end_ns - span.start_ns) / 1e6, 3),
+                        "attributes": span.attributes,
+                        "error": span.error,
+                    }, default=str) + "\n")
+
+    async def flush(self, client=None):
+        traces, self._pending = self._pending, []
+        if not traces:
+            return
+        if self.path:
+            await asyncio.to_thread(self._write_file, traces)
+        if self.otlp_endpoint and client is not None:
+            await client.post(self.otlp_endpoint, json=_otlp_payload(traces))
+
+    async def run(self):
+        """Export buffered traces every few seconds until cancelled."""
+        # httpx (with its CLI extras) is slow to import; only load it when exporting
+        import httpx
+
+        async with httpx.AsyncClient(timeout=5) as client:
+            try:
+                while True:
+                    await asyncio.sleep(EXPORT_INTERVAL_SECONDS)
+                    try:
+                        await self.flush(client)
+                    except Exception:
+                        logger.warning("Trace export failed", exc_info=True)
+            finally:
+                try:
+                    await self.flush(client)
+                except Exception:
+                    logger.warning("Final trace export failed", exc_info=True)
+
+
+@functools.lru_cache
+def get_exporter() -> TraceExporter:
+    return TraceExporter(settings.TRACE_EXPORT_PATH, settings.TRACE_OTLP_ENDPOINT)
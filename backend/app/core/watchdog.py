@@ -0,0 +1,118 @@
+# app/core/watchdog.py
+"""
+Event loop blocking detector.
+
+A heartbeat task stamps the time every HEARTBEAT_SECONDS. A watchdog thread
+checks the stamp; once it is older than the threshold, the loop is stuck in a
+synchronous callback, so the thread captures the loop thread's stack right then
+and, when the loop recovers, reports the stall with its duration and the route
+of the request whose task was running.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from functools import lru_cache
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 0.02
+CHECK_SECONDS = 0.01
+MAX_STACK_FRAMES = 30
+
+loop_stalls = registry.counter(
+    "rupaya_event_loop_stalls_total", "Callbacks that blocked the event loop past the threshold",
+    labels=("route",),
+)
+loop_stall_duration = registry.histogram(
+    "rupaya_event_loop_stall_seconds", "Duration of event loop stalls",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+class LoopWatchdog:
+    def __init__(self, threshold_ms: float):
+        self.threshold = threshold_ms / 1000
+        self._last_beat = time.monotonic()
+        self._tasks: weakref.WeakKeyDictionary[asyncio.Task, dict] = weakref.WeakKeyDictionary()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._heartbeat: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def tag_current_task(self, scope: dict):
+        """Remember which request the running task serves, for stall reports."""
+        task = asyncio.current_task()
+        if task is not None:
+            self._tasks[task] = scope
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat = asyncio.create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._heartbeat.cancel()
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
+
+    async def _beat(self):
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+
+    def _route_of(self, task) -> str:
+        scope = self._tasks.get(task) if task is not None else None
+        if scope is None:
+            return "background"
+        route = scope.get("route")
+        return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+    def _watch(self):
+        stalled_since = None
+        stack = route = None
+        while not self._stop.wait(CHECK_SECONDS):
+            last_beat = self._last_beat
+            late = time.monotonic() - last_beat - HEARTBEAT_SECONDS
+
+            if stalled_since is None:
+                if late > self.threshold:
+                    # Capture the culprit while it is still on the stack
+                    stalled_since = last_beat + HEARTBEAT_SECONDS
+                    frame = sys._current_frames().get(self._loop_thread_id)
+                    stack = "".join(traceback.format_stack(frame, limit=MAX_STACK_FRAMES)) if frame else ""
+                    route = self._route_of(asyncio.current_task(self._loop))
+            elif late <= self.threshold:
+                duration = last_beat - stalled_since
+                loop_stalls.inc(route)
+                loop_stall_duration.observe(duration)
+                logger.warning(
+                    "Event loop blocked for %.0fms in %s; stack at detection:\n%s",
+                    duration * 1000, route, stack,
+                )
+                stalled_since = None
+
+
+@lru_cache
+def get_loop_watchdog() -> LoopWatchdog:
+    return LoopWatchdog(settings.LOOP_STALL_THRESHOLD_MS)
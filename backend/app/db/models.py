@@ -1,8 +1,8 @@
 import uuid
-from datetime import datetime
-from enum import Enum
-from sqlalchemy import Column, String, Boolean, Float, DateTime, ForeignKey, Enum as SAEnum, text, Table, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from datetime import UTC, datetime
+from enum import Enum, StrEnum
+from sqlalchemy import BigInteger, Column, String, Boolean, Float, DateTime, ForeignKey, ForeignKeyConstraint, Enum as SAEnum, Identity, Index, LargeBinary, text, Table, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -19,6 +19,17 @@ class SplitType(str, Enum):
     EQUAL = "EQUAL"
     EXACT = "EXACT"
 
+class ChangeEntity(StrEnum):
+    GROUP = "GROUP"
+    MEMBER = "MEMBER"
+    BILL = "BILL"
+    SHARE = "SHARE"
+
+class ChangeAction(StrEnum):
+    CREATED = "CREATED"
+    UPDATED = "UPDATED"
+    DELETED = "DELETED"
+
 class User(Base):
     __tablename__ = "User"
 
@@ -28,9 +39,9 @@ class User(Base):
     password = Column(String, nullable=False)
     role = Column(SAEnum(Role, name="Role"), default=Role.USER)
     
-    created_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True, index=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True, index=True)
-    deleted_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True, index=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True)
+    updated_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True)
+    deleted_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
     updated_at = Column(DateTime(timezone=True), nullable=True)
@@ -53,14 +64,17 @@ class Group(Base):
     name = Column(String, nullable=False, index=True)
     description = Column(String, nullable=True)
     
-    created_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True, index=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True, index=True)
-    deleted_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True, index=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True)
+    updated_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True)
+    deleted_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
     updated_at = Column(DateTime(timezone=True), nullable=True)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Bumped by every write to the group, its members or its bills; drives ETags
+    revision = Column(BigInteger, nullable=False, server_default=text("0"))
+
     members = relationship("GroupMember", back_populates="group")
     bills = relationship("Bill", back_populates="group")
 
@@ -71,9 +85,9 @@ class GroupMember(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="CASCADE"), nullable=False, index=True)
     group_id = Column(UUID(as_uuid=True), ForeignKey("Group.id", ondelete="CASCADE"), nullable=False, index=True)
     
-    created_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="RESTRICT"), nullable=False, index=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True, index=True)
-    deleted_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True, index=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="RESTRICT"), nullable=False)
+    updated_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True)
+    deleted_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True)
     
     role = Column(SAEnum(GroupRole, name="GroupRole"), default=GroupRole.MEMBER)
     
@@ -86,6 +100,9 @@ class GroupMember(Base):
     
     __table_args__ = (
         UniqueConstraint('user_id', 'group_id', name='unique_user_group'),
+        # Membership checks use unique_user_group; listing a user's groups only
+        # needs their active memberships
+        Index("ix_GroupMember_user_id_active", user_id, postgresql_where=deleted_at.is_(None)),
     )
 
 class Bill(Base):
@@ -94,15 +111,19 @@ class Bill(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     group_id = Column(UUID(as_uuid=True), ForeignKey("Group.id", ondelete="CASCADE"), nullable=False, index=True)
     paid_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="RESTRICT"), nullable=False, index=True)
-    created_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="RESTRICT"), nullable=False, index=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True, index=True)
-    deleted_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True, index=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="RESTRICT"), nullable=False)
+    updated_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True)
+    deleted_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True)
     
     description = Column(String, nullable=False)
     total_amount = Column(Float, nullable=False)
     split_type = Column(SAEnum(SplitType, name="SplitType"), default=SplitType.EQUAL)
     
-    created_at = Column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
+    # Partition key, so part of the table's primary key; set client-side so shares can copy it
+    created_at = Column(
+        DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(UTC),
+        server_default=text("now()"), nullable=False,
+    )
     updated_at = Column(DateTime(timezone=True), nullable=True)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
 
@@ -110,16 +131,28 @@ class Bill(Base):
     payer = relationship("User", foreign_keys=[paid_by])
     shares = relationship("BillShare", back_populates="bill")
 
+    __table_args__ = (
+        # Group bill pages: newest first, live bills only
+        Index(
+            "ix_Bill_group_id_created_at_active", group_id, created_at.desc(),
+            postgresql_where=deleted_at.is_(None),
+        ),
+        # Monthly partitions; see app/db/partitions.py
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    # Ids are unique on their own
+    __mapper_args__ = {"primary_key": [id]}
+
 class BillShare(Base):
     __tablename__ = "BillShare"
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
-    bill_id = Column(UUID(as_uuid=True), ForeignKey("Bill.id", ondelete="CASCADE"), nullable=False, index=True)
+    bill_id = Column(UUID(as_uuid=True), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="CASCADE"), nullable=False, index=True)
     
-    created_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True, index=True)
-    updated_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True, index=True)
-    deleted_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True, index=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True)
+    updated_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True)
+    deleted_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True)
     
     amount = Column(Float, nullable=False)
     paid = Column(Boolean, default=False)
@@ -127,10 +160,87 @@ class BillShare(Base):
     created_at = Column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
     updated_at = Column(DateTime(timezone=True), nullable=True)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # The bill's created_at: keeps a bill and its shares in the same monthly partition
+    bill_created_at = Column(DateTime(timezone=True), primary_key=True, nullable=False)
+    # Set when the share was paid off by a settle-up
+    settlement_id = Column(UUID(as_uuid=True), ForeignKey("Settlement.id", ondelete="SET NULL"), nullable=True)
 
     bill = relationship("Bill", back_populates="shares")
     user = relationship("User", foreign_keys=[user_id])
 
     __table_args__ = (
-        UniqueConstraint('bill_id', 'user_id', name='unique_bill_user'),
+        ForeignKeyConstraint(
+            [bill_id, bill_created_at], ["Bill.id", "Bill.created_at"],
+            name="BillShare_bill_id_fkey", ondelete="CASCADE",
+        ),
+        UniqueConstraint('bill_id', 'user_id', 'bill_created_at', name='unique_bill_user'),
+        # Balances and summaries only aggregate unpaid shares
+        Index("ix_BillShare_user_id_unpaid", user_id, postgresql_where=text("paid = false")),
+        {"postgresql_partition_by": "RANGE (bill_created_at)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
+
+class Settlement(Base):
+    """A payment between two group members; the shares it paid off reference it."""
+    __tablename__ = "Settlement"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    group_id = Column(UUID(as_uuid=True), ForeignKey("Group.id", ondelete="CASCADE"), nullable=False)
+    from_user_id = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="RESTRICT"), nullable=False)
+    to_user_id = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="RESTRICT"), nullable=False)
+    amount = Column(Float, nullable=False)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("User.id", ondelete="SET NULL"), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
+
+    from_user = relationship("User", foreign_keys=[from_user_id])
+    to_user = relationship("User", foreign_keys=[to_user_id])
+
+    __table_args__ = (
+        Index("ix_Settlement_group_id_created_at", group_id, created_at.desc()),
+    )
+
+class BillArchive(Base):
+    """Settled bills moved out of Bill/BillShare; `data` is the zlib-compressed BillResponse JSON."""
+    __tablename__ = "BillArchive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    group_id = Column(UUID(as_uuid=True), ForeignKey("Group.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+class GroupChange(Base):
+    """Append-only change log; the id doubles as the delta-sync cursor."""
+    __tablename__ = "GroupChange"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    group_id = Column(UUID(as_uuid=True), ForeignKey("Group.id", ondelete="CASCADE"), nullable=False)
+    revision = Column(BigInteger, nullable=False)
+
+    entity_type = Column(SAEnum(ChangeEntity, name="ChangeEntity"), nullable=False)
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    action = Column(SAEnum(ChangeAction, name="ChangeAction"), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
+
+    __table_args__ = (
+        # Sync cursors are per-group revisions
+        Index("ix_GroupChange_group_id_revision", "group_id", "revision"),
+    )
+
+class OutboxEvent(Base):
+    """Domain events written in the same transaction as the change; relayed to Redis Streams."""
+    __tablename__ = "OutboxEvent"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    event_type = Column(String, nullable=False)
+    group_id = Column(UUID(as_uuid=True), nullable=False)
+    payload = Column(JSONB, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
+    published_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_OutboxEvent_unpublished", "id", postgresql_where=text("published_at IS NULL")),
     )
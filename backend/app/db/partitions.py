@@ -0,0 +1,78 @@
+# app/db/partitions.py
+"""
+Monthly range partitions of Bill (by created_at) and BillShare (by the
+denormalized bill_created_at, so a bill and its shares share a month).
+
+The `create_bill_partitions` job keeps MONTHS_AHEAD months of partitions ready.
+Rows outside every monthly partition land in the DEFAULT partitions; a month
+cannot be created while its rows sit there, so those failures are logged.
+"""
+import logging
+from datetime import UTC, date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# (table, partition key)
+PARTITIONED_TABLES = (("Bill", "created_at"), ("BillShare", "bill_created_at"))
+MONTHS_AHEAD = 3
+# Creating a partition locks the parent; give up rather than queue behind long queries
+LOCK_TIMEOUT = "5s"
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+async def existing_partitions(db: AsyncSession, table: str) -> set[str]:
+    result = await db.execute(
+        text("""
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :table
+        """),
+        {"table": table},
+    )
+    return set(result.scalars())
+
+
+async def ensure_bill_partitions(
+    db: AsyncSession, months_ahead: int = MONTHS_AHEAD, since: date | None = None,
+) -> list[str]:
+    """
+    Create any missing monthly partitions from this month (or the month of
+    `since`, for backfills) to `months_ahead` months out.
+    """
+    today = datetime.now(UTC).date()
+    this_month = date(today.year, today.month, 1)
+    first = date(since.year, since.month, 1) if since else this_month
+    months = (this_month.year - first.year) * 12 + this_month.month - first.month + months_ahead
+    created = []
+
+    for table, _ in PARTITIONED_TABLES:
+        existing = await existing_partitions(db, table)
+        for offset in range(months + 1):
+            start = add_months(first, offset)
+            name = partition_name(table, start)
+            if name in existing:
+                continue
+            try:
+                await db.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+                await db.execute(text(
+                    f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+                    f"FOR VALUES FROM ('{start} 00:00:00+00') TO ('{add_months(start, 1)} 00:00:00+00')"
+                ))
+                await db.commit()
+                created.append(name)
+            except Exception:
+                await db.rollback()
+                logger.exception("Could not create partition %s", name)
+    return created
@@ -0,0 +1,130 @@
+# app/db/query_stats.py
+"""
+Per-request SQL statistics.
+
+Cursor-execute hooks on the engine count statements and database time into a
+QueryStats held in a context variable. The request middleware opens one per
+request; `query_budget` opens one around any block of code:
+
+    async with query_budget(4):
+        await GroupService(db).get_user_groups(user_id)
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# The same statement repeated this many times in one request is reported as a likely N+1
+N_PLUS_ONE_THRESHOLD = 5
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter[str] = Counter()
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int]]:
+        """Statements executed at least `threshold` times, most frequent first."""
+        return [(s, n) for s, n in self.statements.most_common() if n >= threshold]
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+class LazyLoadError(AssertionError):
+    """Raised in development when a relationship is loaded implicitly."""
+
+
+def current_query_stats() -> QueryStats | None:
+    return _current.get()
+
+
+def start_query_stats() -> tuple[QueryStats, object]:
+    stats = QueryStats()
+    return stats, _current.set(stats)
+
+
+def stop_query_stats(token):
+    _current.reset(token)
+
+
+def report_n_plus_one(stats: QueryStats, label: str):
+    for statement, times in stats.repeated():
+        logger.warning(
+            "Possible N+1 in %s: statement executed %s times: %s",
+            label, times, " ".join(statement.split())[:300],
+        )
+
+
+# -------------------------
+# ENGINE HOOKS
+# -------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_started_at")
+    if started:
+        stats.duration += time.perf_counter() - started.pop()
+    stats.count += 1
+    stats.statements[statement] += 1
+
+
+def _raise_on_lazy_load(orm_execute_state):
+    # Only ORM selects carry load state; text() and DML statements pass through
+    if not orm_execute_state.is_select:
+        return
+    state = orm_execute_state.lazy_loaded_from
+    if state is not None:
+        raise LazyLoadError(
+            f"Implicit lazy load from {state.class_.__name__}; "
+            "load the relationship explicitly (selectinload/joinedload)"
+        )
+
+
+def instrument_engine(engine: AsyncEngine, raise_on_lazy_load: bool = False):
+    """Attach the statement counters (and optionally the lazy-load guard) to an engine."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    if raise_on_lazy_load:
+        event.listen(Session, "do_orm_execute", _raise_on_lazy_load)
+
+
+# -------------------------
+# BUDGETS
+# -------------------------
+@asynccontextmanager
+async def query_budget(max_queries: int, label: str = "block"):
+    """
+    Fail with AssertionError when the wrapped code issues more than `max_queries`
+    statements. Intended for tests, so N+1 regressions break the build.
+    """
+    stats, token = start_query_stats()
+    try:
+        yield stats
+    finally:
+        stop_query_stats(token)
+
+    if stats.count > max_queries:
+        repeated = "; ".join(f"{n}x {' '.join(s.split())[:120]}" for s, n in stats.repeated(2))
+        raise AssertionError(
+            f"{label} issued {stats.count} queries, budget is {max_queries}"
+            + (f" (repeated: {repeated})" if repeated else "")
+        )
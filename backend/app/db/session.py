@@ -1,10 +1,19 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
 
 from sqlalchemy.engine.url import make_url
 
+from app.core.config import settings
+from app.core.metrics import db_pool_wait, register_pool_metrics
+from app.core.tracing import trace_engine
+from app.db.query_stats import instrument_engine
+from app.db.slow_query import SlowQueryLog
+
 load_dotenv()
 
 db_url_str = os.getenv("DATABASE_URL")
@@ -22,8 +31,101 @@ if db_url_str:
     
     DATABASE_URL = url_obj.render_as_string(hide_password=False)
 
-engine = create_async_engine(DATABASE_URL, echo=True)
-AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_wait.observe(time.perf_counter() - start)
+
+
+_engine: AsyncEngine | None = None
+
+
+def get_engine() -> AsyncEngine:
+    """
+    The application's engine, created on first use (normally in the app lifespan)
+    so importing the app does not load the database driver.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            DATABASE_URL,
+            echo=settings.SQL_ECHO,
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=True,
+            pool_recycle=1800,
+        )
+        register_pool_metrics(_engine)
+        # Implicit lazy loads raise in development so N+1 patterns surface early
+        instrument_engine(_engine, raise_on_lazy_load=settings.is_development)
+        trace_engine(_engine)
+        SlowQueryLog(
+            settings.SLOW_QUERY_MS,
+            explain=settings.SLOW_QUERY_EXPLAIN,
+            log_path=settings.SLOW_QUERY_LOG_PATH,
+            database_url=DATABASE_URL,
+        ).attach(_engine)
+    return _engine
+
+
+class LazySessionMaker(async_sessionmaker):
+    """Session factory that binds to the engine the first time a session is made."""
+
+    def __call__(self, **local_kw) -> AsyncSession:
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+AsyncSessionLocal = LazySessionMaker(class_=AsyncSession, expire_on_commit=False)
+
+
+async def prewarm_pool(connections: int | None = None):
+    """Open the steady-state pool up front so the first requests skip connection setup."""
+    if connections is None:
+        connections = settings.db_pool_size
+    engine = get_engine()
+    opened = asyncio.Semaphore(0)
+    release = asyncio.Event()
+
+    async def open_one():
+        # Hold each connection until all are open, so they are distinct connections
+        try:
+            async with engine.connect() as conn:
+                await conn.exec_driver_sql("SELECT 1")
+                opened.release()
+                await release.wait()
+        except Exception:
+            opened.release()
+            raise
+
+    tasks = [asyncio.create_task(open_one()) for _ in range(connections)]
+    try:
+        async with asyncio.timeout(settings.DB_POOL_TIMEOUT):
+            for _ in tasks:
+                await opened.acquire()
+    except TimeoutError:
+        pass
+    finally:
+        release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors:
+        raise errors[0]
+
+
+async def dispose_engine():
+    if _engine is not None:
+        await _engine.dispose()
+
 
 async def get_db():
     async with AsyncSessionLocal() as session:
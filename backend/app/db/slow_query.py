@@ -0,0 +1,144 @@
+# app/db/slow_query.py
+"""
+Slow-query log.
+
+Statements slower than SLOW_QUERY_MS are written as JSON lines with their
+normalized SQL, parameter shape, duration and the service method that issued
+them. With SLOW_QUERY_EXPLAIN enabled, a plan is captured in the background on
+a separate connection (EXPLAIN ANALYZE for SELECTs, plain EXPLAIN otherwise, in
+a rolled-back transaction) and logged as a follow-up entry.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from datetime import UTC, datetime
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.tracing import current_operation
+
+logger = logging.getLogger("app.db.slow_query")
+
+# Capture each query shape's plan at most this often, and only a few at once
+EXPLAIN_INTERVAL_SECONDS = 600
+MAX_CONCURRENT_EXPLAINS = 2
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\$\d+(?:\s*,\s*\$\d+)+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace, literals and expanded IN lists so equivalent queries group together."""
+    sql = " ".join(statement.split())
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("$n, ...", sql)
+    # Keep $1-style placeholders, replace bare numbers
+    return re.sub(r"(?<!\$)" + _NUMBER_LITERAL.pattern, "?", sql)
+
+
+def parameter_shape(parameters, executemany: bool) -> dict:
+    """Describe parameters by type and count without logging their values."""
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "row": parameter_shape(rows[0], False) if rows else None}
+    values = parameters.values() if isinstance(parameters, dict) else (parameters or ())
+    types: dict[str, int] = {}
+    for value in values:
+        name = type(value).__name__
+        types[name] = types.get(name, 0) + 1
+    return {"count": sum(types.values()), "types": types}
+
+
+class SlowQueryLog:
+    def __init__(
+        self, threshold_ms: float, explain: bool = False,
+        log_path: str | None = None, database_url: str | None = None,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain and bool(database_url)
+        self.database_url = database_url
+        self._explained: dict[str, float] = {}
+        self._explaining = 0
+        self._explain_engine: AsyncEngine | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+        if log_path:
+            handler = RotatingFileHandler(log_path, maxBytes=10 * 1024 * 1024, backupCount=5)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.propagate = False
+
+    def attach(self, engine: AsyncEngine):
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_started_at", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("slow_query_started_at")
+        if not started:
+            return
+        duration = time.perf_counter() - started.pop()
+        if duration < self.threshold:
+            return
+
+        sql = normalize_sql(statement)
+        fingerprint = hashlib.blake2b(sql.encode(), digest_size=8).hexdigest()
+        self._write({
+            "type": "slow_query",
+            "fingerprint": fingerprint,
+            "duration_ms": round(duration * 1000, 2),
+            "operation": current_operation(),
+            "sql": sql,
+            "parameters": parameter_shape(parameters, executemany),
+        })
+        if self.explain and not executemany:
+            self._schedule_explain(fingerprint, statement, parameters)
+
+    def _write(self, entry: dict):
+        entry["ts"] = datetime.now(UTC).isoformat()
+        logger.warning(json.dumps(entry, default=str))
+
+    # -------------------------
+    # EXPLAIN CAPTURE
+    # -------------------------
+    def _schedule_explain(self, fingerprint: str, statement: str, parameters):
+        now = time.monotonic()
+        if now - self._explained.get(fingerprint, -EXPLAIN_INTERVAL_SECONDS) < EXPLAIN_INTERVAL_SECONDS:
+            return
+        if self._explaining >= MAX_CONCURRENT_EXPLAINS:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self._explained[fingerprint] = now
+        self._explaining += 1
+        task = loop.create_task(self._explain(fingerprint, statement, parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, fingerprint: str, statement: str, parameters):
+        analyze = statement.lstrip().upper().startswith(("SELECT", "WITH"))
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+        try:
+            if self._explain_engine is None:
+                self._explain_engine = create_async_engine(self.database_url, poolclass=NullPool)
+            async with self._explain_engine.connect() as conn:
+                result = await conn.exec_driver_sql(f"EXPLAIN ({options}) {statement}", parameters)
+                plan = result.scalar()
+                await conn.rollback()
+            self._write({"type": "plan", "fingerprint": fingerprint, "analyze": analyze, "plan": plan})
+        except Exception as exc:
+            logger.debug("EXPLAIN failed for %s: %s", fingerprint, exc)
+        finally:
+            self._explaining -= 1
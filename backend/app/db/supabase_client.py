@@ -1,5 +1,14 @@
-from supabase import Client, create_client
+from functools import lru_cache
 
 from app.core.config import settings
 
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+
+@lru_cache
+def get_supabase():
+    """
+    Supabase client, created on first use. The SDK is an optional dependency
+    (`uv sync --extra supabase`) and slow to import, so it is never loaded at startup.
+    """
+    from supabase import create_client
+
+    return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
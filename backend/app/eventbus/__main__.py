@@ -0,0 +1,33 @@
+"""
+Run the outbox relay and every registered stream consumer:
+
+    python -m app.eventbus
+"""
+import asyncio
+import logging
+import signal
+
+from app.eventbus.handlers import CONSUMERS
+from app.eventbus.monitor import report_lag
+from app.eventbus.relay import OutboxRelay
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    relay = OutboxRelay()
+    await asyncio.gather(
+        relay.run(stop),
+        report_lag(stop, relay),
+        *(consumer.run(stop) for consumer in CONSUMERS),
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
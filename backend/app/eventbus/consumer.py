@@ -0,0 +1,138 @@
+# app/eventbus/consumer.py
+import asyncio
+import json
+import logging
+import os
+import socket
+from collections.abc import Awaitable, Callable
+
+from redis.exceptions import ResponseError
+
+from app.core.redis import redis_client
+from app.eventbus.outbox import STREAM, EventType
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], Awaitable[None]]
+
+
+class StreamConsumer:
+    """
+    Consumer-group worker for the domain event stream.
+
+    Handlers are registered per event type with `on`. A message is acknowledged
+    only after all its handlers succeed; failed messages stay pending and are
+    reclaimed after `claim_idle_ms`, so delivery is at-least-once. Messages
+    delivered more than `max_deliveries` times are moved to a dead-letter stream.
+    """
+
+    def __init__(
+        self,
+        group: str,
+        consumer_name: str | None = None,
+        stream: str = STREAM,
+        batch_size: int = 100,
+        block_ms: int = 5000,
+        claim_idle_ms: int = 60_000,
+        max_deliveries: int = 5,
+    ):
+        self.group = group
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.stream = stream
+        self.dead_letter_stream = f"{stream}:dead"
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+        self._handlers: dict[str, list[Handler]] = {}
+
+    def on(self, *event_types: EventType):
+        """Decorator registering a handler for one or more event types."""
+        def decorator(func: Handler) -> Handler:
+            for event_type in event_types:
+                self._handlers.setdefault(event_type.value, []).append(func)
+            return func
+        return decorator
+
+    async def ensure_group(self):
+        try:
+            await redis_client.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as err:
+            if "BUSYGROUP" not in str(err):
+                raise
+
+    async def lag(self) -> dict:
+        """Pending (delivered, unacked) and lag (not yet delivered) counts for this group."""
+        for info in await redis_client.xinfo_groups(self.stream):
+            if info["name"] == self.group:
+                return {"pending": info["pending"], "lag": info.get("lag")}
+        return {"pending": 0, "lag": None}
+
+    async def _handle(self, message_id: str, fields: dict) -> bool:
+        event = {
+            "id": int(fields["id"]),
+            "type": fields["type"],
+            "group_id": fields["group_id"],
+            "payload": json.loads(fields["payload"]),
+            "created_at": fields["created_at"],
+        }
+        try:
+            for handler in self._handlers.get(event["type"], ()):
+                await handler(event)
+        except Exception:
+            logger.exception("Handler failed for %s event %s", event["type"], message_id)
+            return False
+        return True
+
+    async def _process(self, messages: list) -> None:
+        acked = []
+        for message_id, fields in messages:
+            if fields is None:
+                # Trimmed from the stream while pending
+                acked.append(message_id)
+            elif await self._handle(message_id, fields):
+                acked.append(message_id)
+        if acked:
+            await redis_client.xack(self.stream, self.group, *acked)
+
+    async def _reclaim(self) -> None:
+        """Take over messages left pending by crashed or failing consumers."""
+        _, messages, *_ = await redis_client.xautoclaim(
+            self.stream, self.group, self.consumer_name,
+            min_idle_time=self.claim_idle_ms, start_id="0-0", count=self.batch_size,
+        )
+        if not messages:
+            return
+
+        retry = []
+        for message_id, fields in messages:
+            pending = await redis_client.xpending_range(
+                self.stream, self.group, min=message_id, max=message_id, count=1
+            )
+            if pending and pending[0]["times_delivered"] > self.max_deliveries:
+                if fields is not None:
+                    await redis_client.xadd(self.dead_letter_stream, {**fields, "group": self.group})
+                await redis_client.xack(self.stream, self.group, message_id)
+                logger.error("Moved event %s to %s", message_id, self.dead_letter_stream)
+            else:
+                retry.append((message_id, fields))
+        await self._process(retry)
+
+    async def run(self, stop: asyncio.Event | None = None):
+        stop = stop or asyncio.Event()
+        await self.ensure_group()
+        logger.info("Consumer %s/%s started", self.group, self.consumer_name)
+        while not stop.is_set():
+            try:
+                await self._reclaim()
+                res = await redis_client.xreadgroup(
+                    self.group, self.consumer_name, {self.stream: ">"},
+                    count=self.batch_size, block=self.block_ms,
+                )
+                for _, messages in res or []:
+                    await self._process(messages)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Consumer %s failed, retrying", self.group)
+                await asyncio.sleep(1)
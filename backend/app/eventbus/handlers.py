@@ -0,0 +1,36 @@
+# app/eventbus/handlers.py
+"""
+Consumer groups for the domain event stream.
+
+Every consumer group sees every event once. To react to events outside the
+request path, create a StreamConsumer here, register handlers on it and add it
+to CONSUMERS:
+
+    balances = StreamConsumer("balances")
+
+    @balances.on(EventType.BILL_CREATED, EventType.SHARE_PAID)
+    async def recompute(event: dict): ...
+
+Handlers must be idempotent: an event can be delivered more than once, and
+event["id"] (the outbox id) can be used to deduplicate.
+"""
+from app.core.events import publish_group_event
+from app.eventbus.consumer import StreamConsumer
+from app.eventbus.outbox import EventType
+
+group_events = StreamConsumer("group_events")
+
+
+@group_events.on(EventType.GROUP_CHANGED)
+async def notify_subscribers(event: dict):
+    """Fan a committed revision out to the SSE/WebSocket subscribers of every API worker."""
+    # A redelivery repeats a revision the client already has, which it ignores
+    await publish_group_event(event["group_id"], {
+        "type": "change",
+        "group_id": event["group_id"],
+        "revision": event["payload"]["revision"],
+        "changes": event["payload"]["changes"],
+    })
+
+
+CONSUMERS: list[StreamConsumer] = [group_events]
@@ -0,0 +1,77 @@
+# app/eventbus/monitor.py
+"""
+Outbox backlog and consumer lag, as gauges and a periodic log line.
+
+The numbers come from Postgres and Redis, so every process reports the same
+values: aggregate them with max(), not sum().
+"""
+import asyncio
+import logging
+import time
+
+from app.core.metrics import registry
+from app.core.redis import redis_client
+from app.eventbus.handlers import CONSUMERS
+from app.eventbus.outbox import STREAM
+from app.eventbus.relay import OutboxRelay
+
+logger = logging.getLogger(__name__)
+
+LAG_REPORT_INTERVAL = 60
+# /metrics refreshes at most this often, however frequently it is scraped
+REFRESH_SECONDS = 10
+
+outbox_backlog = registry.gauge(
+    "rupaya_outbox_backlog", "Committed outbox events not yet relayed to the stream"
+)
+consumer_lag = registry.gauge(
+    "rupaya_eventbus_consumer_lag", "Stream entries not yet delivered to the consumer group", labels=("consumer",)
+)
+consumer_pending = registry.gauge(
+    "rupaya_eventbus_consumer_pending", "Entries delivered to the consumer group but not acknowledged",
+    labels=("consumer",),
+)
+
+_last_refresh = 0.0
+
+
+async def collect_lag(relay: OutboxRelay | None = None) -> dict:
+    """Update the gauges and return {"backlog": n, "consumers": {group: {...}}}."""
+    backlog = await (relay or OutboxRelay()).backlog()
+    outbox_backlog.set(backlog)
+
+    groups = {info["name"]: info for info in await redis_client.xinfo_groups(STREAM)}
+    consumers = {}
+    for consumer in CONSUMERS:
+        info = groups.get(consumer.group, {})
+        lag, pending = info.get("lag"), info.get("pending", 0)
+        # Redis reports no lag when it cannot tell (entries trimmed); keep the last value then
+        if lag is not None:
+            consumer_lag.set(lag, consumer.group)
+        consumer_pending.set(pending, consumer.group)
+        consumers[consumer.group] = {"lag": lag, "pending": pending}
+    return {"backlog": backlog, "consumers": consumers}
+
+
+async def refresh_metrics():
+    """Refresh the gauges before a scrape; failures leave the previous values."""
+    global _last_refresh
+    if time.monotonic() - _last_refresh < REFRESH_SECONDS:
+        return
+    _last_refresh = time.monotonic()
+    try:
+        await collect_lag()
+    except Exception:
+        logger.warning("Could not collect event bus lag", exc_info=True)
+
+
+async def report_lag(stop: asyncio.Event, relay: OutboxRelay | None = None):
+    while not stop.is_set():
+        try:
+            logger.info("Event bus lag: %s", await collect_lag(relay))
+        except Exception:
+            logger.warning("Lag report failed", exc_info=True)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=LAG_REPORT_INTERVAL)
+        except TimeoutError:
+            pass
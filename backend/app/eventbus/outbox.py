@@ -0,0 +1,34 @@
+# app/eventbus/outbox.py
+from enum import StrEnum
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import OutboxEvent
+
+# Redis stream the relay publishes outbox rows to
+STREAM = "rupaya:events"
+
+
+class EventType(StrEnum):
+    BILL_CREATED = "bill.created"
+    BILL_UPDATED = "bill.updated"
+    SHARE_PAID = "share.paid"
+    SHARE_UNPAID = "share.unpaid"
+    SETTLEMENT_RECORDED = "settlement.recorded"
+    MEMBER_ADDED = "member.added"
+    GROUP_DELETED = "group.deleted"
+    # Every revision bump; fanned out to live subscribers by the group_events consumer
+    GROUP_CHANGED = "group.changed"
+
+
+def add_outbox_event(db: AsyncSession, event_type: EventType, group_id: UUID | str, **payload):
+    """
+    Stage a domain event in the current transaction.
+    It becomes visible to the relay only if the surrounding transaction commits.
+    """
+    db.add(OutboxEvent(
+        event_type=event_type.value,
+        group_id=group_id,
+        payload={key: str(value) if isinstance(value, UUID) else value for key, value in payload.items()},
+    ))
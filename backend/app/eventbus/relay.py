@@ -0,0 +1,113 @@
+# app/eventbus/relay.py
+import asyncio
+import json
+import logging
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, func, select, update
+
+from app.core.redis import redis_client
+from app.db.models import OutboxEvent
+from app.db.session import AsyncSessionLocal
+from app.eventbus.outbox import STREAM
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """
+    Moves committed outbox rows to the Redis stream in batches.
+    Rows are locked with SKIP LOCKED so several relays can run side by side.
+    A crash between XADD and the commit re-publishes the batch, so delivery is
+    at-least-once and consumers deduplicate on the outbox id.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        poll_interval: float = 0.5,
+        stream_maxlen: int = 1_000_000,
+        retention: timedelta = timedelta(days=1),
+    ):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.stream_maxlen = stream_maxlen
+        self.retention = retention
+
+    async def relay_batch(self) -> int:
+        """Publish one batch of pending rows. Returns the number of rows published."""
+        async with AsyncSessionLocal() as db:
+            stmt = (
+                select(OutboxEvent)
+                .where(OutboxEvent.published_at.is_(None))
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            res = await db.execute(stmt)
+            events = res.scalars().all()
+            if not events:
+                return 0
+
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for event in events:
+                    pipe.xadd(
+                        STREAM,
+                        {
+                            "id": event.id,
+                            "type": event.event_type,
+                            "group_id": str(event.group_id),
+                            "payload": json.dumps(event.payload),
+                            "created_at": event.created_at.isoformat(),
+                        },
+                        maxlen=self.stream_maxlen,
+                        approximate=True,
+                    )
+                await pipe.execute()
+
+            await db.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id.in_([e.id for e in events]))
+                .values(published_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            return len(events)
+
+    async def purge_published(self) -> int:
+        """Delete rows published longer ago than the retention window."""
+        cutoff = datetime.now(UTC) - self.retention
+        async with AsyncSessionLocal() as db:
+            res = await db.execute(
+                delete(OutboxEvent).where(
+                    OutboxEvent.published_at.is_not(None),
+                    OutboxEvent.published_at < cutoff,
+                )
+            )
+            await db.commit()
+            return res.rowcount
+
+    async def backlog(self) -> int:
+        """Number of committed rows not yet published."""
+        async with AsyncSessionLocal() as db:
+            res = await db.execute(
+                select(func.count()).select_from(OutboxEvent).where(OutboxEvent.published_at.is_(None))
+            )
+            return res.scalar() or 0
+
+    async def run(self, stop: asyncio.Event | None = None):
+        stop = stop or asyncio.Event()
+        logger.info("Outbox relay started (stream=%s)", STREAM)
+        while not stop.is_set():
+            try:
+                published = await self.relay_batch()
+            except Exception:
+                logger.exception("Outbox relay batch failed")
+                published = 0
+
+            # Drain continuously while there is a backlog, otherwise poll
+            if published < self.batch_size:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                except TimeoutError:
+                    pass
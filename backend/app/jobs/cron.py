@@ -0,0 +1,57 @@
+# app/jobs/cron.py
+from datetime import datetime
+
+from app.core.exceptions import ValidationError
+
+# (min, max) for minute, hour, day of month, month, day of week (0 = Sunday)
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+
+def _parse_field(field: str, low: int, high: int) -> set[int]:
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/", 1)
+            step = int(step_str)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_str, end_str = part.split("-", 1)
+            start, end = int(start_str), int(end_str)
+        else:
+            start = end = int(part)
+        if start < low or end > high or start > end or step < 1:
+            raise ValidationError(f"Invalid cron field '{field}'")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """
+    Minimal five-field cron expression: minute hour day-of-month month day-of-week.
+    Supports '*', lists, ranges and steps (e.g. '*/15', '1-5', '0,30').
+    As in standard cron, when both day-of-month and day-of-week are restricted
+    (neither starts with '*') a day matches if either does: '0 0 1 * 1' runs on
+    the 1st and on every Monday.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValidationError(f"Cron expression must have 5 fields: '{expression}'")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_field(f, low, high) for f, (low, high) in zip(fields, FIELD_RANGES, strict=True)
+        )
+        self.either_day = not fields[2].startswith("*") and not fields[4].startswith("*")
+
+    def matches(self, dt: datetime) -> bool:
+        day_matches = dt.day in self.days
+        weekday_matches = (dt.weekday() + 1) % 7 in self.weekdays
+        return (
+            dt.minute in self.minutes
+            and dt.hour in self.hours
+            and dt.month in self.months
+            and (day_matches or weekday_matches if self.either_day else day_matches and weekday_matches)
+        )
@@ -0,0 +1,65 @@
+# app/jobs/queue.py
+import json
+import time
+import uuid
+from uuid import UUID
+
+from app.core.redis import redis_client
+
+QUEUE_KEY = "jobs:queue"
+DELAYED_KEY = "jobs:delayed"
+PROCESSING_PREFIX = "jobs:processing:"
+WORKER_PREFIX = "jobs:worker:"
+
+# Finished jobs stay pollable for a week
+JOB_TTL_SECONDS = 7 * 24 * 3600
+
+
+def job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+async def enqueue(
+    name: str,
+    delay: float = 0,
+    owner: UUID | str | None = None,
+    max_retries: int | None = None,
+    **kwargs,
+) -> str:
+    """
+    Queue a registered job by name and return its id.
+    `owner` is the user allowed to poll the job's status.
+    """
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    record = {
+        "id": job_id,
+        "name": name,
+        "kwargs": json.dumps(kwargs, default=str),
+        "status": "scheduled" if delay > 0 else "queued",
+        "attempts": 0,
+        "owner": str(owner) if owner else "",
+        "enqueued_at": now,
+    }
+    if max_retries is not None:
+        record["max_retries"] = max_retries
+
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(job_key(job_id), mapping=record)
+        pipe.expire(job_key(job_id), JOB_TTL_SECONDS)
+        if delay > 0:
+            pipe.zadd(DELAYED_KEY, {job_id: now + delay})
+        else:
+            pipe.lpush(QUEUE_KEY, job_id)
+        await pipe.execute()
+    return job_id
+
+
+async def get_job(job_id: str) -> dict | None:
+    record = await redis_client.hgetall(job_key(job_id))
+    if not record:
+        return None
+    record["attempts"] = int(record.get("attempts", 0))
+    if record.get("result"):
+        record["result"] = json.loads(record["result"])
+    return record
@@ -0,0 +1,41 @@
+# app/jobs/registry.py
+from collections.abc import Awaitable, Callable
+
+from app.jobs.cron import CronSchedule
+
+
+class JobSpec:
+    def __init__(self, name: str, func: Callable[..., Awaitable], max_retries: int, timeout: float):
+        self.name = name
+        self.func = func
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+
+class PeriodicJob:
+    def __init__(self, name: str, schedule: CronSchedule):
+        self.name = name
+        self.schedule = schedule
+
+
+JOBS: dict[str, JobSpec] = {}
+PERIODIC: list[PeriodicJob] = []
+
+
+def job(name: str | None = None, max_retries: int = 3, timeout: float = 300):
+    """Register an async function as a background job. Jobs receive keyword arguments only."""
+    def decorator(func):
+        job_name = name or func.__name__
+        JOBS[job_name] = JobSpec(job_name, func, max_retries, timeout)
+        return func
+    return decorator
+
+
+def periodic(cron: str, name: str | None = None, max_retries: int = 0, timeout: float = 300):
+    """Register a job and run it on a cron schedule; only one worker enqueues each run."""
+    def decorator(func):
+        job_name = name or func.__name__
+        job(job_name, max_retries=max_retries, timeout=timeout)(func)
+        PERIODIC.append(PeriodicJob(job_name, CronSchedule(cron)))
+        return func
+    return decorator
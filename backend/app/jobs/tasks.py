@@ -0,0 +1,35 @@
+# app/jobs/tasks.py
+"""Background jobs. Importing this module registers them with the worker."""
+from app.db.partitions import ensure_bill_partitions
+from app.db.session import AsyncSessionLocal
+from app.eventbus.relay import OutboxRelay
+from app.jobs.registry import periodic
+from app.services.archive_service import BATCH_SIZE, ArchiveService
+from app.services.group_service import GroupService
+
+
+@periodic("7 * * * *")
+async def purge_outbox():
+    """Drop outbox rows that were relayed more than a day ago."""
+    return {"purged": await OutboxRelay().purge_published()}
+
+
+@periodic("17 3 * * *")
+async def create_bill_partitions():
+    """Keep the next few months of Bill and BillShare partitions created ahead of time."""
+    async with AsyncSessionLocal() as db:
+        return {"created": await ensure_bill_partitions(db)}
+
+
+@periodic("37 4 * * *")
+async def archive_settled_bills():
+    """Move old, fully paid bills to BillArchive, one committed batch at a time."""
+    archived = 0
+    async with AsyncSessionLocal() as db:
+        service = ArchiveService(GroupService(db))
+        while True:
+            count = await service.archive_settled_bills()
+            archived += count
+            if count < BATCH_SIZE:
+                break
+    return {"archived": archived}
@@ -1,8 +1,29 @@
+import asyncio
+import logging
+import os
+import secrets
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.config import settings
+from app.core.events import group_event_hub
+from app.core.metrics import monitor_event_loop_lag, registry
+from app.core.middleware import (
+    IdempotencyMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    QueryStatsMiddleware,
+    RateLimitMiddleware,
+    TracingMiddleware,
+)
+from app.core.readiness import check_readiness
+from app.core.redis import prewarm_redis, redis_client
+from app.core.tracing import get_exporter
+from app.core.watchdog import get_loop_watchdog
+from app.eventbus.monitor import refresh_metrics as refresh_eventbus_metrics
 from app.core.exceptions import (
     ConflictError,
     ForbiddenError,
@@ -12,35 +33,45 @@ from app.core.exceptions import (
     ValidationError,
 )
 
-from app.routers import auth, bills, groups, users, summary
+from app.db.session import dispose_engine, prewarm_pool
+from app.routers import admin, auth, bills, groups, jobs, users, summary, sync
 
-app = FastAPI(title="Rupaya API", openapi_url=f"{settings.api_base_path}/openapi.json")
+logger = logging.getLogger(__name__)
 
-# Enable CORS - Configure based on environment
-# In production, you should set ALLOWED_ORIGINS environment variable
-import os
-allowed_origins = os.getenv("ALLOWED_ORIGINS", "*").split(",")
-if allowed_origins == ["*"]:
-    # Development mode - allow common local origins
-    allowed_origins = [
-        "http://localhost:3000",
-        "http://localhost:3001",
-        "http://127.0.0.1:3000",
-        "*"  # Allow all for development
-    ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=allowed_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+async def prewarm_connections():
+    """
+    Open database and Redis connections so early requests do not pay for them.
+    Runs in the background: the server answers (e.g. health checks) meanwhile,
+    and the engine, with its DB driver import, is created here rather than at import.
+    """
+    results = await asyncio.gather(prewarm_pool(), prewarm_redis(), return_exceptions=True)
+    for name, result in zip(("database", "redis"), results, strict=True):
+        if isinstance(result, Exception):
+            logger.warning("Could not pre-warm %s connections: %s", name, result)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background = [
+        asyncio.create_task(prewarm_connections()),
+        asyncio.create_task(monitor_event_loop_lag()),
+    ]
+    trace_exporter = get_exporter()
+    if trace_exporter.enabled:
+        background.append(asyncio.create_task(trace_exporter.run()))
+    loop_watchdog = get_loop_watchdog()
+    loop_watchdog.start()
+    yield
+    await loop_watchdog.stop()
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    await group_event_hub.close()
+    await redis_client.aclose()
+    await dispose_engine()
 
 
-@app.exception_handler(RupayaException)
 async def rupaya_exception_handler(request: Request, exc: RupayaException):
     status_code = 500
     if isinstance(exc, NotFoundError):
@@ -60,21 +91,93 @@ async def rupaya_exception_handler(request: Request, exc: RupayaException):
     )
 
 
-app.include_router(auth.router, prefix=settings.api_base_path)
-app.include_router(users.router, prefix=settings.api_base_path)
-app.include_router(groups.router, prefix=settings.api_base_path)
-app.include_router(bills.router, prefix=settings.api_base_path)
-app.include_router(summary.router, prefix=settings.api_base_path)
-
-
-@app.get("/")
 async def root():
     return {"message": "Rupaya API running 🚀", "docs": "/docs", "version": "v1"}
 
 
-@app.get("/health")
-@app.get(f"{settings.api_base_path}/health")
 async def health_check():
     """Health check endpoint for deployment platforms"""
     return {"status": "healthy", "service": "rupaya-api"}
 
+
+async def readiness_check():
+    """Readiness probe: 503 while a dependency is down or this worker is saturated"""
+    ready, report = await check_readiness()
+    return JSONResponse(status_code=200 if ready else 503, content=report)
+
+
+async def metrics(request: Request):
+    """Prometheus scrape endpoint; requires `Authorization: Bearer <METRICS_TOKEN>` when set"""
+    if settings.METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ")
+        if not secrets.compare_digest(supplied, settings.METRICS_TOKEN):
+            return PlainTextResponse("Unauthorized", status_code=401)
+    await refresh_eventbus_metrics()
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+def create_app() -> FastAPI:
+    """
+    Build the API. Database and Redis connections are opened in the lifespan,
+    not at import; run with `uvicorn app.main:create_app --factory`.
+    """
+    app = FastAPI(
+        title="Rupaya API",
+        openapi_url=f"{settings.api_base_path}/openapi.json",
+        lifespan=lifespan,
+    )
+
+    # Enable CORS - Configure based on environment
+    # In production, you should set ALLOWED_ORIGINS environment variable
+    allowed_origins = os.getenv("ALLOWED_ORIGINS", "*").split(",")
+    if allowed_origins == ["*"]:
+        # Development mode - allow common local origins
+        allowed_origins = [
+            "http://localhost:3000",
+            "http://localhost:3001",
+            "http://127.0.0.1:3000",
+            "*"  # Allow all for development
+        ]
+
+    # Inside CORS so 429s and replayed responses still carry CORS headers
+    app.add_middleware(IdempotencyMiddleware)
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=allowed_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-DB-Queries", "X-DB-Time", "X-Trace-Id", "X-Profile-Id", "Retry-After", "Idempotent-Replayed"],
+    )
+    app.add_middleware(ProfilingMiddleware)
+    app.add_middleware(QueryStatsMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(TracingMiddleware)
+
+    app.add_exception_handler(RupayaException, rupaya_exception_handler)
+
+    for router in (auth, users, groups, bills, summary, sync, jobs, admin):
+        app.include_router(router.router, prefix=settings.api_base_path)
+
+    app.add_api_route("/", root, methods=["GET"])
+    app.add_api_route("/health", health_check, methods=["GET"])
+    app.add_api_route(f"{settings.api_base_path}/health", health_check, methods=["GET"])
+    app.add_api_route("/ready", readiness_check, methods=["GET"])
+    app.add_api_route(f"{settings.api_base_path}/ready", readiness_check, methods=["GET"])
+    app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
+    return app
+
+
+_app: FastAPI | None = None
+
+
+def __getattr__(name: str):
+    # Keeps `app.main:app` working (uvicorn, tests) while building the app only on demand
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
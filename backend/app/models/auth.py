@@ -8,6 +8,11 @@ class TokenResponse(BaseModel):
     token_type: str = "bearer"
 
 
+class StreamTokenResponse(BaseModel):
+    token: str
+    expires_in: int  # Seconds
+
+
 class RefreshTokenRequest(BaseModel):
     refresh_token: str
 
@@ -1,11 +1,19 @@
 from datetime import datetime
-from enum import Enum
+from enum import Enum, StrEnum
 from uuid import UUID
 
 from pydantic import BaseModel, Field
 from app.models.users import UserOut
 
 
+class ShareUpdateStatus(StrEnum):
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"  # Already in the requested state
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden"
+    SETTLED = "settled"  # Paid by a settle-up; cannot be marked unpaid
+
+
 class SplitType(str, Enum):
     EQUAL = "EQUAL"
     EXACT = "EXACT"
@@ -31,6 +39,20 @@ class BillShareResponse(BillShareBase):
         from_attributes = True
 
 
+class BulkShareUpdate(BaseModel):
+    share_ids: list[UUID] = Field(..., min_length=1, max_length=500)
+
+
+class ShareUpdateResult(BaseModel):
+    share_id: UUID
+    status: ShareUpdateStatus
+
+
+class BulkShareUpdateResponse(BaseModel):
+    updated: int
+    results: list[ShareUpdateResult]
+
+
 # --- Bill Models ---
 
 
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class JobOut(BaseModel):
+    id: str
+    name: str
+    status: str
+    attempts: int = 0
+    result: dict | list | str | int | float | None = None
+    error: str | None = None
+    enqueued_at: float | None = None
+    started_at: float | None = None
+    finished_at: float | None = None
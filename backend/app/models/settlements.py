@@ -0,0 +1,30 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.models.users import UserOut
+
+
+class SettleRequest(BaseModel):
+    user_id: UUID  # The member to settle up with
+    # The amount the client expects to change hands; rejected if the balance differs
+    amount: float | None = Field(None, ge=0)
+
+
+class SettlementOut(BaseModel):
+    id: UUID
+    group_id: UUID
+    from_user: UserOut
+    to_user: UserOut
+    amount: float
+    created_by: UUID | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SettleResponse(BaseModel):
+    settlement: SettlementOut
+    share_ids: list[UUID]  # Shares marked paid by the settlement
@@ -0,0 +1,40 @@
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.models.bills import BillResponse, BillShareResponse
+from app.models.groups import GroupMemberOut
+
+
+class SyncGroupOut(BaseModel):
+    id: UUID
+    name: str
+    description: str | None
+    revision: int
+
+    class Config:
+        from_attributes = True
+
+
+class SyncMemberOut(GroupMemberOut):
+    group_id: UUID
+
+
+class SyncShareOut(BillShareResponse):
+    bill_id: UUID
+
+
+class SyncDeleted(BaseModel):
+    groups: list[UUID] = []
+    members: list[UUID] = []
+    bills: list[UUID] = []
+
+
+class SyncResponse(BaseModel):
+    cursor: str
+    has_more: bool
+    groups: list[SyncGroupOut] = []
+    members: list[SyncMemberOut] = []
+    bills: list[BillResponse] = []
+    shares: list[SyncShareOut] = []
+    deleted: SyncDeleted = SyncDeleted()
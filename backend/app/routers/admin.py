@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.core.exceptions import ForbiddenError, NotFoundError
+from app.core.profiling import allocation_tracker, get_profile
+from app.models.users import Role, UserOut
+from app.services.auth_service import get_current_user
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+def require_super_admin(current_user: UserOut = Depends(get_current_user)) -> UserOut:
+    if current_user.role != Role.SUPER_ADMIN:
+        raise ForbiddenError("Super admin access required")
+    return current_user
+
+
+@router.get("/profiles/{profile_id}")
+async def get_request_profile(profile_id: str, _: UserOut = Depends(require_super_admin)):
+    """
+    Fetch a stored request profile. Profiles are recorded by sending a request
+    with `X-Profile: 1` (or `?_profile=1`) as a super admin; the response's
+    X-Profile-Id header holds the id. Kept for one hour.
+    """
+    profile = await get_profile(profile_id)
+    if not profile:
+        raise NotFoundError("Profile not found")
+    return profile
+
+
+@router.post("/tracemalloc/start")
+async def start_allocation_tracking(
+    requests: int = Query(100, ge=1, le=10000),
+    frames: int = Query(1, ge=1, le=25),
+    _: UserOut = Depends(require_super_admin),
+):
+    """Trace allocations for the next `requests` requests of this worker process."""
+    allocation_tracker.start(requests, frames)
+    return allocation_tracker.report()
+
+
+@router.post("/tracemalloc/stop")
+async def stop_allocation_tracking(_: UserOut = Depends(require_super_admin)):
+    allocation_tracker.stop()
+    return allocation_tracker.report()
+
+
+@router.get("/tracemalloc")
+async def get_allocation_report(
+    top: int = Query(10, ge=1, le=100),
+    _: UserOut = Depends(require_super_admin),
+):
+    """Top allocation sites per route from the current or last tracking window."""
+    return allocation_tracker.report(top)
@@ -1,8 +1,16 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, status
-
-from app.models.bills import BillCreate, BillResponse, BillShareResponse, BillUpdate
+from fastapi import APIRouter, Depends, Request, Response, status
+
+from app.core.etag import is_not_modified, make_etag, not_modified_response, set_etag
+from app.models.bills import (
+    BillCreate,
+    BillResponse,
+    BillShareResponse,
+    BillUpdate,
+    BulkShareUpdate,
+    BulkShareUpdateResponse,
+)
 from app.models.pagination import PaginatedResponse
 from app.models.users import UserOut
 from app.routers.groups import get_group_service
@@ -48,6 +56,8 @@ async def get_user_bills(
 @router.get("/group/{group_id}", response_model=PaginatedResponse[BillResponse])
 async def get_group_bills(
     group_id: UUID,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
     search: str = None,
@@ -56,8 +66,15 @@ async def get_group_bills(
 ):
     """
     Get bills for a specific group with pagination and search.
+    Supports conditional requests via the group's revision ETag.
     """
-    return await service.get_group_bills(current_user.id, group_id, skip, limit, search)
+    revision = await service.group_service.get_group_revision(current_user.id, group_id)
+    etag = make_etag("bills", group_id, revision, skip, limit, search)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    set_etag(response, etag)
+    return await service.get_group_bills(current_user.id, group_id, skip, limit, search, revision=revision)
 
 
 @router.get("/{bill_id}", response_model=BillResponse)
@@ -87,6 +104,31 @@ async def update_bill(
 
 
 
+@router.patch("/shares/mark-paid", response_model=BulkShareUpdateResponse)
+async def mark_shares_as_paid(
+    data: BulkShareUpdate,
+    current_user: UserOut = Depends(get_current_user),
+    service: BillService = Depends(get_bill_service),
+):
+    """
+    Mark several shares as paid at once, reporting an outcome per share.
+    Shares the user does not owe, or cannot see, are left untouched.
+    """
+    return await service.set_shares_paid(current_user.id, data.share_ids, paid=True)
+
+
+@router.patch("/shares/mark-unpaid", response_model=BulkShareUpdateResponse)
+async def mark_shares_as_unpaid(
+    data: BulkShareUpdate,
+    current_user: UserOut = Depends(get_current_user),
+    service: BillService = Depends(get_bill_service),
+):
+    """
+    Mark several shares as unpaid at once, reporting an outcome per share.
+    """
+    return await service.set_shares_paid(current_user.id, data.share_ids, paid=False)
+
+
 @router.patch("/shares/{share_id}/mark-paid", response_model=BillShareResponse)
 async def mark_share_as_paid(
     share_id: UUID,
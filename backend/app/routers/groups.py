@@ -1,7 +1,13 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
-
+from fastapi import APIRouter, Depends, Query, Request, Response, WebSocket, status
+from fastapi.responses import StreamingResponse
+
+from app.core.events import group_event_hub, sse_stream, websocket_stream
+from app.core.exceptions import RupayaException, UnauthorizedError
+from app.core.etag import is_not_modified, make_etag, not_modified_response, set_etag
+from app.core.security import optional_oauth2_scheme
+from app.models.auth import StreamTokenResponse
 from app.models.groups import (
     AddMemberRequest,
     GroupCreate,
@@ -13,12 +19,14 @@ from app.models.groups import (
 )
 
 from app.models.pagination import PaginatedResponse
+from app.models.settlements import SettleRequest, SettleResponse, SettlementOut
 from app.models.users import UserOut
-from app.services.auth_service import get_current_user
+from app.services.auth_service import AuthService, get_current_user, get_stream_user
 from app.services.group_service import GroupService
+from app.services.settlement_service import SettlementService
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
+from app.db.session import AsyncSessionLocal, get_db
 
 router = APIRouter(prefix="/groups", tags=["Groups"])
 
@@ -27,6 +35,12 @@ def get_group_service(db: AsyncSession = Depends(get_db)) -> GroupService:
     return GroupService(db)
 
 
+def get_settlement_service(
+    group_service: GroupService = Depends(get_group_service),
+) -> SettlementService:
+    return SettlementService(group_service)
+
+
 @router.post("/", response_model=GroupOut)
 async def create_group(
     data: GroupCreate,
@@ -67,13 +81,123 @@ async def get_user_groups(
 @router.get("/{group_id}", response_model=GroupDetailOut)
 async def get_group(
     group_id: UUID,
+    request: Request,
+    response: Response,
     current_user: UserOut = Depends(get_current_user),
     service: GroupService = Depends(get_group_service),
 ):
     """
     Get group details (members only).
+    Supports conditional requests via the group's revision ETag.
+    """
+    revision = await service.get_group_revision(current_user.id, group_id)
+    etag = make_etag("group", group_id, current_user.id, revision)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    set_etag(response, etag)
+    return await service.get_group_detail(group_id, current_user.id, revision=revision)
+
+
+@router.post("/{group_id}/events/token", response_model=StreamTokenResponse)
+async def group_events_token(
+    group_id: UUID,
+    current_user: UserOut = Depends(get_current_user),
+    service: GroupService = Depends(get_group_service),
+):
+    """
+    Short-lived token for `GET /groups/{group_id}/events?token=...`, for
+    browser EventSource clients that cannot send an Authorization header.
+    """
+    await service.check_is_member(current_user.id, group_id)
+    return AuthService(service.db).create_stream_token(current_user.id, group_id)
+
+
+@router.get("/{group_id}/events")
+async def group_events(
+    group_id: UUID,
+    request: Request,
+    token: str | None = Query(None, description="Token from POST /groups/{group_id}/events/token"),
+    bearer: str | None = Depends(optional_oauth2_scheme),
+    service: GroupService = Depends(get_group_service),
+):
+    """
+    Server-sent event stream of changes to a group (members only).
+    Each event carries the new revision and the changed entities; a `resync`
+    event means the client fell behind and should call `/sync`. The stream
+    ends after the event removing the user from the group or deleting it.
+
+    Authenticate with a bearer token or, from EventSource, a `token` query
+    param. Stream tokens expire after a minute: fetch a new one before reconnecting.
+    """
+    if token:
+        current_user = await get_stream_user(token, group_id, service.db)
+    elif bearer:
+        current_user = await get_current_user(bearer, service.db)
+    else:
+        raise UnauthorizedError("Not authenticated")
+    member = await service.check_is_member(current_user.id, group_id)
+    # Release the pooled connection; the stream may stay open for hours
+    await service.db.close()
+
+    queue = group_event_hub.subscribe(group_id)
+    return StreamingResponse(
+        sse_stream(request, group_id, member.id, queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{group_id}/ws")
+async def group_events_ws(
+    websocket: WebSocket,
+    group_id: UUID,
+    token: str = Query(...),
+):
+    """
+    WebSocket variant of the group event stream.
+    Browsers cannot set headers on websockets, so the access token is passed as a query param.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            user = await get_current_user(token, db)
+            member = await GroupService(db).check_is_member(user.id, group_id)
+        except RupayaException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+
+    await websocket.accept()
+    queue = group_event_hub.subscribe(group_id)
+    await websocket_stream(websocket, group_id, member.id, queue)
+
+
+@router.post("/{group_id}/settle", response_model=SettleResponse, status_code=status.HTTP_201_CREATED)
+async def settle_up(
+    group_id: UUID,
+    data: SettleRequest,
+    current_user: UserOut = Depends(get_current_user),
+    service: SettlementService = Depends(get_settlement_service),
+):
+    """
+    Settle up with another member: marks every unpaid share between the two of
+    you paid and records the net payment. Pass `amount` to have the request
+    rejected if the balance changed since the client last saw it.
+    """
+    return await service.settle_up(current_user.id, group_id, data)
+
+
+@router.get("/{group_id}/settlements", response_model=PaginatedResponse[SettlementOut])
+async def get_group_settlements(
+    group_id: UUID,
+    skip: int = 0,
+    limit: int = 20,
+    current_user: UserOut = Depends(get_current_user),
+    service: SettlementService = Depends(get_settlement_service),
+):
+    """
+    Get the settlements recorded in a group, newest first.
     """
-    return await service.get_group_detail(group_id, current_user.id)
+    return await service.get_group_settlements(current_user.id, group_id, skip, limit)
 
 
 @router.post("/{group_id}/members", response_model=GroupMemberOut)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+
+from app.core.exceptions import NotFoundError
+from app.jobs.queue import get_job
+from app.models.jobs import JobOut
+from app.models.users import Role, UserOut
+from app.services.auth_service import get_current_user
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job_status(
+    job_id: str,
+    current_user: UserOut = Depends(get_current_user),
+):
+    """
+    Poll the status of a background job started by the current user.
+    Status is one of queued, scheduled, running, retrying, succeeded or failed.
+    """
+    job = await get_job(job_id)
+    if not job or (job["owner"] != str(current_user.id) and current_user.role != Role.SUPER_ADMIN):
+        raise NotFoundError("Job not found")
+    return job
@@ -1,8 +1,9 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 
+from app.core.etag import is_not_modified, make_etag, not_modified_response, set_etag
 from app.models.users import UserOut
 from app.routers.groups import get_group_service
 from app.services.auth_service import get_current_user
@@ -20,6 +21,8 @@ def get_summary_service(
 
 @router.get("/")
 async def get_user_summary(
+    request: Request,
+    response: Response,
     group_id: Optional[UUID] = Query(None, description="Filter summary by group"),
     current_user: UserOut = Depends(get_current_user),
     service: SummaryService = Depends(get_summary_service),
@@ -29,5 +32,18 @@ async def get_user_summary(
 
     - **Global summary**: Leave group_id empty to get metrics across all groups
     - **Group summary**: Provide group_id to get metrics for a specific group only
+
+    The ETag is derived from the revisions of the groups the summary covers.
     """
+    group_service = service.group_service
+    if group_id:
+        revision = await group_service.get_group_revision(current_user.id, group_id)
+        etag = make_etag("summary", current_user.id, group_id, revision)
+    else:
+        revisions = await group_service.get_user_revisions(current_user.id)
+        etag = make_etag("summary", current_user.id, *revisions)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    set_etag(response, etag)
     return await service.get_user_summary(current_user.id, group_id)
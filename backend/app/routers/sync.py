@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.models.sync import SyncResponse
+from app.models.users import UserOut
+from app.routers.groups import get_group_service
+from app.services.auth_service import get_current_user
+from app.services.group_service import GroupService
+from app.services.sync_service import SyncService
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+def get_sync_service(
+    group_service: GroupService = Depends(get_group_service),
+) -> SyncService:
+    return SyncService(group_service)
+
+
+@router.get("/", response_model=SyncResponse)
+async def sync_changes(
+    since: str | None = Query(None, max_length=100_000, description="Cursor returned by the previous sync call"),
+    limit: int = Query(500, ge=1, le=1000),
+    current_user: UserOut = Depends(get_current_user),
+    service: SyncService = Depends(get_sync_service),
+):
+    """
+    Get bills, shares and memberships that changed in the user's groups since a cursor.
+
+    - Start without `since` and pass the returned (opaque) `cursor` on the next call
+    - Keep calling while `has_more` is true
+    """
+    return await service.get_changes(current_user.id, since, limit)
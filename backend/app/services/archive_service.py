@@ -0,0 +1,110 @@
+# app/services/archive_service.py
+"""
+Moves settled bills out of the hot Bill and BillShare tables.
+
+A bill is archived once it is older than BILL_ARCHIVE_AFTER_DAYS and every share
+is paid, so it no longer counts towards any balance. BillArchive keeps its full
+BillResponse as zlib-compressed JSON: the bill detail endpoint and delta sync
+still return it, but it is read-only and no longer listed with the group's bills.
+"""
+import json
+import zlib
+from collections import defaultdict
+from datetime import UTC, datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.tracing import trace_methods
+from app.db.models import Bill, BillArchive, BillShare, ChangeAction, ChangeEntity
+from app.models.bills import BillResponse
+from app.services.group_service import GroupService
+
+BATCH_SIZE = 500
+
+
+def compress_bill(bill: Bill) -> bytes:
+    payload = BillResponse.model_validate(bill).model_dump(mode="json")
+    return zlib.compress(json.dumps(payload, separators=(",", ":")).encode(), 9)
+
+
+def decompress_bill(data: bytes) -> dict:
+    return json.loads(zlib.decompress(data))
+
+
+@trace_methods
+class ArchiveService:
+    def __init__(self, group_service: GroupService):
+        self.group_service = group_service
+
+    @property
+    def db(self):
+        return self.group_service.db
+
+    async def archive_settled_bills(self, older_than_days: int | None = None, batch_size: int = BATCH_SIZE) -> int:
+        """
+        Archive up to batch_size settled bills in one transaction.
+        Returns the number archived; keep calling while it equals batch_size.
+        """
+        if older_than_days is None:
+            older_than_days = settings.BILL_ARCHIVE_AFTER_DAYS
+        cutoff = datetime.now(UTC) - timedelta(days=older_than_days)
+        unpaid = exists().where(
+            BillShare.bill_id == Bill.id,
+            BillShare.bill_created_at == Bill.created_at,
+            BillShare.paid.is_not(True),
+        )
+
+        # Skip bills another transaction is editing; the next run picks them up
+        res = await self.db.execute(
+            select(Bill.id)
+            .where(Bill.created_at < cutoff, Bill.deleted_at.is_(None), ~unpaid)
+            .order_by(Bill.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        candidates = res.scalars().all()
+        if not candidates:
+            return 0
+
+        # Lock the shares as well, then re-check: one may have been marked unpaid meanwhile
+        await self.db.execute(select(BillShare.id).where(BillShare.bill_id.in_(candidates)).with_for_update())
+        res = await self.db.execute(
+            select(Bill).options(
+                selectinload(Bill.shares).selectinload(BillShare.user),
+                selectinload(Bill.payer),
+                selectinload(Bill.group)
+            ).where(Bill.id.in_(candidates), ~unpaid)
+        )
+        bills = res.scalars().all()
+
+        if bills:
+            await self.db.execute(insert(BillArchive), [
+                {"id": bill.id, "group_id": bill.group_id, "created_at": bill.created_at, "data": compress_bill(bill)}
+                for bill in bills
+            ])
+            # Shares go with their bills (ON DELETE CASCADE)
+            await self.db.execute(
+                delete(Bill)
+                .where(Bill.id.in_([bill.id for bill in bills]))
+                .execution_options(synchronize_session=False)
+            )
+
+            # Invalidate the groups' ETags; delta-sync clients refetch the bills from the archive
+            by_group = defaultdict(list)
+            for bill in bills:
+                by_group[bill.group_id].append((ChangeEntity.BILL, bill.id, ChangeAction.UPDATED))
+            for group_id, changes in by_group.items():
+                await self.group_service.bump_revision(group_id, *changes)
+
+        await self.db.commit()
+        return len(bills)
+
+    async def get_archived_bills(self, bill_ids: list[UUID | str]) -> list[dict]:
+        """BillResponse dicts of whichever of the given bills are archived."""
+        if not bill_ids:
+            return []
+        res = await self.db.execute(select(BillArchive.data).where(BillArchive.id.in_(bill_ids)))
+        return [decompress_bill(data) for data in res.scalars().all()]
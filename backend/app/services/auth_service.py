@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta, timezone
+from uuid import UUID
 
 from fastapi import Depends
 from jose import JWTError, jwt
@@ -8,9 +9,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.core.exceptions import NotFoundError, UnauthorizedError, ValidationError
 from app.core.redis import redis_client
-from app.core.security import encode_token, oauth2_scheme, verify_password
-from app.db.session import get_db
-from app.db.models import User
+from app.core.security import decode_token, encode_token, oauth2_scheme, verify_password
+from app.core.tracing import traced
+from app.db.session import AsyncSessionLocal, get_db
+from app.db.models import Role, User
+
+
+# Event stream tokens travel in URLs, so they are scoped to one group and expire quickly
+STREAM_TOKEN_SECONDS = 60
 
 
 class AuthService:
@@ -39,6 +45,18 @@ class AuthService:
         to_encode["exp"] = int(expire.timestamp())
         return encode_token(to_encode)
 
+    def create_stream_token(self, user_id: UUID | str, group_id: UUID | str) -> dict:
+        """
+        Token for one group's event stream, passed as a query param because
+        EventSource cannot send an Authorization header.
+        """
+        token = self._create_token(
+            {"sub": str(user_id), "gid": str(group_id)},
+            timedelta(seconds=STREAM_TOKEN_SECONDS),
+            token_type="stream",
+        )
+        return {"token": token, "expires_in": STREAM_TOKEN_SECONDS}
+
     async def login_user(self, email: str, password: str):
         result = await self.db.execute(select(User).where(User.email == email))
         user = result.scalar_one_or_none()
@@ -123,6 +141,7 @@ class AuthService:
             raise UnauthorizedError("Invalid or expired refresh token") from err
 
 
+@traced("get_current_user")
 async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     if await redis_client.exists(f"blacklist:{token}"):
         raise UnauthorizedError("Token invalidated. Please log in again.")
@@ -135,6 +154,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
 
         if not user_id:
             raise UnauthorizedError("Invalid token payload")
+        if payload.get("type") == "stream":
+            raise UnauthorizedError("Invalid token type")
 
         # Check global user revocation
         revoke_ts = await redis_client.get(f"revoke_all:{user_id}")
@@ -152,3 +173,39 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
         raise UnauthorizedError("Invalid token") from err
 
 
+async def is_token_revoked(token: str, payload: dict) -> bool:
+    """Whether a signature-checked token was logged out, or its user's sessions revoked since it was issued."""
+    if await redis_client.exists(f"blacklist:{token}"):
+        return True
+    revoke_ts = await redis_client.get(f"revoke_all:{payload.get('sub')}")
+    return bool(revoke_ts) and payload.get("iat", 0) < int(revoke_ts)
+
+
+async def get_stream_user(token: str, group_id: UUID | str, db: AsyncSession) -> User:
+    """Authenticate a token from create_stream_token issued for this group."""
+    payload = decode_token(token)
+    if not payload or payload.get("type") != "stream" or payload.get("gid") != str(group_id):
+        raise UnauthorizedError("Invalid or expired stream token")
+
+    user_id = payload.get("sub")
+    revoke_ts = await redis_client.get(f"revoke_all:{user_id}")
+    if revoke_ts and payload.get("iat", 0) < int(revoke_ts):
+        raise UnauthorizedError("Session revoked. Please log in again.")
+
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if not user:
+        raise UnauthorizedError("User session is no longer valid")
+    return user
+
+
+async def is_super_admin_token(authorization: str | None) -> bool:
+    """Check an Authorization header outside of a route (e.g. in middleware)."""
+    if not authorization or not authorization.startswith("Bearer "):
+        return False
+    async with AsyncSessionLocal() as db:
+        try:
+            user = await get_current_user(authorization.removeprefix("Bearer "), db)
+        except UnauthorizedError:
+            return False
+    return user.role == Role.SUPER_ADMIN
@@ -2,7 +2,9 @@
 from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import select, update, delete, func, or_
+from collections import defaultdict
+
+from sqlalchemy import and_, select, update, delete, func, or_
 from sqlalchemy.orm import selectinload
 
 from app.core.exceptions import (
@@ -10,13 +12,27 @@ from app.core.exceptions import (
     NotFoundError,
     ValidationError,
 )
-from app.db.models import Bill, BillShare, SplitType, User
-from app.models.bills import BillCreate, BillUpdate
+from app.core.singleflight import SingleFlight
+from app.core.tracing import trace_methods
+from app.db.session import AsyncSessionLocal
+from app.db.models import Bill, BillShare, ChangeAction, ChangeEntity, GroupMember, SplitType, User
+from app.eventbus.outbox import EventType, add_outbox_event
+from app.models.bills import BillCreate, BillResponse, BillUpdate, ShareUpdateStatus
 # Note: app.models.bills.SplitType might be same as app.db.models.SplitType if imported? 
 # If not, let's use the DB one for DB ops.
+from app.services.archive_service import ArchiveService
 from app.services.group_service import GroupService
 
+group_bills_flight = SingleFlight("group_bills")
+
+
+async def _load_group_bills(group_id: UUID | str, skip: int, limit: int, search: str | None) -> dict:
+    # Own session: the shared load must not depend on whichever request started it
+    async with AsyncSessionLocal() as db:
+        return await BillService(GroupService(db)).load_group_bills(group_id, skip, limit, search)
+
 
+@trace_methods
 class BillService:
     def __init__(self, group_service: GroupService):
         self.group_service = group_service
@@ -57,6 +73,7 @@ class BillService:
         for share_data in shares_create:
             share = BillShare(
                 bill_id=bill.id,
+                bill_created_at=bill.created_at,
                 user_id=UUID(str(share_data["user_id"])) if isinstance(share_data["user_id"], str) else share_data["user_id"],
                 amount=share_data["amount"],
                 paid=share_data["paid"],
@@ -64,6 +81,13 @@ class BillService:
             )
             self.db.add(share)
         
+        add_outbox_event(
+            self.db, EventType.BILL_CREATED, data.group_id,
+            bill_id=bill.id, paid_by=paid_by, total_amount=data.total_amount, created_by=user_id,
+        )
+        await self.group_service.bump_revision(
+            data.group_id, (ChangeEntity.BILL, bill.id, ChangeAction.CREATED)
+        )
         await self.db.commit()
         await self.db.refresh(bill)
         
@@ -123,6 +147,18 @@ class BillService:
                     if abs(current_sum - target_total_amount) > 0.01:
                         raise ValidationError("Updating total amount on an EXACT split requires providing new shares.")
 
+        # Shares paid by a settle-up are counted in its amount: keep their payer and amounts
+        settled = {str(s.user_id): s for s in bill.shares if s.settlement_id is not None}
+        if settled:
+            new_amounts = {s["user_id"]: s["amount"] for s in new_shares_data or []}
+            if target_paid_by != str(bill.paid_by) or (new_shares_data is not None and any(
+                uid not in new_amounts or abs(new_amounts[uid] - share.amount) > 0.01
+                for uid, share in settled.items()
+            )):
+                raise ValidationError(
+                    "Some shares of this bill were paid by a settle-up; their amounts and the payer cannot change"
+                )
+
         # 4. Surgical DB Updates
         
         # Update Bill metadata
@@ -153,11 +189,14 @@ class BillService:
                 uid = share_data["user_id"]
                 if uid in current_shares:
                     existing = current_shares[uid]
-                    existing.amount = share_data["amount"]
-                    existing.paid = share_data["paid"]
+                    # Settled shares keep their amount (checked above) and stay paid
+                    if existing.settlement_id is None:
+                        existing.amount = share_data["amount"]
+                        existing.paid = share_data["paid"]
                 else:
                     new_share = BillShare(
                         bill_id=bill_id,
+                        bill_created_at=bill.created_at,
                         user_id=uid,
                         amount=share_data["amount"],
                         paid=share_data["paid"],
@@ -165,6 +204,13 @@ class BillService:
                     )
                     self.db.add(new_share)
 
+        add_outbox_event(
+            self.db, EventType.BILL_UPDATED, bill.group_id,
+            bill_id=bill.id, shares_changed=new_shares_data is not None, updated_by=user_id,
+        )
+        await self.group_service.bump_revision(
+            bill.group_id, (ChangeEntity.BILL, bill.id, ChangeAction.UPDATED)
+        )
         await self.db.commit()
 
         # 5. Return full bill details
@@ -228,14 +274,28 @@ class BillService:
 
 
     async def get_group_bills(
-        self, user_id: UUID | str, group_id: UUID | str, skip: int = 0, limit: int = 20, search: str = None
+        self, user_id: UUID | str, group_id: UUID | str, skip: int = 0, limit: int = 20,
+        search: str = None, revision: int | None = None,
     ):
         """
         Retrieve bills for a specific group with pagination and optional search.
+        Pass the revision from get_group_revision (which also checked membership)
+        to let concurrent requests for the same page of that revision share one load.
         """
-        # Check membership
-        await self.group_service.check_is_member(user_id, group_id)
+        if revision is None:
+            await self.group_service.check_is_member(user_id, group_id)
+            return await self.load_group_bills(group_id, skip, limit, search)
+
+        await self.group_service.release_connection()
+        return await group_bills_flight.do(
+            f"{group_id}:{revision}:{skip}:{limit}:{search or ''}",
+            lambda: _load_group_bills(group_id, skip, limit, search),
+        )
 
+    async def load_group_bills(
+        self, group_id: UUID | str, skip: int = 0, limit: int = 20, search: str = None
+    ) -> dict:
+        """One page of a group's bills, as JSON-ready data (the same for every member)."""
         # Build query
         stmt = select(Bill).where(
             Bill.group_id == group_id, 
@@ -261,7 +321,7 @@ class BillService:
         bills = res.scalars().all()
 
         return {
-            "items": bills,
+            "items": [BillResponse.model_validate(bill).model_dump(mode="json") for bill in bills],
             "total": total,
             "skip": skip,
             "limit": limit,
@@ -316,7 +376,13 @@ class BillService:
         bill = res.scalar_one_or_none()
 
         if not bill:
-            raise NotFoundError("Bill not found")
+            # Settled bills are moved to the archive after a while
+            archived = await ArchiveService(self.group_service).get_archived_bills([bill_id])
+            if not archived:
+                raise NotFoundError("Bill not found")
+            bill = archived[0]
+            await self.group_service.check_is_member(user_id, bill["group_id"])
+            return bill
 
         # Check if user has access to this bill (via group membership)
         await self.group_service.check_is_member(user_id, str(bill.group_id))
@@ -350,6 +416,13 @@ class BillService:
         share.paid = True
         share.updated_by = user_id
         share.updated_at = datetime.utcnow()
+        add_outbox_event(
+            self.db, EventType.SHARE_PAID, share.bill.group_id,
+            share_id=share.id, bill_id=share.bill_id, user_id=share.user_id, amount=share.amount,
+        )
+        await self.group_service.bump_revision(
+            share.bill.group_id, (ChangeEntity.SHARE, share.id, ChangeAction.UPDATED)
+        )
         await self.db.commit()
         await self.db.refresh(share)
         return share
@@ -377,10 +450,97 @@ class BillService:
         if not share.paid:
             raise ValidationError("This share is already marked as unpaid")
 
+        # The settlement's amount includes this share; un-paying it would leave that stale
+        if share.settlement_id is not None:
+            raise ValidationError("This share was paid by a settle-up and cannot be marked unpaid")
+
         # Mark as unpaid
         share.paid = False
         share.updated_by = user_id
         share.updated_at = datetime.utcnow()
+        add_outbox_event(
+            self.db, EventType.SHARE_UNPAID, share.bill.group_id,
+            share_id=share.id, bill_id=share.bill_id, user_id=share.user_id, amount=share.amount,
+        )
+        await self.group_service.bump_revision(
+            share.bill.group_id, (ChangeEntity.SHARE, share.id, ChangeAction.UPDATED)
+        )
         await self.db.commit()
         await self.db.refresh(share)
         return share
+
+    async def set_shares_paid(self, user_id: UUID | str, share_ids: list[UUID], paid: bool):
+        """
+        Mark many shares paid (or unpaid) with one authorization query and one
+        conditional UPDATE. Returns an outcome per share instead of failing the
+        whole request: only the user's own shares in their groups are changed.
+        """
+        if isinstance(user_id, str):
+            user_id = UUID(user_id)
+        share_ids = list(dict.fromkeys(share_ids))
+        bill_join = and_(Bill.id == BillShare.bill_id, Bill.created_at == BillShare.bill_created_at)
+
+        # Every share with whether the user is an active member of its group
+        res = await self.db.execute(
+            select(BillShare.id, BillShare.user_id, BillShare.settlement_id, GroupMember.id.is_not(None))
+            .join(Bill, bill_join)
+            .outerjoin(GroupMember, and_(
+                GroupMember.group_id == Bill.group_id,
+                GroupMember.user_id == user_id,
+                GroupMember.deleted_at.is_(None),
+            ))
+            .where(BillShare.id.in_(share_ids), Bill.deleted_at.is_(None))
+        )
+        status = dict.fromkeys(share_ids, ShareUpdateStatus.NOT_FOUND)
+        allowed = []
+        for share_id, owner_id, settlement_id, is_member in res.all():
+            if not is_member:
+                # Don't reveal shares of other groups
+                continue
+            if owner_id != user_id:
+                status[share_id] = ShareUpdateStatus.FORBIDDEN
+            elif not paid and settlement_id is not None:
+                # Its settlement's amount includes it
+                status[share_id] = ShareUpdateStatus.SETTLED
+            else:
+                status[share_id] = ShareUpdateStatus.UNCHANGED
+                allowed.append(share_id)
+
+        updated = []
+        if allowed:
+            # The condition makes concurrent requests for the same shares update each once,
+            # and skips shares a concurrent settle-up has just paid
+            res = await self.db.execute(
+                update(BillShare)
+                .where(
+                    bill_join,
+                    BillShare.id.in_(allowed),
+                    BillShare.user_id == user_id,
+                    BillShare.paid.is_not(True) if paid else and_(
+                        BillShare.paid.is_(True), BillShare.settlement_id.is_(None)
+                    ),
+                )
+                .values(paid=paid, updated_by=user_id, updated_at=datetime.utcnow())
+                .returning(BillShare.id, BillShare.bill_id, BillShare.amount, Bill.group_id)
+                .execution_options(synchronize_session=False)
+            )
+            updated = res.all()
+
+        if updated:
+            event_type = EventType.SHARE_PAID if paid else EventType.SHARE_UNPAID
+            changes = defaultdict(list)
+            for share_id, bill_id, amount, group_id in updated:
+                status[share_id] = ShareUpdateStatus.UPDATED
+                add_outbox_event(
+                    self.db, event_type, group_id,
+                    share_id=share_id, bill_id=bill_id, user_id=user_id, amount=amount,
+                )
+                changes[group_id].append((ChangeEntity.SHARE, share_id, ChangeAction.UPDATED))
+            for group_id, group_changes in changes.items():
+                await self.group_service.bump_revision(group_id, *group_changes)
+            await self.db.commit()
+
+        return {
+            "updated": len(updated),
+            "results": [{"share_id": share_id, "status": status[share_id]} for share_id in share_ids],
+        }
@@ -1,21 +1,48 @@
 # app/services/group_service.py
+import logging
 from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import select, or_, and_, func
+from sqlalchemy import select, insert, update, or_, and_, func
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import ForbiddenError, NotFoundError, ValidationError
-from app.db.models import Group, GroupMember, User, Bill, BillShare, GroupRole
+from app.core.singleflight import SingleFlight
+from app.core.tracing import trace_methods
+from app.eventbus.outbox import EventType, add_outbox_event
+from app.db.session import AsyncSessionLocal
+from app.db.models import (
+    Group, GroupMember, GroupChange, User, Bill, BillShare, GroupRole, ChangeAction, ChangeEntity
+)
 from app.models.groups import AddMemberRequest, GroupCreate, GroupUpdate, GroupDetailOut, GroupMemberOut
 from app.models.users import UserOut
 
+logger = logging.getLogger(__name__)
 
+group_detail_flight = SingleFlight("group_detail")
+
+
+async def _load_group_with_members(group_id: UUID | str) -> dict:
+    # Own session: the shared load must not depend on whichever request started it
+    async with AsyncSessionLocal() as db:
+        return await GroupService(db).load_group_with_members(group_id)
+
+
+@trace_methods
 class GroupService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def release_connection(self):
+        """
+        End the session's read transaction, returning its connection to the pool.
+        Call before awaiting a single-flight load: the load opens its own session,
+        and a request holding one connection while waiting for a second can
+        exhaust the pool under a burst of coalesced requests.
+        """
+        await self.db.commit()
+
     # auth helper
     async def check_is_member(self, user_id: UUID | str, group_id: UUID | str):
         if isinstance(user_id, str):
@@ -46,6 +73,89 @@ class GroupService:
             raise ForbiddenError("Only group admins can perform this action")
         return member
 
+    # -------------------------
+    # REVISIONS
+    # -------------------------
+    async def bump_revision(
+        self, group_id: UUID | str, *changes: tuple[ChangeEntity, UUID | str, ChangeAction]
+    ) -> int:
+        """
+        Increment the group's revision inside the current transaction and append
+        the given (entity_type, entity_id, action) changes to the change log.
+        Every write touching the group, its members or its bills must call this
+        before committing so cached ETags are invalidated and delta-sync clients
+        pick the change up. Live subscribers are notified from the group.changed
+        outbox event staged here, so they only ever see committed changes.
+        """
+        stmt = (
+            update(Group)
+            .where(Group.id == group_id)
+            .values(revision=Group.revision + 1)
+            .returning(Group.revision)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        revision = result.scalar_one()
+
+        add_outbox_event(
+            self.db, EventType.GROUP_CHANGED, group_id,
+            revision=revision,
+            changes=[
+                {"entity": entity_type.value, "id": str(entity_id), "action": action.value}
+                for entity_type, entity_id, action in changes
+            ],
+        )
+
+        if changes:
+            await self.db.execute(
+                insert(GroupChange),
+                [
+                    {
+                        "group_id": group_id,
+                        "revision": revision,
+                        "entity_type": entity_type,
+                        "entity_id": entity_id,
+                        "action": action,
+                    }
+                    for entity_type, entity_id, action in changes
+                ],
+            )
+        return revision
+
+    async def get_group_revision(self, user_id: UUID | str, group_id: UUID | str) -> int:
+        """
+        Return the current revision of a group the user is an active member of.
+        Membership is verified in the same indexed lookup, so conditional GETs
+        can be answered without loading bills or shares.
+        """
+        stmt = select(Group.revision).join(
+            GroupMember, GroupMember.group_id == Group.id
+        ).where(
+            Group.id == group_id,
+            GroupMember.user_id == user_id,
+            GroupMember.deleted_at.is_(None)
+        )
+        result = await self.db.execute(stmt)
+        revision = result.scalar_one_or_none()
+
+        if revision is None:
+            raise ForbiddenError("User is not a member of this group")
+        return revision
+
+    async def get_user_revisions(self, user_id: UUID | str) -> list[tuple[str, int]]:
+        """
+        Return (group_id, revision) for every group the user is an active member of,
+        ordered by group id so the result can be hashed into a stable ETag.
+        """
+        stmt = select(Group.id, Group.revision).join(
+            GroupMember, GroupMember.group_id == Group.id
+        ).where(
+            GroupMember.user_id == user_id,
+            GroupMember.deleted_at.is_(None)
+        ).order_by(Group.id)
+        result = await self.db.execute(stmt)
+        return [(str(gid), rev) for gid, rev in result.all()]
+
     async def create_group(self, data: GroupCreate, creator_id: str):
         if not data.initial_members:
             raise ValidationError("A group must have at least one other member.")
@@ -66,13 +176,12 @@ class GroupService:
             created_by=creator_id
         )
         self.db.add(creator_member)
+        members = [creator_member]
 
         added_count = 0
-        for email in data.initial_members:
-            result = await self.db.execute(select(User).where(User.email == email))
-            user = result.scalar_one_or_none()
-            
-            if not user or str(user.id) == creator_id:
+        result = await self.db.execute(select(User).where(User.email.in_(data.initial_members)))
+        for user in result.scalars().all():
+            if str(user.id) == str(creator_id):
                 continue
 
             member = GroupMember(
@@ -82,12 +191,19 @@ class GroupService:
                 created_by=creator_id
             )
             self.db.add(member)
+            members.append(member)
             added_count += 1
 
         if added_count == 0:
             await self.db.rollback()
             raise ValidationError("A group must have at least one other valid member.")
         
+        await self.db.flush()
+        await self.bump_revision(
+            group.id,
+            (ChangeEntity.GROUP, group.id, ChangeAction.CREATED),
+            *[(ChangeEntity.MEMBER, m.id, ChangeAction.CREATED) for m in members],
+        )
         await self.db.commit()
         await self.db.refresh(group)
         return group
@@ -123,38 +239,33 @@ class GroupService:
         result = await self.db.execute(stmt)
         memberships = result.scalars().all()
 
-        # 2. Process each group to add metrics
+        # 2. Owed/owe totals for all of the groups in one aggregate
+        group_ids = [m.group_id for m in memberships]
+        totals = {}
+        if group_ids:
+            totals_stmt = select(
+                Bill.group_id,
+                # Owed (others owe user in this group)
+                func.sum(BillShare.amount).filter(Bill.paid_by == user_id, BillShare.user_id != user_id),
+                # Owe (user owes others in this group)
+                func.sum(BillShare.amount).filter(Bill.paid_by != user_id, BillShare.user_id == user_id),
+            ).join(Bill, and_(Bill.id == BillShare.bill_id, Bill.created_at == BillShare.bill_created_at)).where(
+                Bill.group_id.in_(group_ids),
+                Bill.deleted_at.is_(None),
+                BillShare.paid == False,
+                or_(Bill.paid_by == user_id, BillShare.user_id == user_id)
+            ).group_by(Bill.group_id)
+            totals_res = await self.db.execute(totals_stmt)
+            totals = {gid: (owed or 0, owe or 0) for gid, owed, owe in totals_res.all()}
+
+        # 3. Process each group to add metrics
         groups_list = []
         for m in memberships:
             group = m.group
             if not group: 
                 continue # Should not happen due to join but safety
-            
-            # Sub-query for Owed (others owe user in this group)
-            owed_stmt = select(func.sum(BillShare.amount))\
-                .join(Bill, Bill.id == BillShare.bill_id)\
-                .where(
-                    Bill.group_id == group.id,
-                    Bill.paid_by == user_id,
-                    Bill.deleted_at.is_(None),
-                    BillShare.user_id != user_id,
-                    BillShare.paid == False
-                )
-            owed_res = await self.db.execute(owed_stmt)
-            total_owed = owed_res.scalar() or 0
-
-            # Sub-query for Owe (user owes others in this group)
-            owe_stmt = select(func.sum(BillShare.amount))\
-                .join(Bill, Bill.id == BillShare.bill_id)\
-                .where(
-                    Bill.group_id == group.id,
-                    Bill.paid_by != user_id,
-                    Bill.deleted_at.is_(None),
-                    BillShare.user_id == user_id,
-                    BillShare.paid == False
-                )
-            owe_res = await self.db.execute(owe_stmt)
-            total_owe = owe_res.scalar() or 0
+
+            total_owed, total_owe = totals.get(group.id, (0, 0))
 
             # --- FILTERING LOGIC ---
             # "owe" shows groups where you net owe money (Owe > Owed)
@@ -179,7 +290,7 @@ class GroupService:
             }
             groups_list.append(g_dict)
 
-        # 3. Handle Sorting
+        # 4. Handle Sorting
         reverse = (order.lower() == "desc")
         
         if sort_by == "name":
@@ -193,7 +304,7 @@ class GroupService:
         else: # default: created_at
             groups_list.sort(key=lambda x: x["created_at"], reverse=reverse)
 
-        # 4. Handle Pagination
+        # 5. Handle Pagination
         total = len(groups_list)
         paginated_items = groups_list[skip : skip + limit]
 
@@ -205,79 +316,71 @@ class GroupService:
             "has_more": (skip + limit) < total,
         }
 
-    async def get_group_detail(self, group_id: UUID | str, user_id: UUID | str):
-        await self.check_is_member(user_id, group_id)
+    async def get_group_detail(self, group_id: UUID | str, user_id: UUID | str, revision: int | None = None):
+        """
+        Group with its active members and the user's owed/owe totals in it.
+        Pass the revision from get_group_revision (which also checked membership)
+        to let concurrent requests for that revision share one load of the group.
+        """
+        if revision is None:
+            await self.check_is_member(user_id, group_id)
+            group = await self.load_group_with_members(group_id)
+        else:
+            await self.release_connection()
+            group = await group_detail_flight.do(
+                f"{group_id}:{revision}", lambda: _load_group_with_members(group_id)
+            )
+
+        total_owed, total_owe = await self.get_group_balance(group_id, user_id)
+        return GroupDetailOut(**group, total_owed=total_owed, total_owe=total_owe)
 
+    async def load_group_with_members(self, group_id: UUID | str) -> dict:
+        """The user-independent part of the group detail, as JSON-ready data."""
         stmt = select(Group).options(
             selectinload(Group.members).selectinload(GroupMember.user)
         ).where(Group.id == group_id)
-        
+
         result = await self.db.execute(stmt)
         group = result.scalar_one_or_none()
 
         if not group:
             raise NotFoundError("Group not found")
 
-        # Use Pydantic models to ensure correct serialization and validation
-        members_out = []
-        # Filter members
-        active_members = [m for m in group.members if m.deleted_at is None]
-        
-        for m in active_members:
-            # Construct UserOut. Role is Enum, passed directly.
-            user_out = UserOut(
-                id=m.user.id,
-                name=m.user.name,
-                email=m.user.email,
-                role=m.user.role
-            )
-            
-            members_out.append(GroupMemberOut(
+        members_out = [
+            GroupMemberOut(
                 id=m.id,
-                user=user_out,
-                role=m.role, # Enum, will be serialized to str
+                user=UserOut(id=m.user.id, name=m.user.name, email=m.user.email, role=m.user.role),
+                role=m.role,
                 created_at=m.created_at
-            ))
-
-        # Calculate summary metrics for this group
-        # Owed (others owe user in this group)
-        owed_stmt = select(func.sum(BillShare.amount))\
-            .join(Bill, Bill.id == BillShare.bill_id)\
-            .where(
-                Bill.group_id == group.id,
-                Bill.paid_by == user_id,
-                Bill.deleted_at.is_(None),
-                BillShare.user_id != user_id,
-                BillShare.paid == False
             )
-        owed_res = await self.db.execute(owed_stmt)
-        total_owed = owed_res.scalar() or 0
-
-        # Owe (user owes others in this group)
-        owe_stmt = select(func.sum(BillShare.amount))\
-            .join(Bill, Bill.id == BillShare.bill_id)\
-            .where(
-                Bill.group_id == group.id,
-                Bill.paid_by != user_id,
-                Bill.deleted_at.is_(None),
-                BillShare.user_id == user_id,
-                BillShare.paid == False
-            )
-        owe_res = await self.db.execute(owe_stmt)
-        total_owe = owe_res.scalar() or 0
-
+            for m in group.members if m.deleted_at is None
+        ]
         return GroupDetailOut(
             id=group.id,
             name=group.name,
             description=group.description,
             created_by=group.created_by,
             created_at=group.created_at,
-            updated_at=group.updated_at,
             members=members_out,
             member_count=len(members_out),
-            total_owed=total_owed,
-            total_owe=total_owe
+        ).model_dump(mode="json", exclude={"total_owed", "total_owe"})
+
+    async def get_group_balance(self, group_id: UUID | str, user_id: UUID | str) -> tuple[float, float]:
+        """(owed to the user, owed by the user) over the group's unpaid shares."""
+        stmt = select(
+            # Owed (others owe user in this group)
+            func.sum(BillShare.amount).filter(Bill.paid_by == user_id, BillShare.user_id != user_id),
+            # Owe (user owes others in this group)
+            func.sum(BillShare.amount).filter(Bill.paid_by != user_id, BillShare.user_id == user_id),
+        ).join(Bill, and_(Bill.id == BillShare.bill_id, Bill.created_at == BillShare.bill_created_at)).where(
+            Bill.group_id == group_id,
+            Bill.deleted_at.is_(None),
+            BillShare.paid == False,
+            or_(Bill.paid_by == user_id, BillShare.user_id == user_id)
         )
+        result = await self.db.execute(stmt)
+        total_owed, total_owe = result.one()
+        return total_owed or 0, total_owe or 0
 
     # -------------------------
     # MEMBERSHIP MANAGEMENT
@@ -312,6 +415,13 @@ class GroupService:
             existing.role = data.role
             existing.updated_by = added_by_id
             existing.updated_at = datetime.utcnow()
+            add_outbox_event(
+                self.db, EventType.MEMBER_ADDED, group_id,
+                member_id=existing.id, user_id=user.id, added_by=added_by_id,
+            )
+            await self.bump_revision(
+                group_id, (ChangeEntity.MEMBER, existing.id, ChangeAction.CREATED)
+            )
             await self.db.commit()
             await self.db.refresh(existing) 
             
@@ -325,6 +435,14 @@ class GroupService:
             created_by=added_by_id
         )
         self.db.add(new_member)
+        await self.db.flush()
+        add_outbox_event(
+            self.db, EventType.MEMBER_ADDED, group_id,
+            member_id=new_member.id, user_id=user.id, added_by=added_by_id,
+        )
+        await self.bump_revision(
+            group_id, (ChangeEntity.MEMBER, new_member.id, ChangeAction.CREATED)
+        )
         await self.db.commit()
         
         # Reload with user
@@ -350,12 +468,13 @@ class GroupService:
         
         member.deleted_at = datetime.utcnow()
         member.deleted_by = removed_by_id
+        await self.bump_revision(group_id, (ChangeEntity.MEMBER, member.id, ChangeAction.DELETED))
         await self.db.commit()
         return member 
 
     async def delete_group(self, group_id: str, user_id: str):
         """
-        Soft delete a group and all its memberships.
+        Soft delete a group, its memberships and its bills in one transaction.
         Requires admin privileges.
         """
         await self.check_is_admin(user_id, group_id)
@@ -377,17 +496,38 @@ class GroupService:
             m.deleted_at = now
             m.deleted_by = user_id
 
-        # Soft delete all bills
-        res = await self.db.execute(select(Bill).where(Bill.group_id == group_id, Bill.deleted_at.is_(None)))
-        bills = res.scalars().all()
-        for b in bills:
-            b.deleted_at = now
-            b.deleted_by = user_id
+        bill_ids = await self.soft_delete_group_bills(group_id, user_id, now)
 
+        add_outbox_event(
+            self.db, EventType.GROUP_DELETED, group_id,
+            deleted_by=user_id, bill_count=len(bill_ids), member_count=len(members),
+        )
+        await self.bump_revision(
+            group_id,
+            (ChangeEntity.GROUP, group_id, ChangeAction.DELETED),
+            *((ChangeEntity.BILL, bill_id, ChangeAction.DELETED) for bill_id in bill_ids),
+        )
         await self.db.commit()
 
         return {"message": "Group deleted successfully"}
 
+    async def soft_delete_group_bills(
+        self, group_id: UUID | str, deleted_by: UUID | str, deleted_at: datetime
+    ) -> list[UUID]:
+        """
+        Soft delete all remaining bills of a group in one statement, without committing.
+        Returns the ids of the bills deleted.
+        """
+        stmt = (
+            update(Bill)
+            .where(Bill.group_id == group_id, Bill.deleted_at.is_(None))
+            .values(deleted_at=deleted_at, deleted_by=deleted_by)
+            .returning(Bill.id)
+            .execution_options(synchronize_session=False)
+        )
+        res = await self.db.execute(stmt)
+        return res.scalars().all()
+
     async def update_group(self, group_id: str, data: GroupUpdate, user_id: str):
         """
         Update group details. Everyone in the group can currently do this.
@@ -409,6 +549,7 @@ class GroupService:
         group.updated_at = datetime.utcnow()
         group.updated_by = user_id
         
+        await self.bump_revision(group_id, (ChangeEntity.GROUP, group.id, ChangeAction.UPDATED))
         await self.db.commit()
         return group
 
@@ -430,5 +571,6 @@ class GroupService:
         member.updated_at = datetime.utcnow()
         member.updated_by = user_id
         
+        await self.bump_revision(group_id, (ChangeEntity.MEMBER, member.id, ChangeAction.UPDATED))
         await self.db.commit()
         return member
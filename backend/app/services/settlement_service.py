@@ -0,0 +1,133 @@
+# app/services/settlement_service.py
+from collections import defaultdict
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import selectinload
+
+from app.core.exceptions import NotFoundError, ValidationError
+from app.core.tracing import trace_methods
+from app.db.models import Bill, BillShare, ChangeAction, ChangeEntity, Settlement
+from app.eventbus.outbox import EventType, add_outbox_event
+from app.models.settlements import SettleRequest
+from app.services.group_service import GroupService
+
+
+@trace_methods
+class SettlementService:
+    def __init__(self, group_service: GroupService):
+        self.group_service = group_service
+
+    @property
+    def db(self):
+        return self.group_service.db
+
+    async def settle_up(self, user_id: UUID | str, group_id: UUID | str, data: SettleRequest):
+        """
+        Settle every unpaid share between the user and another member of the group,
+        in both directions, and record the net payment as a Settlement.
+        All covered shares are marked paid by a single UPDATE.
+        """
+        if isinstance(user_id, str):
+            user_id = UUID(user_id)
+        other_id = data.user_id
+        if other_id == user_id:
+            raise ValidationError("You cannot settle up with yourself")
+
+        await self.group_service.check_is_member(user_id, group_id)
+
+        # Direction and amount are only known once the shares are claimed
+        settlement = Settlement(
+            group_id=group_id, from_user_id=user_id, to_user_id=other_id, amount=0, created_by=user_id,
+        )
+        self.db.add(settlement)
+        await self.db.flush()
+
+        stmt = (
+            update(BillShare)
+            .where(
+                BillShare.bill_id == Bill.id,
+                BillShare.bill_created_at == Bill.created_at,
+                Bill.group_id == group_id,
+                Bill.deleted_at.is_(None),
+                BillShare.paid.is_not(True),
+                or_(
+                    and_(Bill.paid_by == other_id, BillShare.user_id == user_id),
+                    and_(Bill.paid_by == user_id, BillShare.user_id == other_id),
+                ),
+            )
+            .values(paid=True, settlement_id=settlement.id, updated_by=user_id, updated_at=datetime.utcnow())
+            .returning(BillShare.id, BillShare.user_id, BillShare.amount)
+            .execution_options(synchronize_session=False)
+        )
+        res = await self.db.execute(stmt)
+        shares = res.all()
+        if not shares:
+            raise ValidationError("Nothing to settle with this member")
+
+        owed = defaultdict(float)
+        for share in shares:
+            owed[share.user_id] += share.amount
+        net = round(owed[user_id] - owed[other_id], 2)
+        if net < 0:
+            settlement.from_user_id, settlement.to_user_id = other_id, user_id
+        settlement.amount = abs(net)
+
+        if data.amount is not None and abs(data.amount - settlement.amount) > 0.01:
+            raise ValidationError(
+                f"The balance with this member is {settlement.amount:.2f}, not {data.amount:.2f}; refresh and try again"
+            )
+
+        add_outbox_event(
+            self.db, EventType.SETTLEMENT_RECORDED, group_id,
+            settlement_id=settlement.id, from_user_id=settlement.from_user_id,
+            to_user_id=settlement.to_user_id, amount=settlement.amount, shares=len(shares),
+        )
+        await self.group_service.bump_revision(
+            group_id, *((ChangeEntity.SHARE, share.id, ChangeAction.UPDATED) for share in shares)
+        )
+        await self.db.commit()
+
+        return {
+            "settlement": await self.get_settlement(settlement.id),
+            "share_ids": [share.id for share in shares],
+        }
+
+    async def get_settlement(self, settlement_id: UUID | str) -> Settlement:
+        stmt = select(Settlement).options(
+            selectinload(Settlement.from_user),
+            selectinload(Settlement.to_user),
+        ).where(Settlement.id == settlement_id).execution_options(populate_existing=True)
+        res = await self.db.execute(stmt)
+        settlement = res.scalar_one_or_none()
+        if not settlement:
+            raise NotFoundError("Settlement not found")
+        return settlement
+
+    async def get_group_settlements(
+        self, user_id: UUID | str, group_id: UUID | str, skip: int = 0, limit: int = 20
+    ):
+        """
+        Settlements recorded in a group, newest first.
+        """
+        await self.group_service.check_is_member(user_id, group_id)
+
+        stmt = select(Settlement).where(Settlement.group_id == group_id)
+        res = await self.db.execute(select(func.count()).select_from(stmt.subquery()))
+        total = res.scalar()
+
+        stmt = stmt.options(
+            selectinload(Settlement.from_user),
+            selectinload(Settlement.to_user),
+        ).order_by(Settlement.created_at.desc()).offset(skip).limit(limit)
+        res = await self.db.execute(stmt)
+        settlements = res.scalars().all()
+
+        return {
+            "items": settlements,
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "has_more": skip + len(settlements) < total,
+        }
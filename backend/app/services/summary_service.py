@@ -5,10 +5,12 @@ from uuid import UUID
 from sqlalchemy import select, func, and_
 from sqlalchemy.orm import selectinload
 
+from app.core.tracing import trace_methods
 from app.db.models import GroupMember, Bill, BillShare, User
 from app.services.group_service import GroupService
 
 
+@trace_methods
 class SummaryService:
     def __init__(self, group_service: GroupService):
         self.group_service = group_service
@@ -45,7 +47,7 @@ class SummaryService:
         # 2. Total Owed (others owe you)
         # Bill where paid_by = user_id, share where user_id != user_id, paid = False
         stmt_owed = select(func.sum(BillShare.amount))\
-            .join(Bill, Bill.id == BillShare.bill_id)\
+            .join(Bill, and_(Bill.id == BillShare.bill_id, Bill.created_at == BillShare.bill_created_at))\
             .where(
                 Bill.paid_by == user_id,
                 Bill.deleted_at.is_(None),
@@ -62,7 +64,7 @@ class SummaryService:
         # 3. Total Owe (you owe others)
         # Bill where paid_by != user_id, share where user_id = user_id, paid = False
         stmt_owe = select(func.sum(BillShare.amount))\
-            .join(Bill, Bill.id == BillShare.bill_id)\
+            .join(Bill, and_(Bill.id == BillShare.bill_id, Bill.created_at == BillShare.bill_created_at))\
             .where(
                 Bill.paid_by != user_id,
                 Bill.deleted_at.is_(None),
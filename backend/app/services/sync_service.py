@@ -0,0 +1,214 @@
+# app/services/sync_service.py
+import base64
+import json
+from uuid import UUID
+
+from sqlalchemy import BigInteger, and_, column, func, or_, select, values
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import selectinload
+
+from app.core.exceptions import ValidationError
+from app.db.models import (
+    Bill,
+    BillShare,
+    ChangeAction,
+    ChangeEntity,
+    Group,
+    GroupChange,
+    GroupMember,
+)
+from app.services.archive_service import ArchiveService
+from app.services.group_service import GroupService
+
+
+def encode_cursor(revisions: dict[UUID, int]) -> str:
+    payload = json.dumps({str(group_id): revision for group_id, revision in revisions.items()}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[UUID, int]:
+    """The per-group revisions of a cursor from encode_cursor."""
+    try:
+        return {UUID(group_id): int(revision) for group_id, revision in json.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ).items()}
+    except (ValueError, TypeError, AttributeError):
+        raise ValidationError("Invalid sync cursor") from None
+
+
+class SyncService:
+    def __init__(self, group_service: GroupService):
+        self.group_service = group_service
+
+    @property
+    def db(self):
+        return self.group_service.db
+
+    async def _decode_cursor(self, since: str | None, group_ids: list[UUID]) -> dict[UUID, int]:
+        if not since or since == "0":
+            return {}
+        if since.isdigit():
+            # Cursor from before per-group revisions: a GroupChange id
+            res = await self.db.execute(
+                select(GroupChange.group_id, func.max(GroupChange.revision))
+                .where(GroupChange.id <= int(since), GroupChange.group_id.in_(group_ids))
+                .group_by(GroupChange.group_id)
+            )
+            return dict(res.all())
+        return decode_cursor(since)
+
+    async def get_changes(self, user_id: UUID | str, since: str | None = None, limit: int = 500):
+        """
+        Return everything that changed in the user's groups after the `since` cursor.
+        Entities changed several times are returned once, in their current state.
+        Groups the user has left only report the user's own removal or the group's deletion.
+
+        The cursor holds the last synced revision of each group. Revisions are
+        bumped under the group's row lock, so within a group they commit in
+        order; GroupChange ids are allocated at insert time and can commit out
+        of order, which would let a cursor skip over a late commit.
+        """
+        if isinstance(user_id, str):
+            user_id = UUID(user_id)
+
+        # 1. The user's memberships, including former ones
+        res = await self.db.execute(
+            select(GroupMember.id, GroupMember.group_id, GroupMember.deleted_at).where(
+                GroupMember.user_id == user_id
+            )
+        )
+        memberships = res.all()
+        active_group_ids = [m.group_id for m in memberships if m.deleted_at is None]
+        former_group_ids = [m.group_id for m in memberships if m.deleted_at is not None]
+        own_member_ids = [m.id for m in memberships]
+
+        revisions = await self._decode_cursor(since, active_group_ids + former_group_ids)
+        if not memberships:
+            return {"cursor": encode_cursor(revisions), "has_more": False}
+
+        # 2. Changes after the cursor, group by group
+        synced = values(
+            column("group_id", PGUUID(as_uuid=True)), column("revision", BigInteger), name="synced",
+        ).data([(group_id, revisions.get(group_id, 0)) for group_id in set(active_group_ids + former_group_ids)])
+        stmt = select(GroupChange).join(
+            synced,
+            and_(GroupChange.group_id == synced.c.group_id, GroupChange.revision > synced.c.revision),
+        ).where(
+            or_(
+                GroupChange.group_id.in_(active_group_ids),
+                and_(
+                    GroupChange.group_id.in_(former_group_ids),
+                    or_(
+                        and_(
+                            GroupChange.entity_type == ChangeEntity.MEMBER,
+                            GroupChange.entity_id.in_(own_member_ids),
+                        ),
+                        and_(
+                            GroupChange.entity_type == ChangeEntity.GROUP,
+                            GroupChange.action == ChangeAction.DELETED,
+                        ),
+                    ),
+                ),
+            ),
+        ).order_by(GroupChange.group_id, GroupChange.revision, GroupChange.id)
+        res = await self.db.execute(stmt.limit(limit + 1))
+        changes = res.scalars().all()
+
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        if has_more:
+            # The cursor records whole revisions, so finish the last one
+            last = changes[-1]
+            res = await self.db.execute(
+                stmt.where(
+                    GroupChange.group_id == last.group_id,
+                    GroupChange.revision == last.revision,
+                    GroupChange.id > last.id,
+                )
+            )
+            changes.extend(res.scalars().all())
+
+        for change in changes:
+            revisions[change.group_id] = max(revisions.get(change.group_id, 0), change.revision)
+        cursor = encode_cursor(revisions)
+
+        changed = {entity: set() for entity in ChangeEntity}
+        for change in changes:
+            changed[change.entity_type].add(change.entity_id)
+
+        # 3. Load the current state of every changed entity in one query per type
+        groups, members, bills, shares = [], [], [], []
+        # BillResponse dicts of bills that were archived once settled
+        archived_bills = []
+        deleted = {"groups": [], "members": [], "bills": []}
+
+        if changed[ChangeEntity.GROUP]:
+            res = await self.db.execute(
+                select(Group).where(Group.id.in_(changed[ChangeEntity.GROUP]))
+            )
+            for group in res.scalars().all():
+                if group.deleted_at is None:
+                    groups.append(group)
+                else:
+                    deleted["groups"].append(group.id)
+
+        if changed[ChangeEntity.MEMBER]:
+            res = await self.db.execute(
+                select(GroupMember)
+                .options(selectinload(GroupMember.user))
+                .where(GroupMember.id.in_(changed[ChangeEntity.MEMBER]))
+            )
+            found = set()
+            for member in res.scalars().all():
+                found.add(member.id)
+                if member.deleted_at is None:
+                    members.append(member)
+                else:
+                    deleted["members"].append(member.id)
+            deleted["members"].extend(changed[ChangeEntity.MEMBER] - found)
+
+        if changed[ChangeEntity.BILL]:
+            res = await self.db.execute(
+                select(Bill).options(
+                    selectinload(Bill.shares).selectinload(BillShare.user),
+                    selectinload(Bill.payer),
+                    selectinload(Bill.group)
+                ).where(Bill.id.in_(changed[ChangeEntity.BILL]))
+            )
+            found = set()
+            for bill in res.scalars().all():
+                found.add(bill.id)
+                if bill.deleted_at is None:
+                    bills.append(bill)
+                else:
+                    deleted["bills"].append(bill.id)
+            # Missing bills were either hard deleted or archived
+            archived_bills = await ArchiveService(self.group_service).get_archived_bills(
+                list(changed[ChangeEntity.BILL] - found)
+            )
+            found.update(UUID(archived["id"]) for archived in archived_bills)
+            deleted["bills"].extend(changed[ChangeEntity.BILL] - found)
+
+        if changed[ChangeEntity.SHARE]:
+            # Shares of bills returned above are already nested in those bills
+            returned_bill_ids = {b.id for b in bills}
+            res = await self.db.execute(
+                select(BillShare)
+                .options(selectinload(BillShare.user))
+                .join(Bill, and_(Bill.id == BillShare.bill_id, Bill.created_at == BillShare.bill_created_at))
+                .where(
+                    BillShare.id.in_(changed[ChangeEntity.SHARE]),
+                    Bill.deleted_at.is_(None)
+                )
+            )
+            shares = [s for s in res.scalars().all() if s.bill_id not in returned_bill_ids]
+
+        return {
+            "cursor": cursor,
+            "has_more": has_more,
+            "groups": groups,
+            "members": members,
+            "bills": bills + archived_bills,
+            "shares": shares,
+            "deleted": deleted,
+        }
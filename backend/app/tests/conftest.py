@@ -0,0 +1,13 @@
+"""
+Tests that touch the database run against DATABASE_URL (or TEST_DATABASE_URL),
+which must point at a migrated Postgres (`uv run alembic upgrade head`).
+They create their own rows and delete them afterwards.
+"""
+import os
+
+if os.getenv("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+# Implicit lazy loads raise in development, so they fail the tests too
+os.environ.setdefault("ENVIRONMENT", "development")
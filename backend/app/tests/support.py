@@ -0,0 +1,70 @@
+"""Helpers for the database tests; see conftest.py for the database they use."""
+import asyncio
+import os
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.exc import DBAPIError
+
+from app.db.models import Group, GroupMember, GroupRole, OutboxEvent, Role, User
+from app.db.session import AsyncSessionLocal, dispose_engine
+
+
+def run(scenario):
+    """Run one async scenario on its own event loop, with a fresh connection pool."""
+    async def main():
+        try:
+            return await scenario()
+        finally:
+            await dispose_engine()
+
+    return asyncio.run(main())
+
+
+def run_or_skip(scenario):
+    """Like run, but skip the test when no database is configured or it cannot be reached."""
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("needs a migrated Postgres in DATABASE_URL")
+    try:
+        return run(scenario)
+    except (OSError, DBAPIError) as exc:
+        pytest.skip(f"database not available: {exc}")
+
+
+async def create_group(members: int, name: str = "Test group") -> SimpleNamespace:
+    """
+    Commit `members` new users and a group they all belong to; the first is its admin.
+    Returns the group id and the user ids.
+    """
+    async with AsyncSessionLocal() as db:
+        users = [
+            User(name=f"Test {i}", email=f"test-{uuid4().hex}@example.com", password="!", role=Role.USER)
+            for i in range(members)
+        ]
+        db.add_all(users)
+        await db.flush()
+
+        group = Group(name=name, created_by=users[0].id)
+        db.add(group)
+        await db.flush()
+
+        db.add_all(
+            GroupMember(
+                user_id=user.id, group_id=group.id, created_by=users[0].id,
+                role=GroupRole.ADMIN if i == 0 else GroupRole.MEMBER,
+            )
+            for i, user in enumerate(users)
+        )
+        await db.commit()
+        return SimpleNamespace(group_id=group.id, user_ids=[user.id for user in users])
+
+
+async def delete_group(data: SimpleNamespace):
+    async with AsyncSessionLocal() as db:
+        # Members, bills, shares, settlements and changes go with the group (ON DELETE CASCADE)
+        await db.execute(delete(Group).where(Group.id == data.group_id))
+        await db.execute(delete(OutboxEvent).where(OutboxEvent.group_id == data.group_id))
+        await db.execute(delete(User).where(User.id.in_(data.user_ids)))
+        await db.commit()
@@ -0,0 +1,170 @@
+"""
+Paying, un-paying and editing bill shares, including shares paid by a settle-up.
+Needs a migrated Postgres, see conftest.py.
+"""
+import asyncio
+import os
+from uuid import uuid4
+
+import pytest
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("needs a migrated Postgres in DATABASE_URL", allow_module_level=True)
+
+from sqlalchemy import select
+
+from app.core.exceptions import ValidationError
+from app.db.models import BillShare
+from app.db.partitions import ensure_bill_partitions
+from app.db.session import AsyncSessionLocal
+from app.models.bills import BillCreate, BillShareCreate, BillUpdate, ShareUpdateStatus, SplitType
+from app.models.settlements import SettleRequest
+from app.services.bill_service import BillService
+from app.services.group_service import GroupService
+from app.services.settlement_service import SettlementService
+from app.tests.support import create_group, delete_group, run, run_or_skip
+
+
+async def setup_group():
+    data = await create_group(3, name="Bill shares")
+    async with AsyncSessionLocal() as db:
+        await ensure_bill_partitions(db)
+    return data
+
+
+@pytest.fixture
+def group():
+    data = run_or_skip(setup_group)
+    yield data
+    run(lambda: delete_group(data))
+
+
+async def create_bill(group, total_amount: float = 30.0):
+    """An equal split between all members, paid by the first one."""
+    payer = group.user_ids[0]
+    async with AsyncSessionLocal() as db:
+        bill = await BillService(GroupService(db)).create_bill(str(payer), BillCreate(
+            description="Dinner", total_amount=total_amount, group_id=group.group_id,
+            shares=[BillShareCreate(user_id=user_id) for user_id in group.user_ids],
+        ))
+    return bill.id
+
+
+async def get_shares(bill_id) -> dict:
+    async with AsyncSessionLocal() as db:
+        res = await db.execute(select(BillShare).where(BillShare.bill_id == bill_id))
+        return {share.user_id: share for share in res.scalars().all()}
+
+
+def test_update_bill_keeps_settled_shares(group):
+    payer, settled, other = group.user_ids
+
+    async def scenario():
+        bill_id = await create_bill(group)
+        async with AsyncSessionLocal() as db:
+            await SettlementService(GroupService(db)).settle_up(str(settled), group.group_id, SettleRequest(user_id=payer))
+
+        rejected = [
+            BillUpdate(total_amount=60),
+            BillUpdate(paid_by=other),
+            # Drops the settled share
+            BillUpdate(shares=[BillShareCreate(user_id=payer), BillShareCreate(user_id=other)]),
+            BillUpdate(split_type=SplitType.EXACT, shares=[
+                BillShareCreate(user_id=payer, amount=10),
+                BillShareCreate(user_id=settled, amount=5),
+                BillShareCreate(user_id=other, amount=15),
+            ]),
+        ]
+        for update in rejected:
+            async with AsyncSessionLocal() as db:
+                with pytest.raises(ValidationError):
+                    await BillService(GroupService(db)).update_bill(str(payer), bill_id, update)
+
+        # Other shares can still change as long as the settled one keeps its amount
+        async with AsyncSessionLocal() as db:
+            await BillService(GroupService(db)).update_bill(str(payer), bill_id, BillUpdate(
+                description="Dinner and drinks", split_type=SplitType.EXACT, shares=[
+                    BillShareCreate(user_id=payer, amount=5),
+                    BillShareCreate(user_id=settled, amount=10),
+                    BillShareCreate(user_id=other, amount=15),
+                ],
+            ))
+
+        shares = await get_shares(bill_id)
+        assert shares[settled].paid and shares[settled].settlement_id is not None
+        assert shares[settled].amount == pytest.approx(10)
+        assert not shares[other].paid and shares[other].amount == pytest.approx(15)
+
+    run(scenario)
+
+
+def test_mark_settled_share_unpaid(group):
+    payer, settled, _ = group.user_ids
+
+    async def scenario():
+        bill_id = await create_bill(group)
+        async with AsyncSessionLocal() as db:
+            await SettlementService(GroupService(db)).settle_up(str(settled), group.group_id, SettleRequest(user_id=payer))
+        share = (await get_shares(bill_id))[settled]
+
+        async with AsyncSessionLocal() as db:
+            with pytest.raises(ValidationError):
+                await BillService(GroupService(db)).mark_share_as_unpaid(str(settled), str(share.id))
+
+        assert (await get_shares(bill_id))[settled].paid
+
+    run(scenario)
+
+
+def test_set_shares_paid_outcomes(group):
+    payer, settled, other = group.user_ids
+
+    async def scenario():
+        shares = await get_shares(await create_bill(group))
+        async with AsyncSessionLocal() as db:
+            await SettlementService(GroupService(db)).settle_up(str(settled), group.group_id, SettleRequest(user_id=payer))
+        unknown_id = uuid4()
+
+        async with AsyncSessionLocal() as db:
+            result = await BillService(GroupService(db)).set_shares_paid(
+                other, [shares[other].id, shares[payer].id, unknown_id, shares[other].id], paid=True
+            )
+        assert result["updated"] == 1
+        assert [(r["share_id"], r["status"]) for r in result["results"]] == [
+            (shares[other].id, ShareUpdateStatus.UPDATED),
+            (shares[payer].id, ShareUpdateStatus.FORBIDDEN),
+            (unknown_id, ShareUpdateStatus.NOT_FOUND),
+        ]
+
+        async with AsyncSessionLocal() as db:
+            result = await BillService(GroupService(db)).set_shares_paid(payer, [shares[payer].id], paid=True)
+        assert result["results"][0]["status"] == ShareUpdateStatus.UNCHANGED
+
+        async with AsyncSessionLocal() as db:
+            result = await BillService(GroupService(db)).set_shares_paid(settled, [shares[settled].id], paid=False)
+        assert result["results"][0]["status"] == ShareUpdateStatus.SETTLED
+
+        after = await get_shares(shares[other].bill_id)
+        assert after[other].paid and after[settled].paid
+
+    run(scenario)
+
+
+def test_set_shares_paid_concurrently(group):
+    other = group.user_ids[2]
+
+    async def scenario():
+        share = (await get_shares(await create_bill(group)))[other]
+
+        async def mark_paid():
+            async with AsyncSessionLocal() as db:
+                return await BillService(GroupService(db)).set_shares_paid(other, [share.id], paid=True)
+
+        # The second UPDATE waits for the first one's row lock, then no longer matches
+        results = await asyncio.gather(mark_paid(), mark_paid())
+        assert sorted(r["results"][0]["status"] for r in results) == [
+            ShareUpdateStatus.UNCHANGED, ShareUpdateStatus.UPDATED,
+        ]
+        assert sum(r["updated"] for r in results) == 1
+
+    run(scenario)
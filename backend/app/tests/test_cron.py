@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.jobs.cron import CronSchedule
+
+
+def at(day: int, hour: int = 0, minute: int = 0, month: int = 6) -> datetime:
+    # June 2026 starts on a Monday
+    return datetime(2026, month, day, hour, minute)
+
+
+def test_fields():
+    schedule = CronSchedule("*/15 9-17 * * *")
+    assert schedule.matches(at(3, 9, 0))
+    assert schedule.matches(at(3, 17, 45))
+    assert not schedule.matches(at(3, 9, 10))
+    assert not schedule.matches(at(3, 18, 0))
+
+    assert CronSchedule("0,30 0 * 6 *").matches(at(3, 0, 30))
+    assert not CronSchedule("0,30 0 * 6 *").matches(at(3, 0, 30, month=7))
+
+
+def test_day_of_week_starts_on_sunday():
+    assert CronSchedule("0 0 * * 0").matches(at(7))
+    assert CronSchedule("0 0 * * 1").matches(at(1))
+    assert not CronSchedule("0 0 * * 0").matches(at(6))
+
+
+def test_restricted_days_match_either():
+    schedule = CronSchedule("0 0 1 * 1")
+    assert schedule.matches(at(1))  # The 1st and a Monday
+    assert schedule.matches(at(8))  # A Monday
+    assert schedule.matches(at(1, month=7))  # The 1st, a Wednesday
+    assert not schedule.matches(at(2))
+
+
+def test_unrestricted_day_field_matches_both():
+    assert CronSchedule("0 0 1 * *").matches(at(1, month=7))
+    assert not CronSchedule("0 0 1 * *").matches(at(8))
+    assert not CronSchedule("0 0 * * 1").matches(at(1, month=7))
+
+    # A stepped field starting with '*' still counts as unrestricted
+    schedule = CronSchedule("0 0 */2 * 1")
+    assert schedule.matches(at(1))  # An odd day and a Monday
+    assert not schedule.matches(at(8))  # An even Monday
+    assert not schedule.matches(at(3))  # An odd Wednesday
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *", "60 * * * *", "* * 0 * *", "* * * * 7", "5-1 * * * *", "*/0 * * * *",
+])
+def test_invalid_expression(expression):
+    with pytest.raises(ValidationError):
+        CronSchedule(expression)
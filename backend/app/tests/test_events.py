@@ -0,0 +1,23 @@
+import json
+from uuid import uuid4
+
+from app.core.events import RESYNC_MESSAGE, ends_membership
+
+
+def change_event(*changes) -> str:
+    return json.dumps({
+        "type": "change",
+        "revision": 7,
+        "changes": [{"entity": entity, "id": str(entity_id), "action": action} for entity, entity_id, action in changes],
+    })
+
+
+def test_ends_membership():
+    member_id, other_id = uuid4(), uuid4()
+
+    assert ends_membership(change_event(("MEMBER", member_id, "DELETED")), member_id)
+    assert ends_membership(change_event(("BILL", uuid4(), "DELETED"), ("GROUP", uuid4(), "DELETED")), member_id)
+
+    assert not ends_membership(change_event(("MEMBER", other_id, "DELETED")), member_id)
+    assert not ends_membership(change_event(("MEMBER", member_id, "UPDATED")), member_id)
+    assert not ends_membership(RESYNC_MESSAGE, member_id)
@@ -0,0 +1,158 @@
+"""
+Query budgets for the hot read paths.
+
+Each budget is the number of statements the code path issues by design, with
+one query per selectinload level; an N+1 regression grows with the number of
+bills or members and trips it. Needs a migrated Postgres, see conftest.py.
+"""
+import os
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("needs a migrated Postgres in DATABASE_URL", allow_module_level=True)
+
+from sqlalchemy import select, update
+
+from app.db.models import (
+    Bill,
+    BillShare,
+    ChangeAction,
+    ChangeEntity,
+    Group,
+    GroupChange,
+    GroupMember,
+    SplitType,
+)
+from app.db.partitions import ensure_bill_partitions
+from app.db.query_stats import query_budget
+from app.db.session import AsyncSessionLocal
+from app.services.bill_service import BillService
+from app.services.group_service import GroupService
+from app.services.sync_service import SyncService
+from app.tests.support import create_group, delete_group, run, run_or_skip
+
+MEMBERS = 3
+# Enough bills that a per-bill or per-share query would blow every budget below
+BILLS = 6
+SHARE_AMOUNT = 10.0
+
+
+async def seed() -> SimpleNamespace:
+    data = await create_group(MEMBERS, name="Query budgets")
+    async with AsyncSessionLocal() as db:
+        await ensure_bill_partitions(db)
+
+        res = await db.execute(select(GroupMember).where(GroupMember.group_id == data.group_id))
+        members = res.scalars().all()
+
+        now = datetime.now(UTC)
+        bills, shares = [], []
+        for i in range(BILLS):
+            payer_id = data.user_ids[i % MEMBERS]
+            bill = Bill(
+                id=uuid4(), group_id=data.group_id, paid_by=payer_id, created_by=payer_id,
+                description=f"Bill {i}", total_amount=SHARE_AMOUNT * MEMBERS,
+                split_type=SplitType.EQUAL, created_at=now - timedelta(minutes=i),
+            )
+            bills.append(bill)
+            shares.extend(
+                BillShare(
+                    id=uuid4(), bill_id=bill.id, bill_created_at=bill.created_at, user_id=user_id,
+                    amount=SHARE_AMOUNT, paid=False, created_by=payer_id,
+                )
+                for user_id in data.user_ids
+            )
+        db.add_all(bills)
+        await db.flush()
+        db.add_all(shares)
+        await db.flush()
+
+        changes = (
+            [(ChangeEntity.GROUP, data.group_id)]
+            + [(ChangeEntity.MEMBER, member.id) for member in members]
+            + [(ChangeEntity.BILL, bill.id) for bill in bills]
+            + [(ChangeEntity.SHARE, share.id) for share in shares]
+        )
+        db.add_all(
+            GroupChange(
+                group_id=data.group_id, revision=revision, entity_type=entity_type,
+                entity_id=entity_id, action=ChangeAction.CREATED,
+            )
+            for revision, (entity_type, entity_id) in enumerate(changes, start=1)
+        )
+        await db.execute(update(Group).where(Group.id == data.group_id).values(revision=len(changes)))
+        await db.commit()
+
+    data.user_id = data.user_ids[0]
+    return data
+
+
+@pytest.fixture(scope="module")
+def data():
+    data = run_or_skip(seed)
+    yield data
+    run(lambda: delete_group(data))
+
+
+def test_group_detail(data):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            # Membership check, group, members, their users, balance
+            async with query_budget(5, label="get_group_detail"):
+                group = await GroupService(db).get_group_detail(data.group_id, data.user_id)
+        assert group.member_count == MEMBERS
+
+    run(scenario)
+
+
+def test_group_balance(data):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            async with query_budget(1, label="get_group_balance"):
+                owed, owe = await GroupService(db).get_group_balance(data.group_id, data.user_id)
+        paid = len(range(0, BILLS, MEMBERS))
+        assert owed == pytest.approx(paid * SHARE_AMOUNT * (MEMBERS - 1))
+        assert owe == pytest.approx((BILLS - paid) * SHARE_AMOUNT)
+
+    run(scenario)
+
+
+def test_user_groups(data):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            # Memberships, their groups, the groups' members, owed/owe totals
+            async with query_budget(4, label="get_user_groups"):
+                page = await GroupService(db).get_user_groups(data.user_id)
+        assert [item["id"] for item in page["items"]] == [str(data.group_id)]
+
+    run(scenario)
+
+
+def test_group_bills(data):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            # Membership check, count, bills, shares, share users, payers, group
+            async with query_budget(7, label="get_group_bills"):
+                page = await BillService(GroupService(db)).get_group_bills(data.user_id, data.group_id)
+        assert page["total"] == BILLS
+        assert all(len(bill["shares"]) == MEMBERS for bill in page["items"])
+
+    run(scenario)
+
+
+def test_sync_changes(data):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            # Memberships, changes, groups, members + users,
+            # bills + shares + share users + payers + group, changed shares + users
+            async with query_budget(12, label="get_changes"):
+                changes = await SyncService(GroupService(db)).get_changes(data.user_id)
+        assert not changes["has_more"]
+        assert len(changes["bills"]) == BILLS
+        assert len(changes["members"]) == MEMBERS
+
+    run(scenario)
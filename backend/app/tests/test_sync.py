@@ -0,0 +1,110 @@
+"""
+Delta-sync cursors. The cursor tests are pure; the paging tests need a migrated
+Postgres, see conftest.py.
+"""
+import base64
+import json
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.exceptions import ValidationError
+from app.db.models import ChangeAction, ChangeEntity, Group, GroupChange, GroupMember
+from app.db.session import AsyncSessionLocal
+from app.services.group_service import GroupService
+from app.services.sync_service import SyncService, decode_cursor, encode_cursor
+from app.tests.support import create_group, delete_group, run, run_or_skip
+
+
+def test_cursor_round_trip():
+    revisions = {uuid4(): 3, uuid4(): 12_345_678_901}
+    cursor = encode_cursor(revisions)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == revisions
+    assert decode_cursor(encode_cursor({})) == {}
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"[1, 2]").decode(),
+    base64.urlsafe_b64encode(json.dumps({"not-a-uuid": 1}).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps({str(uuid4()): "x"}).encode()).decode(),
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValidationError):
+        decode_cursor(cursor)
+
+
+async def setup_changes(revisions: list[list[tuple[ChangeEntity, int]]]):
+    """
+    A group of three members with the given change log: one list of
+    (entity, member index) per revision; GROUP entries ignore the index.
+    """
+    data = await create_group(3, name="Sync")
+    async with AsyncSessionLocal() as db:
+        res = await db.execute(select(GroupMember).where(GroupMember.group_id == data.group_id))
+        member_ids = {member.user_id: member.id for member in res.scalars().all()}
+        data.member_ids = [member_ids[user_id] for user_id in data.user_ids]
+
+        data.change_ids = []
+        for revision, changes in enumerate(revisions, start=1):
+            for entity, index in changes:
+                change = GroupChange(
+                    group_id=data.group_id, revision=revision, entity_type=entity,
+                    entity_id=data.group_id if entity == ChangeEntity.GROUP else data.member_ids[index],
+                    action=ChangeAction.UPDATED,
+                )
+                db.add(change)
+                await db.flush()
+                data.change_ids.append(change.id)
+        await db.execute(update(Group).where(Group.id == data.group_id).values(revision=len(revisions)))
+        await db.commit()
+    return data
+
+
+@pytest.fixture
+def changes(request):
+    data = run_or_skip(lambda: setup_changes(request.param))
+    yield data
+    run(lambda: delete_group(data))
+
+
+async def get_changes(data, since=None, limit=500):
+    async with AsyncSessionLocal() as db:
+        return await SyncService(GroupService(db)).get_changes(data.user_ids[0], since, limit)
+
+
+@pytest.mark.parametrize("changes", [[
+    [(ChangeEntity.MEMBER, 0)], [(ChangeEntity.MEMBER, 1)], [(ChangeEntity.MEMBER, 2)],
+]], indirect=True)
+def test_legacy_cursor(changes):
+    async def scenario():
+        # An old client's cursor: the id of the last change it synced (revision 2)
+        page = await get_changes(changes, str(changes.change_ids[1]))
+        assert [member.id for member in page["members"]] == [changes.member_ids[2]]
+        assert decode_cursor(page["cursor"]) == {changes.group_id: 3}
+
+    run(scenario)
+
+
+@pytest.mark.parametrize("changes", [[
+    [(ChangeEntity.MEMBER, 0), (ChangeEntity.MEMBER, 1), (ChangeEntity.MEMBER, 2)],
+    [(ChangeEntity.GROUP, 0)],
+]], indirect=True)
+def test_page_keeps_revisions_whole(changes):
+    async def scenario():
+        # The limit falls inside revision 1; the page still ends after all of it
+        page = await get_changes(changes, limit=2)
+        assert page["has_more"]
+        assert {member.id for member in page["members"]} == set(changes.member_ids)
+        assert page["groups"] == []
+        assert decode_cursor(page["cursor"]) == {changes.group_id: 1}
+
+        page = await get_changes(changes, page["cursor"], limit=2)
+        assert not page["has_more"]
+        assert page["members"] == []
+        assert [group.id for group in page["groups"]] == [changes.group_id]
+        assert decode_cursor(page["cursor"]) == {changes.group_id: 2}
+
+    run(scenario)
@@ -0,0 +1,221 @@
+"""
+Background job worker:
+
+    python -m app.worker [--concurrency N] [--no-eventbus]
+
+Runs queued jobs with bounded concurrency and retries with exponential backoff,
+promotes delayed jobs, enqueues periodic jobs (one instance per run, coordinated
+by a Redis lock) and, unless disabled, the outbox relay and stream consumers.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import signal
+import socket
+import time
+from datetime import UTC, datetime
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.eventbus.handlers import CONSUMERS
+from app.eventbus.monitor import report_lag
+from app.eventbus.relay import OutboxRelay
+from app.jobs import tasks  # noqa: F401  (registers jobs)
+from app.jobs.queue import (
+    DELAYED_KEY,
+    JOB_TTL_SECONDS,
+    PROCESSING_PREFIX,
+    QUEUE_KEY,
+    WORKER_PREFIX,
+    enqueue,
+    job_key,
+)
+from app.jobs.registry import JOBS, PERIODIC
+
+logger = logging.getLogger("app.worker")
+
+HEARTBEAT_SECONDS = 10
+BACKOFF_BASE_SECONDS = 5
+BACKOFF_MAX_SECONDS = 3600
+
+# Atomically move due jobs from the delayed set to the ready queue
+PROMOTE_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, id in ipairs(ids) do
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('LPUSH', KEYS[2], id)
+end
+return #ids
+"""
+
+
+class Worker:
+    def __init__(self, concurrency: int | None = None):
+        if concurrency is None:
+            concurrency = settings.WORKER_CONCURRENCY
+        self.concurrency = concurrency
+        self.name = f"{socket.gethostname()}-{os.getpid()}"
+        self.processing_key = f"{PROCESSING_PREFIX}{self.name}"
+        self._slots = asyncio.Semaphore(concurrency)
+        self._running: set[asyncio.Task] = set()
+        self._promote = redis_client.register_script(PROMOTE_SCRIPT)
+
+    # -------------------------
+    # JOB EXECUTION
+    # -------------------------
+    async def _execute(self, job_id: str):
+        key = job_key(job_id)
+        try:
+            record = await redis_client.hgetall(key)
+            spec = JOBS.get(record.get("name", ""))
+            if spec is None:
+                await redis_client.hset(key, mapping={"status": "failed", "error": "Unknown job"})
+                return
+
+            attempts = int(record.get("attempts", 0)) + 1
+            max_retries = int(record.get("max_retries", spec.max_retries))
+            await redis_client.hset(key, mapping={
+                "status": "running", "attempts": attempts, "started_at": time.time(), "worker": self.name,
+            })
+
+            try:
+                result = await asyncio.wait_for(
+                    spec.func(**json.loads(record["kwargs"])), timeout=spec.timeout
+                )
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                if attempts <= max_retries:
+                    backoff = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+                    run_at = time.time() + backoff * random.uniform(0.8, 1.2)
+                    logger.warning("Job %s (%s) failed, retrying in %.0fs: %s", job_id, spec.name, backoff, error)
+                    async with redis_client.pipeline(transaction=True) as pipe:
+                        pipe.hset(key, mapping={"status": "retrying", "error": error})
+                        pipe.zadd(DELAYED_KEY, {job_id: run_at})
+                        await pipe.execute()
+                else:
+                    logger.error("Job %s (%s) failed permanently: %s", job_id, spec.name, error)
+                    await redis_client.hset(key, mapping={
+                        "status": "failed", "error": error, "finished_at": time.time(),
+                    })
+                return
+
+            await redis_client.hset(key, mapping={
+                "status": "succeeded",
+                "result": json.dumps(result, default=str),
+                "finished_at": time.time(),
+            })
+            await redis_client.expire(key, JOB_TTL_SECONDS)
+        finally:
+            await redis_client.lrem(self.processing_key, 1, job_id)
+            self._slots.release()
+
+    async def _consume(self, stop: asyncio.Event):
+        while not stop.is_set():
+            await self._slots.acquire()
+            try:
+                job_id = await redis_client.blmove(
+                    QUEUE_KEY, self.processing_key, timeout=1, src="RIGHT", dest="LEFT"
+                )
+            except Exception:
+                self._slots.release()
+                logger.exception("Failed to fetch job")
+                await asyncio.sleep(1)
+                continue
+
+            if job_id is None:
+                self._slots.release()
+                continue
+
+            task = asyncio.create_task(self._execute(job_id))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    # -------------------------
+    # HOUSEKEEPING
+    # -------------------------
+    async def _heartbeat_and_promote(self, stop: asyncio.Event):
+        last_heartbeat = 0.0
+        while not stop.is_set():
+            try:
+                if time.monotonic() - last_heartbeat > HEARTBEAT_SECONDS:
+                    last_heartbeat = time.monotonic()
+                    await redis_client.set(f"{WORKER_PREFIX}{self.name}", 1, ex=HEARTBEAT_SECONDS * 3)
+                    await self._recover_orphans()
+                await self._promote(keys=[DELAYED_KEY, QUEUE_KEY], args=[time.time(), 100])
+            except Exception:
+                logger.exception("Worker housekeeping failed")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=1)
+            except TimeoutError:
+                pass
+
+    async def _recover_orphans(self):
+        """Requeue jobs held by workers whose heartbeat expired."""
+        async for key in redis_client.scan_iter(match=f"{PROCESSING_PREFIX}*"):
+            worker_name = key.removeprefix(PROCESSING_PREFIX)
+            if worker_name == self.name or await redis_client.exists(f"{WORKER_PREFIX}{worker_name}"):
+                continue
+            while await redis_client.lmove(key, QUEUE_KEY, src="RIGHT", dest="LEFT"):
+                pass
+            logger.warning("Requeued jobs of dead worker %s", worker_name)
+
+    async def _schedule_periodic(self, stop: asyncio.Event):
+        while not stop.is_set():
+            now = datetime.now(UTC).replace(second=0, microsecond=0)
+            for periodic_job in PERIODIC:
+                if not periodic_job.schedule.matches(now):
+                    continue
+                lock = f"jobs:cron:{periodic_job.name}:{now:%Y%m%d%H%M}"
+                try:
+                    if await redis_client.set(lock, self.name, nx=True, ex=3600):
+                        await enqueue(periodic_job.name)
+                except Exception:
+                    logger.exception("Failed to schedule %s", periodic_job.name)
+
+            # Sleep until the start of the next minute
+            delay = 60 - datetime.now(UTC).second
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except TimeoutError:
+                pass
+
+    async def run(self, stop: asyncio.Event, with_eventbus: bool = True):
+        logger.info("Worker %s started (concurrency=%s, jobs=%s)", self.name, self.concurrency, sorted(JOBS))
+        background = [
+            self._heartbeat_and_promote(stop),
+            self._schedule_periodic(stop),
+        ]
+        if with_eventbus:
+            relay = OutboxRelay()
+            background.append(relay.run(stop))
+            background.append(report_lag(stop, relay))
+            background.extend(consumer.run(stop) for consumer in CONSUMERS)
+
+        await asyncio.gather(self._consume(stop), *background)
+
+        # Let running jobs finish before exiting
+        if self._running:
+            logger.info("Waiting for %s running jobs", len(self._running))
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Rupaya background worker")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    parser.add_argument("--no-eventbus", action="store_true", help="Do not run the outbox relay and consumers")
+    args = parser.parse_args()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await Worker(args.concurrency).run(stop, with_eventbus=not args.no_eventbus)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
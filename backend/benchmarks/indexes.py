@@ -0,0 +1,106 @@
+"""
+Index usage report from pg_stat_user_indexes.
+
+    python -m benchmarks.indexes            # every index, least used first
+    python -m benchmarks.indexes --json
+
+Run it against production (or a replica) after normal traffic: scan counts are
+cumulative since the statistics were last reset, which the report prints. Flags:
+
+- unused:    never scanned and not backing a primary key or unique constraint
+- redundant: its columns are a leading prefix of another full index on the table
+- invalid:   left behind by a failed CREATE INDEX CONCURRENTLY; drop and rebuild
+"""
+import argparse
+import asyncio
+import json
+
+from sqlalchemy import text
+
+from app.db.session import dispose_engine, get_engine
+
+INDEXES_SQL = text("""
+    SELECT s.relname AS table_name,
+           s.indexrelname AS index_name,
+           s.idx_scan,
+           s.idx_tup_read,
+           pg_relation_size(s.indexrelid) AS size_bytes,
+           i.indisunique OR i.indisprimary AS enforces_constraint,
+           i.indisvalid AS valid,
+           i.indpred IS NOT NULL AS partial,
+           string_to_array(i.indkey::text, ' ') AS columns,
+           pg_get_indexdef(s.indexrelid) AS definition,
+           t.n_tup_ins + t.n_tup_upd + t.n_tup_del AS table_writes
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    JOIN pg_stat_user_tables t ON t.relid = s.relid
+    WHERE s.schemaname = current_schema()
+    ORDER BY s.idx_scan, pg_relation_size(s.indexrelid) DESC
+""")
+
+STATS_RESET_SQL = text("SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()")
+
+
+def classify(rows: list[dict]) -> list[dict]:
+    for row in rows:
+        flags = []
+        if not row["valid"]:
+            flags.append("invalid")
+        if row["idx_scan"] == 0 and not row["enforces_constraint"]:
+            flags.append("unused")
+        if not row["enforces_constraint"] and any(
+            other is not row
+            and other["table_name"] == row["table_name"]
+            and other["valid"] and not other["partial"]
+            and len(other["columns"]) > len(row["columns"])
+            and other["columns"][:len(row["columns"])] == row["columns"]
+            for other in rows
+        ):
+            flags.append("redundant")
+        row["flags"] = flags
+    return rows
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "kB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Report index usage from pg_stat_user_indexes")
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON")
+    args = parser.parse_args()
+
+    try:
+        async with get_engine().connect() as conn:
+            stats_reset = (await conn.execute(STATS_RESET_SQL)).scalar()
+            rows = [dict(r) for r in (await conn.execute(INDEXES_SQL)).mappings()]
+    finally:
+        await dispose_engine()
+
+    rows = classify(rows)
+    if args.json:
+        print(json.dumps({"stats_reset": stats_reset, "indexes": rows}, default=str, indent=2))
+        return
+
+    print(f"Statistics since: {stats_reset or 'database creation'}\n")
+    print(f"{'table':<14}{'index':<42}{'scans':>12}{'size':>9}{'table writes':>14}  flags")
+    for row in rows:
+        print(
+            f"{row['table_name']:<14}{row['index_name']:<42}{row['idx_scan']:>12}"
+            f"{format_size(row['size_bytes']):>9}{row['table_writes']:>14}  {', '.join(row['flags'])}"
+        )
+
+    dead = [row for row in rows if {"unused", "redundant", "invalid"} & set(row["flags"])]
+    if dead:
+        wasted = sum(row["size_bytes"] for row in dead)
+        print(f"\n{len(dead)} candidate(s) to drop, {format_size(wasted)} in total:")
+        for row in dead:
+            print(f"  {row['definition']}  -- {', '.join(row['flags'])}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,322 @@
+"""
+HTTP load generator replaying a realistic request mix against the API.
+
+Logs in seeded users (seed.py --scale) through /auth/login, then replays a mix of
+dashboard, group, bill-create and mark-paid calls:
+
+    # In-process against create_app() (also samples the DB pool)
+    python -m benchmarks.loadtest --users 200 --concurrency 50 --duration 60
+
+    # Open-loop: 300 actions/s with Poisson arrivals, against a running server
+    python -m benchmarks.loadtest --url http://localhost:8000 --rate 300 --duration 60
+
+Rate limiting is turned off for the in-process app; start a server under test with
+RATE_LIMIT_ENABLED=false, or the logins (10/min per IP) and bill creates get 429s.
+
+Open-loop latencies are measured from each action's scheduled start, so queueing
+delay is included instead of hidden (no coordinated omission).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+from app.core.config import settings
+from benchmarks.stats import summarize_latencies
+
+logger = logging.getLogger("benchmarks.loadtest")
+
+API = settings.api_base_path
+
+# Relative weight of each action in the mix
+ACTION_WEIGHTS = {
+    "dashboard": 40,
+    "group_view": 35,
+    "create_bill": 15,
+    "mark_paid": 10,
+}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+        self.dropped = 0
+
+    def record(self, endpoint: str, elapsed_ms: float, status: int | None):
+        self.latencies[endpoint].append(elapsed_ms)
+        self.statuses[endpoint][status or "error"] += 1
+        if status is None or status >= 400:
+            self.errors[endpoint] += 1
+
+
+class PoolSampler:
+    """Samples SQLAlchemy pool usage; only meaningful when the app runs in-process."""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.samples: list[tuple[int, int]] = []
+
+    async def run(self, stop: asyncio.Event):
+        from app.db.session import get_engine
+
+        pool = get_engine().pool
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        while not stop.is_set():
+            self.samples.append((pool.checkedout(), capacity))
+            await asyncio.sleep(self.interval)
+
+    def report(self) -> dict | None:
+        if not self.samples:
+            return None
+        used = [c for c, _ in self.samples]
+        capacity = self.samples[0][1]
+        return {
+            "capacity": capacity,
+            "max_checked_out": max(used),
+            "mean_checked_out": round(sum(used) / len(used), 2),
+            "saturated_pct": round(100 * sum(1 for c in used if c >= capacity) / len(used), 2),
+        }
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, email: str, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.email = email
+        self.rng = rng
+        self.headers = {}
+        self.user_id = None
+        self.group_ids: list[str] = []
+        self.members: dict[str, list[str]] = {}
+        self.unpaid_shares: list[str] = []
+
+    async def request(self, endpoint: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            res = await self.client.request(method, url, headers=self.headers, **kwargs)
+            status = res.status_code
+        except httpx.HTTPError:
+            res, status = None, None
+        self.recorder.record(endpoint, (time.perf_counter() - start) * 1000, status)
+        return res
+
+    async def login(self, password: str) -> bool:
+        res = await self.request(
+            "POST /auth/login", "POST", f"{API}/auth/login",
+            data={"username": self.email, "password": password},
+        )
+        if res is None or res.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+        me = await self.request("GET /users/me", "GET", f"{API}/users/me")
+        groups = await self.request("GET /groups", "GET", f"{API}/groups/", params={"limit": 10})
+        if me is None or groups is None or groups.status_code != 200:
+            return False
+        self.user_id = me.json()["id"]
+        self.group_ids = [g["id"] for g in groups.json()["items"]]
+        return bool(self.group_ids)
+
+    # -------------------------
+    # ACTIONS
+    # -------------------------
+    async def dashboard(self):
+        await self.request("GET /summary", "GET", f"{API}/summary/")
+        await self.request("GET /groups", "GET", f"{API}/groups/")
+
+    async def group_view(self):
+        group_id = self.rng.choice(self.group_ids)
+        detail = await self.request("GET /groups/{id}", "GET", f"{API}/groups/{group_id}")
+        bills = await self.request("GET /bills/group/{id}", "GET", f"{API}/bills/group/{group_id}")
+
+        if detail is not None and detail.status_code == 200:
+            self.members[group_id] = [m["user"]["id"] for m in detail.json()["members"]]
+        if bills is not None and bills.status_code == 200:
+            for bill in bills.json()["items"]:
+                self.unpaid_shares.extend(
+                    s["id"] for s in bill["shares"] if s["user"]["id"] == self.user_id and not s["paid"]
+                )
+
+    async def create_bill(self):
+        group_id = self.rng.choice(self.group_ids)
+        if group_id not in self.members:
+            return await self.group_view()
+        participants = self.members[group_id][:6]
+        await self.request("POST /bills", "POST", f"{API}/bills/", json={
+            "group_id": group_id,
+            "description": "Load test bill",
+            "total_amount": round(self.rng.uniform(50, 5000), 2),
+            "split_type": "EQUAL",
+            "shares": [{"user_id": u} for u in participants],
+        })
+
+    async def mark_paid(self):
+        if not self.unpaid_shares:
+            return await self.group_view()
+        share_id = self.unpaid_shares.pop()
+        await self.request(
+            "PATCH /bills/shares/{id}/mark-paid", "PATCH", f"{API}/bills/shares/{share_id}/mark-paid"
+        )
+
+    async def run_action(self, name: str):
+        await getattr(self, name)()
+
+
+def pick_action(rng: random.Random) -> str:
+    return rng.choices(list(ACTION_WEIGHTS), weights=list(ACTION_WEIGHTS.values()))[0]
+
+
+async def closed_loop(users, stop, rng, action_latencies):
+    async def loop(user):
+        while not stop.is_set():
+            action = pick_action(rng)
+            start = time.perf_counter()
+            await user.run_action(action)
+            action_latencies[action].append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(loop(u) for u in users))
+
+
+async def open_loop(users, recorder, stop, rng, action_latencies, rate: float, max_outstanding: int):
+    outstanding: set[asyncio.Task] = set()
+
+    async def fire(user, action, scheduled):
+        await user.run_action(action)
+        action_latencies[action].append((time.perf_counter() - scheduled) * 1000)
+
+    next_at = time.perf_counter()
+    while not stop.is_set():
+        next_at += rng.expovariate(rate)
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(outstanding) >= max_outstanding:
+            recorder.dropped += 1
+            continue
+        task = asyncio.create_task(fire(rng.choice(users), pick_action(rng), next_at))
+        outstanding.add(task)
+        task.add_done_callback(outstanding.discard)
+
+    await asyncio.gather(*outstanding, return_exceptions=True)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Rupaya HTTP load test")
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process app)")
+    parser.add_argument("--users", type=int, default=100, help="Seeded users to log in")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run")
+    parser.add_argument("--concurrency", type=int, default=20, help="Closed-loop virtual users")
+    parser.add_argument("--rate", type=float, help="Open-loop arrival rate (actions/s)")
+    parser.add_argument("--max-outstanding", type=int, default=1000, help="Open-loop in-flight cap")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rng = random.Random(args.seed)
+    recorder = Recorder()
+    sampler = PoolSampler()
+
+    if args.url:
+        transport, base_url = None, args.url
+    else:
+        from app.db.session import get_engine
+        from app.main import create_app
+
+        # Every virtual user logs in from the same address
+        settings.RATE_LIMIT_ENABLED = False
+        app = create_app()
+        get_engine().sync_engine.echo = False
+        transport, base_url = httpx.ASGITransport(app=app), "http://loadtest"
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(
+        transport=transport, base_url=base_url, timeout=30, limits=limits
+    ) as client:
+        # 1. Log users in (in parallel batches)
+        candidates = [
+            VirtualUser(client, recorder, f"user{i}@example.com", random.Random(args.seed + i))
+            for i in range(args.users)
+        ]
+        users = []
+        for i in range(0, len(candidates), 50):
+            batch = candidates[i:i + 50]
+            ok = await asyncio.gather(*(u.login(args.password) for u in batch))
+            users.extend(u for u, logged_in in zip(batch, ok, strict=True) if logged_in)
+        if not users:
+            raise SystemExit("No users could log in; seed the database with seed.py --scale")
+        logger.info("Logged in %s/%s users", len(users), len(candidates))
+
+        # Login traffic is reported separately from the steady-state mix
+        login_recorder, recorder = recorder, Recorder()
+        for u in users:
+            u.recorder = recorder
+
+        # 2. Replay the mix
+        stop = asyncio.Event()
+        action_latencies = defaultdict(list)
+        background = [] if args.url else [asyncio.create_task(sampler.run(stop))]
+        asyncio.get_running_loop().call_later(args.duration, stop.set)
+        started = time.perf_counter()
+        if args.rate:
+            await open_loop(users, recorder, stop, rng, action_latencies, args.rate, args.max_outstanding)
+        else:
+            await closed_loop(
+                (users * (args.concurrency // len(users) + 1))[:args.concurrency],
+                stop, rng, action_latencies,
+            )
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*background)
+
+    # 3. Report
+    total_requests = sum(len(v) for v in recorder.latencies.values())
+    total_errors = sum(recorder.errors.values())
+    report = {
+        "mode": f"open-loop {args.rate}/s" if args.rate else f"closed-loop x{args.concurrency}",
+        "duration_s": round(elapsed, 2),
+        "requests": total_requests,
+        "throughput_rps": round(total_requests / elapsed, 2),
+        "actions_per_s": round(sum(len(v) for v in action_latencies.values()) / elapsed, 2),
+        "error_rate_pct": round(100 * total_errors / total_requests, 3) if total_requests else 0,
+        "dropped_arrivals": recorder.dropped,
+        "endpoints": {
+            endpoint: {
+                **summarize_latencies(latencies),
+                "errors": recorder.errors[endpoint],
+                "statuses": {str(k): v for k, v in recorder.statuses[endpoint].items()},
+            }
+            for endpoint, latencies in sorted(recorder.latencies.items())
+        },
+        "actions": {name: summarize_latencies(v) for name, v in action_latencies.items()},
+        "login": summarize_latencies(login_recorder.latencies["POST /auth/login"]),
+        "db_pool": sampler.report(),
+    }
+
+    print(f"\n{report['mode']}: {report['throughput_rps']} req/s over {report['duration_s']}s, "
+          f"errors {report['error_rate_pct']}%, dropped {report['dropped_arrivals']}")
+    print(f"{'endpoint':<38}{'count':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}")
+    for endpoint, stats in report["endpoints"].items():
+        print(f"{endpoint:<38}{stats['count']:>8}{stats['p50_ms']:>9.1f}"
+              f"{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['errors']:>8}")
+    if report["db_pool"]:
+        pool = report["db_pool"]
+        print(f"DB pool: max {pool['max_checked_out']}/{pool['capacity']} checked out, "
+              f"mean {pool['mean_checked_out']}, saturated {pool['saturated_pct']}% of samples")
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
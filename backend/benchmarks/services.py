@@ -0,0 +1,296 @@
+"""
+Service-level benchmarks for the hot paths.
+
+Runs each service method against the database in DATABASE_URL (and Redis in
+REDIS_URL) and records latency percentiles and SQL round trips per call:
+
+    python -m benchmarks.services --seed-scale 0.001 --out benchmarks/results/base.json
+    python -m benchmarks.services --compare benchmarks/results/base.json
+
+The database should be a disposable local stand-in: the write benchmarks
+create bills and mark shares as paid.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import time
+from argparse import Namespace
+from datetime import UTC, datetime
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.db.query_stats import start_query_stats, stop_query_stats
+from app.db.session import AsyncSessionLocal, dispose_engine, get_engine
+from app.models.bills import BillCreate, BillShareCreate, BillUpdate, SplitType
+from app.services.bill_service import BillService
+from app.services.group_service import GroupService
+from app.services.summary_service import SummaryService
+from app.services.user_service import UserService
+from benchmarks.stats import summarize_latencies
+
+logger = logging.getLogger("benchmarks")
+
+RESULTS_DIR = Path(__file__).parent / "results"
+SEARCH_TERMS = ["Aa", "Sharma", "user12", "Ira", "Pillai", "example"]
+
+
+# -------------------------
+# FIXTURES
+# -------------------------
+async def _sample_percent(db, table: str, wanted: int) -> float:
+    """TABLESAMPLE percentage that should yield roughly `wanted` rows."""
+    res = await db.execute(text("SELECT reltuples FROM pg_class WHERE relname = :t"), {"t": table})
+    estimate = max(res.scalar() or 0, 1)
+    return min(100.0, max(0.01, 100.0 * wanted * 20 / estimate))
+
+
+async def load_fixtures(size: int, seed: int) -> dict:
+    """Pick a reproducible sample of members, groups and unpaid shares to drive the benchmarks."""
+    async with AsyncSessionLocal() as db:
+        pct = await _sample_percent(db, "GroupMember", size)
+        res = await db.execute(text(f"""
+            SELECT m.user_id, m.group_id
+            FROM "GroupMember" m TABLESAMPLE SYSTEM ({pct}) REPEATABLE ({seed})
+            JOIN "Group" g ON g.id = m.group_id
+            WHERE m.deleted_at IS NULL AND g.deleted_at IS NULL
+            LIMIT :n
+        """), {"n": size})
+        pairs = [(str(u), str(g)) for u, g in res.all()]
+
+        group_ids = list({g for _, g in pairs})
+        res = await db.execute(text("""
+            SELECT group_id, array_agg(user_id) FROM "GroupMember"
+            WHERE group_id = ANY(CAST(:ids AS uuid[])) AND deleted_at IS NULL
+            GROUP BY group_id
+        """), {"ids": group_ids})
+        members = {str(g): [str(u) for u in users] for g, users in res.all()}
+
+        pct = await _sample_percent(db, "BillShare", size)
+        res = await db.execute(text(f"""
+            SELECT s.id, s.user_id
+            FROM "BillShare" s TABLESAMPLE SYSTEM ({pct}) REPEATABLE ({seed})
+            JOIN "Bill" b ON b.id = s.bill_id
+            WHERE s.paid = false AND b.deleted_at IS NULL
+            LIMIT :n
+        """), {"n": size})
+        unpaid_shares = [(str(s), str(u)) for s, u in res.all()]
+
+    if not pairs:
+        raise SystemExit("No group members found; seed the database first (--seed-scale)")
+    return {"pairs": pairs, "members": members, "unpaid_shares": unpaid_shares, "created_bills": []}
+
+
+# -------------------------
+# BENCHMARKS
+# -------------------------
+# Each benchmark takes (db, fixtures, i) and performs exactly one service call.
+async def bench_get_user_groups(db, fx, i):
+    user_id, _ = fx["pairs"][i % len(fx["pairs"])]
+    await GroupService(db).get_user_groups(user_id)
+
+
+async def bench_get_group_detail(db, fx, i):
+    user_id, group_id = fx["pairs"][i % len(fx["pairs"])]
+    await GroupService(db).get_group_detail(group_id, user_id)
+
+
+async def bench_get_user_summary(db, fx, i):
+    user_id, _ = fx["pairs"][i % len(fx["pairs"])]
+    await SummaryService(GroupService(db)).get_user_summary(user_id)
+
+
+async def bench_get_group_bills(db, fx, i):
+    user_id, group_id = fx["pairs"][i % len(fx["pairs"])]
+    await BillService(GroupService(db)).get_group_bills(user_id, group_id)
+
+
+async def bench_search_users(db, fx, i):
+    user_id, _ = fx["pairs"][i % len(fx["pairs"])]
+    await UserService(db).search_users(SEARCH_TERMS[i % len(SEARCH_TERMS)], user_id)
+
+
+async def bench_create_bill(db, fx, i):
+    user_id, group_id = fx["pairs"][i % len(fx["pairs"])]
+    participants = fx["members"][group_id][:6]
+    bill = await BillService(GroupService(db)).create_bill(user_id, BillCreate(
+        group_id=group_id,
+        description=f"Benchmark bill {i}",
+        total_amount=100 + i,
+        split_type=SplitType.EQUAL,
+        shares=[BillShareCreate(user_id=u) for u in participants],
+    ))
+    fx["created_bills"].append((user_id, str(bill.id)))
+
+
+async def bench_update_bill(db, fx, i):
+    if not fx["created_bills"]:
+        return False
+    user_id, bill_id = fx["created_bills"][i % len(fx["created_bills"])]
+    await BillService(GroupService(db)).update_bill(
+        user_id, bill_id, BillUpdate(description=f"Benchmark bill {i} (edited)", total_amount=200 + i)
+    )
+
+
+async def bench_mark_share_as_paid(db, fx, i):
+    if not fx["unpaid_shares"]:
+        return False
+    share_id, user_id = fx["unpaid_shares"].pop()
+    await BillService(GroupService(db)).mark_share_as_paid(user_id, share_id)
+
+
+BENCHMARKS = {
+    "get_user_groups": bench_get_user_groups,
+    "get_group_detail": bench_get_group_detail,
+    "get_user_summary": bench_get_user_summary,
+    "get_group_bills": bench_get_group_bills,
+    "search_users": bench_search_users,
+    # create_bill must run before update_bill, which edits the bills it created
+    "create_bill": bench_create_bill,
+    "update_bill": bench_update_bill,
+    "mark_share_as_paid": bench_mark_share_as_paid,
+}
+
+
+async def run_benchmark(name, func, fixtures, iterations: int, warmup: int) -> dict:
+    latencies, queries, errors = [], [], 0
+    for i in range(warmup + iterations):
+        async with AsyncSessionLocal() as db:
+            stats, token = start_query_stats()
+            start = time.perf_counter()
+            try:
+                outcome = await func(db, fixtures, i)
+            except Exception as exc:
+                errors += 1
+                logger.debug("%s iteration %s failed: %s", name, i, exc)
+                continue
+            finally:
+                stop_query_stats(token)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if outcome is False:
+                # Fixture pool exhausted
+                break
+        if i >= warmup:
+            latencies.append(elapsed_ms)
+            queries.append(stats.count)
+
+    result = summarize_latencies(latencies)
+    result["errors"] = errors
+    result["queries_per_call"] = round(sum(queries) / len(queries), 2) if queries else 0
+    result["max_queries"] = max(queries, default=0)
+    return result
+
+
+# -------------------------
+# REPORTING
+# -------------------------
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def delta(base: dict, cur: dict, key: str) -> tuple[str, float]:
+    """One metric of a benchmark as "old->new", and the change in percent."""
+    old, new = base.get(key, 0), cur.get(key, 0)
+    pct = (new - old) / old * 100 if old else 0.0
+    return f"{old:>7.2f}->{new:<7.2f}", pct
+
+
+def compare(baseline: dict, current: dict, threshold_pct: float) -> list[str]:
+    """Print a per-benchmark diff; returns the names that regressed beyond the threshold."""
+    regressions = []
+    print(f"{'benchmark':<22}{'p50 ms':>18}{'p95 ms':>18}{'queries':>16}")
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base or not cur.get("count"):
+            continue
+
+        p50, _ = delta(base, cur, "p50_ms")
+        p95, p95_pct = delta(base, cur, "p95_ms")
+        queries, _ = delta(base, cur, "queries_per_call")
+        flag = ""
+        if p95_pct > threshold_pct or cur["queries_per_call"] > base["queries_per_call"]:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<22}{p50:>18}{p95:>18}{queries:>16}{flag}")
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark Rupaya service hot paths")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--only", nargs="*", choices=list(BENCHMARKS), help="Run a subset")
+    parser.add_argument("--seed", type=int, default=42, help="Fixture sampling (and seeding) seed")
+    parser.add_argument(
+        "--seed-scale", type=float, default=None,
+        help="Seed an empty database with seed.py --scale first",
+    )
+    parser.add_argument("--out", type=Path, help="Where to write results (default: results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Baseline results file to diff against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="p95 regression threshold in percent")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # Statement echo would dominate the timings
+    get_engine().sync_engine.echo = False
+
+    if args.seed_scale is not None:
+        from seed import seed_scale
+
+        await seed_scale(Namespace(
+            scale=args.seed_scale, users=None, groups=None, bills=None,
+            zipf=1.0, seed=args.seed, as_of=None, force=False,
+        ))
+
+    fixtures = await load_fixtures(max(args.iterations + args.warmup, 50), args.seed)
+    results = {}
+    for name in args.only or BENCHMARKS:
+        logger.info("Running %s", name)
+        results[name] = await run_benchmark(
+            name, BENCHMARKS[name], fixtures, args.iterations, args.warmup
+        )
+        r = results[name]
+        logger.info(
+            "%s: p50=%.2fms p95=%.2fms p99=%.2fms queries/call=%s errors=%s",
+            name, r.get("p50_ms", 0), r.get("p95_ms", 0), r.get("p99_ms", 0),
+            r["queries_per_call"], r["errors"],
+        )
+
+    async with AsyncSessionLocal() as db:
+        server_version = (await db.execute(text("SHOW server_version"))).scalar()
+    await dispose_engine()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(UTC).isoformat(),
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "postgres": server_version,
+        },
+        "results": results,
+    }
+
+    out = args.out or RESULTS_DIR / f"{report['meta']['commit'] or 'local'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    logger.info("Results written to %s", out)
+
+    if args.compare:
+        regressions = compare(json.loads(args.compare.read_text()), report, args.threshold)
+        if regressions:
+            raise SystemExit(f"Regressions: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
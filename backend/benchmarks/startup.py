@@ -0,0 +1,109 @@
+"""
+Cold-start report: import time of the app and time to first response.
+
+    python -m benchmarks.startup              # import-time breakdown + time to first response
+    python -m benchmarks.startup --runs 5 --top 30
+
+Each run uses a fresh interpreter, so nothing is cached in-process (the OS file
+cache still is; reboot or drop caches for a truly cold measurement).
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_times() -> tuple[float, list[tuple[str, int, int]]]:
+    """Import app.main in a fresh interpreter; returns (wall seconds, [(module, self_us, cumulative_us)])."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main; app.main.create_app()"],
+        capture_output=True, text=True, check=True,
+    )
+    elapsed = time.perf_counter() - start
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return elapsed, modules
+
+
+def top_level_package(module: str) -> str:
+    return module.split(".")[0]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_response(timeout: float = 60) -> float:
+    """Start uvicorn and poll /health until it answers."""
+    port = free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:create_app", "--factory",
+         "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as res:
+                    if res.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise SystemExit("Server did not answer /health in time")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rupaya cold-start report")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=20, help="Slowest packages/modules to list")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "postgresql://postgres@localhost/rupaya")
+    os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
+
+    walls, packages, modules = [], defaultdict(list), defaultdict(list)
+    for _ in range(args.runs):
+        wall, rows = import_times()
+        walls.append(wall)
+        per_package = defaultdict(int)
+        for module, self_us, cumulative_us in rows:
+            per_package[top_level_package(module)] += self_us
+            modules[module].append(cumulative_us)
+        for package, total in per_package.items():
+            packages[package].append(total)
+
+    print(f"Interpreter start + import app.main + create_app(): median {statistics.median(walls):.3f}s")
+    print(f"\n{'package (self time)':<40}{'ms':>10}")
+    for package, times in sorted(packages.items(), key=lambda kv: -statistics.median(kv[1]))[:args.top]:
+        print(f"{package:<40}{statistics.median(times) / 1000:>10.1f}")
+
+    print(f"\n{'app module (cumulative)':<40}{'ms':>10}")
+    app_modules = [(m, t) for m, t in modules.items() if m.startswith("app.")]
+    for module, times in sorted(app_modules, key=lambda kv: -statistics.median(kv[1]))[:args.top]:
+        print(f"{module:<40}{statistics.median(times) / 1000:>10.1f}")
+
+    ttfr = [time_to_first_response() for _ in range(args.runs)]
+    print(f"\nTime to first /health response: median {statistics.median(ttfr):.3f}s "
+          f"(min {min(ttfr):.3f}s, max {max(ttfr):.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
+import argparse
 import asyncio
 import logging
-from datetime import datetime
+import random
+import time
+import uuid
+from datetime import UTC, date, datetime, timedelta
 
+import asyncpg
 from sqlalchemy import select
 
-from app.db.session import AsyncSessionLocal
+from app.db.session import DATABASE_URL, AsyncSessionLocal
+from app.db.partitions import ensure_bill_partitions
 from app.db.models import User, Group, GroupMember, Bill, BillShare, GroupRole, SplitType
 from app.core.security import hash_password
 
@@ -135,6 +141,7 @@ async def seed_db():
                 
                 share = BillShare(
                     bill_id=bill.id,
+                    bill_created_at=bill.created_at,
                     user_id=user.id,
                     amount=this_share,
                     paid=is_payer, # Payer has theoretically "paid" their own share in the context of settlement calculations usually, but data model might imply 'paid' means settled. 
@@ -154,5 +161,225 @@ async def seed_db():
         
         logger.info("Seeding complete! 🚀")
 
+# -------------------------
+# SCALE MODE
+# -------------------------
+# Full scale (--scale 1) targets; --scale multiplies all three
+SCALE_USERS = 1_000_000
+SCALE_GROUPS = 200_000
+SCALE_BILLS = 20_000_000
+
+MAX_GROUP_SIZE = 40
+MAX_BILLS_PER_GROUP = 20_000
+HISTORY_DAYS = 730
+COPY_CHUNK = 50_000
+
+FIRST_NAMES = [
+    "Aarav", "Vivaan", "Aditya", "Vihaan", "Arjun", "Sai", "Reyansh", "Ayaan", "Krishna", "Ishaan",
+    "Ananya", "Diya", "Aadhya", "Saanvi", "Pari", "Anika", "Navya", "Myra", "Sara", "Ira",
+]
+LAST_NAMES = [
+    "Sharma", "Verma", "Gupta", "Iyer", "Reddy", "Nair", "Patel", "Shah", "Mehta", "Kapoor",
+    "Singh", "Das", "Rao", "Joshi", "Menon", "Bose", "Kulkarni", "Chopra", "Malhotra", "Pillai",
+]
+BILL_DESCRIPTIONS = [
+    "Dinner", "Groceries", "Cab", "Rent", "Electricity", "Movie tickets", "Coffee", "Fuel",
+    "Hotel", "Flight", "Snacks", "Internet", "Drinks", "Breakfast", "Train tickets", "Gift",
+]
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _cumulative(weights: list[float]) -> list[float]:
+    total, out = 0.0, []
+    for w in weights:
+        total += w
+        out.append(total)
+    return out
+
+
+def _bill_counts(rng: random.Random, n_groups: int, n_bills: int, exponent: float) -> list[int]:
+    """
+    Zipf-skewed bills per group: a random group gets rank r and weight 1/r^exponent.
+    Counts are capped per group and the excess redistributed over the rest.
+    """
+    ranks = list(range(1, n_groups + 1))
+    rng.shuffle(ranks)
+    weights = [1 / r ** exponent for r in ranks]
+    total_weight = sum(weights)
+
+    counts = [min(int(n_bills * w / total_weight), MAX_BILLS_PER_GROUP) for w in weights]
+    remainder = n_bills - sum(counts)
+    while remainder > 0:
+        open_groups = [g for g, c in enumerate(counts) if c < MAX_BILLS_PER_GROUP]
+        if not open_groups:
+            break
+        cum = _cumulative([weights[g] for g in open_groups])
+        for g in rng.choices(open_groups, cum_weights=cum, k=remainder):
+            if counts[g] < MAX_BILLS_PER_GROUP:
+                counts[g] += 1
+                remainder -= 1
+    return counts
+
+
+class CopyBuffer:
+    """Accumulates rows for one table and flushes them with COPY."""
+
+    def __init__(self, conn, table: str, columns: list[str]):
+        self.conn = conn
+        self.table = table
+        self.columns = columns
+        self.rows = []
+        self.total = 0
+
+    async def add(self, row: tuple):
+        self.rows.append(row)
+        if len(self.rows) >= COPY_CHUNK:
+            await self.flush()
+
+    async def flush(self):
+        if not self.rows:
+            return
+        await self.conn.copy_records_to_table(self.table, records=self.rows, columns=self.columns)
+        self.total += len(self.rows)
+        self.rows = []
+
+
+async def seed_scale(args):
+    """
+    Bulk-load a synthetic dataset with COPY. The history ends at midnight (UTC)
+    starting --as-of, today by default; the same --seed and --as-of on an empty
+    database produce the same rows (except password hashes, which are salted).
+    Every user's password is "password"; emails are user<N>@example.com.
+    """
+    n_users = args.users or int(SCALE_USERS * args.scale)
+    n_groups = args.groups or int(SCALE_GROUPS * args.scale)
+    n_bills = args.bills or int(SCALE_BILLS * args.scale)
+    rng = random.Random(args.seed)
+    as_of = args.as_of or datetime.now(UTC).date()
+    now = datetime(as_of.year, as_of.month, as_of.day, tzinfo=UTC)
+    started = time.perf_counter()
+
+    conn = await asyncpg.connect(DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://"))
+    try:
+        if await conn.fetchval('SELECT count(*) FROM "User"') and not args.force:
+            logger.error("Database already has users; use --force to load on top of them.")
+            return
+
+        await conn.execute("SET synchronous_commit = off")
+
+        # Monthly partitions for the whole history, so bills don't all land in the default partition
+        async with AsyncSessionLocal() as db:
+            await ensure_bill_partitions(db, since=(now - timedelta(days=HISTORY_DAYS + 1)).date())
+
+        # 1. Users
+        logger.info(f"Generating {n_users:,} users, {n_groups:,} groups, {n_bills:,} bills (seed={args.seed})")
+        password = hash_password("password")
+        users = CopyBuffer(conn, "User", ["id", "name", "email", "password", "role", "created_at"])
+        user_ids = []
+        for i in range(n_users):
+            user_id = _uuid(rng)
+            user_ids.append(user_id)
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            created = now - timedelta(days=HISTORY_DAYS + rng.random() * 365)
+            await users.add((user_id, name, f"user{i}@example.com", password, "USER", created))
+        await users.flush()
+        logger.info(f"Loaded {users.total:,} users ({time.perf_counter() - started:.0f}s)")
+
+        # 2. Groups, members, bills and shares, streamed group by group
+        size_cum = _cumulative([1 / (k - 1) ** 1.6 for k in range(2, MAX_GROUP_SIZE + 1)])
+        size_values = list(range(2, MAX_GROUP_SIZE + 1))
+        bill_counts = _bill_counts(rng, n_groups, n_bills, args.zipf)
+
+        groups = CopyBuffer(conn, "Group", ["id", "name", "description", "created_by", "created_at", "revision"])
+        members = CopyBuffer(conn, "GroupMember", ["id", "user_id", "group_id", "created_by", "role", "created_at"])
+        bills = CopyBuffer(
+            conn, "Bill",
+            ["id", "group_id", "paid_by", "created_by", "description", "total_amount", "split_type", "created_at"],
+        )
+        shares = CopyBuffer(
+            conn, "BillShare",
+            ["id", "bill_id", "user_id", "created_by", "amount", "paid", "created_at", "bill_created_at"],
+        )
+
+        for g in range(n_groups):
+            group_id = _uuid(rng)
+            size = min(rng.choices(size_values, cum_weights=size_cum)[0], n_users)
+            member_ids = [user_ids[i] for i in rng.sample(range(n_users), size)]
+            creator = member_ids[0]
+            group_created = now - timedelta(days=rng.random() * HISTORY_DAYS)
+
+            await groups.add((
+                group_id, f"{rng.choice(LAST_NAMES)} {rng.choice(BILL_DESCRIPTIONS)} #{g}",
+                None, creator, group_created, bill_counts[g],
+            ))
+            for idx, member_id in enumerate(member_ids):
+                await members.add((
+                    _uuid(rng), member_id, group_id, creator, "ADMIN" if idx == 0 else "MEMBER", group_created,
+                ))
+
+            age_days = (now - group_created).total_seconds() / 86400
+            for _ in range(bill_counts[g]):
+                bill_id = _uuid(rng)
+                payer = rng.choice(member_ids)
+                participants = member_ids if size <= 6 or rng.random() < 0.5 else rng.sample(member_ids, rng.randint(2, size))
+                total = round(rng.lognormvariate(6.5, 1.0), 2)
+                created = group_created + timedelta(days=rng.random() * age_days)
+                # Older bills are far more likely to be settled
+                settle_probability = 0.9 if (now - created).days > 60 else 0.3
+
+                await bills.add((
+                    bill_id, group_id, payer, payer, rng.choice(BILL_DESCRIPTIONS), total, "EQUAL", created,
+                ))
+                share_amount = round(total / len(participants), 2)
+                for participant in participants:
+                    paid = participant == payer or rng.random() < settle_probability
+                    await shares.add((_uuid(rng), bill_id, participant, payer, share_amount, paid, created, created))
+
+            # Parents must reach the database before their children
+            if len(shares.rows) >= COPY_CHUNK or g == n_groups - 1:
+                await groups.flush()
+                await members.flush()
+                await bills.flush()
+                await shares.flush()
+                logger.info(
+                    f"{g + 1:,}/{n_groups:,} groups, {bills.total:,} bills, {shares.total:,} shares "
+                    f"({time.perf_counter() - started:.0f}s)"
+                )
+
+        logger.info("Analyzing tables...")
+        for table in ("User", "Group", "GroupMember", "Bill", "BillShare"):
+            await conn.execute(f'ANALYZE "{table}"')
+    finally:
+        await conn.close()
+
+    logger.info(f"Scale seeding complete in {time.perf_counter() - started:.0f}s 🚀")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed the Rupaya database")
+    parser.add_argument(
+        "--scale", type=float, default=None,
+        help="Bulk-load synthetic data; 1.0 = 1M users, 200k groups, 20M bills",
+    )
+    parser.add_argument("--users", type=int, help="Override the number of users")
+    parser.add_argument("--groups", type=int, help="Override the number of groups")
+    parser.add_argument("--bills", type=int, help="Override the number of bills")
+    parser.add_argument("--zipf", type=float, default=1.0, help="Skew of bills per group")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducible data")
+    parser.add_argument(
+        "--as-of", type=date.fromisoformat, default=None,
+        help="Date (YYYY-MM-DD) the history ends at; defaults to today",
+    )
+    parser.add_argument("--force", action="store_true", help="Load even if users already exist")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(seed_db())
+    args = parse_args()
+    if args.scale is not None:
+        asyncio.run(seed_scale(args))
+    else:
+        asyncio.run(seed_db())
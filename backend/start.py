@@ -1,10 +1,66 @@
 """
 Run the FastAPI application with uvicorn
+
+    python start.py           # development: single process with auto-reload
+    python start.py --prod    # production: one worker per available core, uvloop/httptools
 """
 
+import argparse
+import math
+import os
+
 import uvicorn
 
 from app.core.config import settings
 
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring affinity and the cgroup (container) CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def run_production(workers: int | None):
+    workers = workers or settings.WEB_CONCURRENCY or available_cpus()
+    # Workers inherit the environment; the DB pool is sized per worker from it
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    uvicorn.run(
+        "app.main:create_app",
+        factory=True,
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        # The client IP is the rightmost X-Forwarded-For hop not added by a trusted proxy;
+        # trusting every peer would let clients pick their own (and their rate-limit bucket)
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        # Stop accepting, then give in-flight requests this long to finish
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS,
+        timeout_keep_alive=settings.KEEP_ALIVE_SECONDS,
+        access_log=False,
+    )
+
+
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host=settings.HOST, port=settings.PORT, reload=True)
+    parser = argparse.ArgumentParser(description="Run the Rupaya API")
+    parser.add_argument("--prod", action="store_true", help="Multi-worker production server")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: available CPUs)")
+    args = parser.parse_args()
+
+    if args.prod:
+        run_production(args.workers)
+    else:
+        uvicorn.run("app.main:create_app", factory=True, host=settings.HOST, port=settings.PORT, reload=True)